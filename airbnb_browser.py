@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Airbnb Browser
+Shared Brave/Selenium session used by every automation script.
+
+Selenium is imported only when a browser is actually started, so the
+parsing, nickname and message code can be imported without it.
+"""
+import hashlib
+import shutil
+import time
+import os
+import sys
+from page_fingerprint import FINGERPRINT_JS
+from run_metrics import metrics, PAGE_WAIT_BUCKETS
+from run_trace import tracer, traced
+
+# Override to point the scrapers at another host, e.g. the local fixture site
+AIRBNB_BASE_URL = os.environ.get("AIRBNB_BASE_URL", "https://www.airbnb.com").rstrip('/')
+
+# Multiplier for the fixed page settle waits (0 against the local fixture site)
+SETTLE_SCALE = float(os.environ.get("AIRBNB_SETTLE_SCALE", "1"))
+
+# selenium (chromedriver) or cdp (DevTools websocket, see cdp_backend.py)
+BROWSER_BACKEND_ENV = "AIRBNB_BROWSER_BACKEND"
+BACKENDS = ('selenium', 'cdp')
+
+BRAVE_PATHS = [
+    r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
+    r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
+    r"C:\Users\{}\AppData\Local\BraveSoftware\Brave-Browser\Application\brave.exe".format(os.getenv('USERNAME'))
+]
+
+# Looked up on PATH when there is no chromedriver to find the browser for us
+BROWSER_COMMANDS = ('brave-browser', 'brave', 'google-chrome', 'chromium', 'chromium-browser', 'chrome')
+
+# Card selectors tried on the reservations page, in order
+RESERVATION_SELECTORS = [
+    "[data-testid*='reservation']",
+    "[data-testid*='booking']",
+    "[class*='reservation']",
+    "[role='listitem']"
+]
+
+# Shorter texts are buttons/labels, not reservation cards
+MIN_RESERVATION_TEXT_LENGTH = 50
+
+# Selenium's By.CSS_SELECTOR, without importing Selenium
+CSS_SELECTOR = "css selector"
+
+# read_pages readiness: loaded, with some body text
+PAGE_TEXT_JS = "return document.readyState === 'complete' && document.body ? document.body.innerText : '';"
+
+# Cards read per script call: one round trip per batch instead of one per card
+CARD_BATCH = 100
+
+# Runs in the page: texts of the candidate cards start..start+count (selector by selector,
+# the order find_elements returns them) and how many candidates there are
+CARD_TEXTS_JS = r"""
+const selectors = arguments[0], start = arguments[1], count = arguments[2];
+const cards = [];
+for (const selector of selectors) cards.push(...document.querySelectorAll(selector));
+return {total: cards.length, texts: cards.slice(start, start + count).map(el => (el.innerText || '').trim())};
+"""
+
+
+def settle(seconds):
+    """Give a freshly loaded page time to render (scaled by AIRBNB_SETTLE_SCALE)"""
+    seconds *= SETTLE_SCALE
+    with tracer.span("sleep", seconds=seconds):
+        time.sleep(seconds)
+
+
+def browser_backend(backend=None):
+    """The given backend (a script's --backend), else AIRBNB_BROWSER_BACKEND, else selenium"""
+    backend = backend or os.environ.get(BROWSER_BACKEND_ENV) or 'selenium'
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown browser backend: {backend} (choose from {', '.join(BACKENDS)})")
+    return backend
+
+
+def find_browser_binary(search_path=False):
+    """Brave install path on Windows; with search_path also Brave/Chrome on PATH"""
+    for path in BRAVE_PATHS:
+        if os.path.exists(path):
+            return path
+    if search_path:
+        for command in BROWSER_COMMANDS:
+            path = shutil.which(command)
+            if path:
+                return path
+    return None
+
+
+def add_run_arguments(parser):
+    """Flags every browser script takes; pass the parsed values on, the modules do not read sys.argv"""
+    parser.add_argument('--no-wait', action='store_true', help="do not wait for Enter before closing the browser")
+    parser.add_argument('--profile', action='store_true', help="save CPU and memory profiles to output/profiles/")
+    parser.add_argument('--trace', action='store_true', help="write a Chrome trace of each run to output/traces/")
+    parser.add_argument('--skip-precheck', action='store_true', help="skip the cookie-store login precheck")
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help="browser backend: selenium (default) or cdp (DevTools websocket, no chromedriver)")
+    return parser
+
+
+def is_interactive(no_wait=False):
+    """False for unattended runs (--no-wait flag, or stdin is not a terminal)"""
+    if no_wait:
+        return False
+    try:
+        return sys.stdin.isatty()
+    except Exception:
+        return False
+
+
+class AirbnbBrowser:
+    def __init__(self, profile_dir=None, backend=None):
+        self.driver = None
+        self.wait = None
+        self.profile_dir = profile_dir
+        self.backend = browser_backend(backend)
+        # Window the scraping happens in; extra tabs switch back to it when closed
+        self.main_window = None
+        # Cards (or shard pages) the last read could not get - the read is incomplete
+        self.read_errors = 0
+
+    @traced()
+    def setup_driver(self):
+        """Setup Brave browser driver (profile_dir defaults to airbnb_brave_profile)"""
+        # All scripts share the same saved login unless a profile is given
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        profile_dir = os.path.join(script_dir, self.profile_dir or "airbnb_brave_profile")
+
+        if self.backend == 'cdp':
+            try:
+                from cdp_backend import CDPDriver
+                self.driver = CDPDriver.launch(find_browser_binary(search_path=True), profile_dir)
+                print("✅ Browser setup successful (DevTools backend)")
+            except Exception as e:
+                print(f"❌ Failed to setup browser: {e}")
+                raise
+            return
+
+        try:
+            from selenium import webdriver
+            from selenium.webdriver.chrome.options import Options
+            from selenium.webdriver.support.ui import WebDriverWait
+
+            chrome_options = Options()
+            chrome_options.add_argument("--start-maximized")
+            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
+            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+            chrome_options.add_experimental_option('useAutomationExtension', False)
+
+            brave_path = find_browser_binary()
+            if brave_path:
+                chrome_options.binary_location = brave_path
+
+            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
+            chrome_options.add_argument("--profile-directory=Default")
+
+            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            self.wait = WebDriverWait(self.driver, 20)
+            print("✅ Browser setup successful")
+
+        except Exception as e:
+            print(f"❌ Failed to setup browser: {e}")
+            raise
+
+    def wait_for_css(self, selector, timeout=20):
+        """True once an element matches selector, False on timeout"""
+        if self.backend == 'cdp':
+            return self.driver.wait_for_selector(selector, timeout)
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.webdriver.support.ui import WebDriverWait
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((CSS_SELECTOR, selector)))
+            return True
+        except TimeoutException:
+            return False
+
+    def start_browser_if_needed(self):
+        """Objects built with start_browser=False start the browser on first navigation"""
+        if self.driver is None:
+            self.setup_driver()
+
+    @traced()
+    def check_existing_session(self):
+        """Check if already logged in"""
+        self.start_browser_if_needed()
+        started = time.perf_counter()
+        self.driver.get(f"{AIRBNB_BASE_URL}/hosting")
+        settle(3)
+        metrics.observe('airbnb_page_wait_seconds', time.perf_counter() - started, PAGE_WAIT_BUCKETS, page='hosting')
+        current_url = self.driver.current_url
+        return "hosting" in current_url and "login" not in current_url
+
+    @traced()
+    def navigate_to_reservations(self):
+        """Navigate to reservations page"""
+        print("Navigating to reservations page...")
+        self.start_browser_if_needed()
+        started = time.perf_counter()
+        self.driver.get(f"{AIRBNB_BASE_URL}/hosting/reservations")
+        settle(5)
+        metrics.observe('airbnb_page_wait_seconds', time.perf_counter() - started, PAGE_WAIT_BUCKETS, page='reservations')
+        return True
+
+    def find_reservation_elements(self):
+        """All candidate reservation card elements on the current page"""
+        all_elements = []
+        for selector in RESERVATION_SELECTORS:
+            try:
+                elements = self.driver.find_elements(CSS_SELECTOR, selector)
+                all_elements.extend(elements)
+            except Exception as e:
+                # A dead browser finds nothing - which must not pass for an empty page
+                print(f"⚠️ Could not query {selector}: {e}")
+                self.read_errors += 1
+        return all_elements
+
+    @traced()
+    def page_fingerprint(self):
+        """{'cards', 'coded', 'digest'} of the current reservations page in one script call, or None"""
+        try:
+            return self.driver.execute_script(FINGERPRINT_JS, RESERVATION_SELECTORS, MIN_RESERVATION_TEXT_LENGTH)
+        except Exception as e:
+            print(f"⚠️ Page fingerprint unavailable: {e}")
+            return None
+
+    def open_tab(self, url, name):
+        """Start loading url in a new background tab; returns the handle tab_script/close_tab take"""
+        self.start_browser_if_needed()
+        if self.backend == 'cdp':
+            return self.driver.open_tab(url)
+        if self.main_window is None:
+            self.main_window = self.driver.current_window_handle
+        # Named windows: every tab starts loading at once, and is found again by name
+        self.driver.execute_script("window.open(arguments[0], arguments[1]);", url, name)
+        return name
+
+    def tab_script(self, tab, script, *args):
+        """execute_script in one of the open_tab tabs"""
+        if self.backend == 'cdp':
+            return tab.execute_script(script, *args)
+        self.driver.switch_to.window(tab)
+        return self.driver.execute_script(script, *args)
+
+    def close_tab(self, tab):
+        if self.backend == 'cdp':
+            self.driver.close_tab(tab)
+            return
+        try:
+            self.driver.switch_to.window(tab)
+            self.driver.close()
+        except Exception:
+            pass
+        finally:
+            self.driver.switch_to.window(self.main_window)
+
+    @traced()
+    def read_pages(self, urls, tabs=4, script=PAGE_TEXT_JS):
+        """Text of each URL, loaded in parallel in up to `tabs` extra tabs; {url: text or None}
+
+        script returns the page's text once it is ready and '' until then (default: any body text)
+        """
+        texts = {}
+        tabs = max(1, tabs)
+        for start in range(0, len(urls), tabs):
+            opened = []
+            for i, url in enumerate(urls[start:start + tabs], start):
+                try:
+                    opened.append((url, self.open_tab(url, f"detail_{i}")))
+                except Exception as e:
+                    print(f"⚠️ Could not open a tab for {url}: {e}")
+                    texts[url] = None
+            for url, tab in opened:
+                try:
+                    deadline = time.monotonic() + 20
+                    text = ""
+                    while time.monotonic() < deadline:
+                        text = self.tab_script(tab, script)
+                        if text and text.strip():
+                            break
+                        time.sleep(0.1)
+                    texts[url] = text or None
+                except Exception as e:
+                    print(f"⚠️ Could not read {url}: {e}")
+                    texts[url] = None
+                finally:
+                    self.close_tab(tab)
+        return texts
+
+    def iter_reservation_texts(self):
+        """Yield unique reservation texts as they are read, so parsing can start before the page is read
+
+        Cards come CARD_BATCH at a time from one script call each; a failed call is counted in
+        read_errors and ends the read (the caller must treat the result as partial)
+        """
+        print("Extracting raw reservation data...")
+
+        self.read_errors = 0
+        # Digests instead of full texts keep the duplicate check small on long pages
+        seen_digests = set()
+        count = 0
+        start = 0
+        total = None
+
+        while total is None or start < total:
+            try:
+                with tracer.span("read_card_texts", start=start):
+                    batch = self.driver.execute_script(CARD_TEXTS_JS, RESERVATION_SELECTORS, start, CARD_BATCH)
+                if not isinstance(batch, dict):
+                    raise RuntimeError(f"unexpected script result {batch!r}")
+            except Exception as e:
+                print(f"⚠️ Could not read cards from {start}: {e}")
+                self.read_errors += 1
+                break
+            total = batch['total']
+            if not batch['texts']:
+                break
+            start += len(batch['texts'])
+
+            for text in batch['texts']:
+                if not text or len(text) <= MIN_RESERVATION_TEXT_LENGTH:
+                    continue
+                digest = hashlib.sha1(text.encode('utf-8')).digest()
+                if digest in seen_digests:
+                    continue
+                seen_digests.add(digest)
+                count += 1
+                metrics.inc('airbnb_reservations_scraped_total')
+                yield text
+
+        print(f"Found {count} unique reservation texts")
+        if self.read_errors:
+            print(f"⚠️ {self.read_errors} card batch(es) could not be read")
+
+    @traced()
+    def extract_all_reservations_raw(self):
+        """Extract raw reservation texts for manual parsing"""
+        return list(self.iter_reservation_texts())
+
+    def ensure_driver(self):
+        """Start the browser, or restart it if the previous one died"""
+        if self.driver:
+            try:
+                self.driver.current_url
+                return
+            except Exception as e:
+                print(f"⚠️ Browser not responding, restarting: {e}")
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+                self.driver = None
+        self.setup_driver()
+
+    @traced()
+    def close(self):
+        """Quit the browser if it is running"""
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
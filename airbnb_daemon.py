@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Airbnb Daemon
+Keeps the nickname index and the browser warm and runs the daily engine
+at fixed times of day, unattended. Stops cleanly on Ctrl+C / SIGTERM.
+
+    python airbnb_daemon.py --at 07:00,18:00
+    python airbnb_daemon.py --at 07:00 --run-now
+"""
+import argparse
+import signal
+import threading
+import time
+from datetime import datetime, timedelta
+
+from airbnb_browser import BACKENDS
+from airbnb_daily_engine import AirbnbDailyEngine
+from artifact_archive import ArtifactArchive
+from run_metrics import metrics
+from run_profiling import profiler
+from run_trace import tracer
+from session_precheck import require_login
+
+DEFAULT_RUN_TIMES = "07:00"
+
+
+def parse_run_times(value):
+    """'07:00,18:30' -> [(7, 0), (18, 30)] sorted"""
+    run_times = []
+    for part in value.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        hour, minute = part.split(':')
+        hour, minute = int(hour), int(minute)
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"Invalid time of day: {part}")
+        run_times.append((hour, minute))
+    if not run_times:
+        raise ValueError("At least one run time is required")
+    return sorted(set(run_times))
+
+
+def next_run_after(now, run_times):
+    """First scheduled datetime strictly after now"""
+    for day_offset in (0, 1):
+        day = now.date() + timedelta(days=day_offset)
+        for hour, minute in run_times:
+            candidate = datetime(day.year, day.month, day.day, hour, minute)
+            if candidate > now:
+                return candidate
+    hour, minute = run_times[0]
+    day = now.date() + timedelta(days=2)
+    return datetime(day.year, day.month, day.day, hour, minute)
+
+
+class AirbnbDaemon:
+    def __init__(self, run_times, profile_dir=None, backend=None, skip_precheck=False, profile=False):
+        self.run_times = run_times
+        self.skip_precheck = skip_precheck
+        self.profile = profile
+        self.stop_event = threading.Event()
+        self.engine = AirbnbDailyEngine(profile_dir=profile_dir, start_browser=False, backend=backend)
+        self.runs = 0
+
+    def install_signal_handlers(self):
+        """Ask the loop to stop instead of dying mid-run"""
+        def handle_stop(signum, frame):
+            print(f"\n🛑 Received signal {signum}, stopping after the current step...")
+            self.stop_event.set()
+
+        signal.signal(signal.SIGINT, handle_stop)
+        for name in ('SIGTERM', 'SIGBREAK'):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), handle_stop)
+
+    def run_once(self):
+        """One scheduled run on the warm engine; records its latency"""
+        started_at = datetime.now()
+        started = time.perf_counter()
+        result = {'status': 'error', 'timings': {}}
+        profiler.start("daemon_run", requested=self.profile)
+
+        try:
+            # Index and browser stay warm; only reload what changed
+            if self.engine.nickname_helper.refresh():
+                print("🔄 Newer property nicknames archived - reloaded")
+            self.engine.set_dates()
+
+            # Expired login: skip the run without (re)starting the browser
+            if not require_login(self.engine.profile_dir, self.skip_precheck):
+                result = {'status': 'not_logged_in', 'timings': {}}
+            else:
+                phase_start = time.perf_counter()
+                self.engine.ensure_driver()
+                browser_seconds = time.perf_counter() - phase_start
+
+                result = self.engine.run_pipeline()
+                result['timings']['browser_ready'] = browser_seconds
+
+        except Exception as e:
+            result['error'] = str(e)
+            print(f"❌ Run failed: {e}")
+            import traceback
+            traceback.print_exc()
+            # A broken browser is restarted on the next run
+            try:
+                self.engine.close()
+            except Exception:
+                self.engine.driver = None
+
+        latency = time.perf_counter() - started
+        self.runs += 1
+        record = {
+            'started': started_at.isoformat(timespec='seconds'),
+            'status': result['status'],
+            'error': result.get('error'),
+            'latency_seconds': round(latency, 3),
+            'timings': {key: round(value, 3) for key, value in result.get('timings', {}).items()},
+            'tomorrow': self.engine.tomorrow.isoformat()
+        }
+        ArtifactArchive().append('daemon_run', record)
+        tracer.finish("daemon_run")
+        metrics.finish_run(result['status'] == 'ok', result.get('timings'))
+        metrics.write("daemon")
+        profiler.finish()
+
+        icon = "✅" if result['status'] == 'ok' else "❌"
+        print(f"{icon} Run #{self.runs} {result['status']} in {latency:.1f}s "
+              + " ".join(f"{key}={value:.1f}s" for key, value in result.get('timings', {}).items()))
+        return record
+
+    def serve_forever(self, run_now=False):
+        """Sleep until each scheduled time, run, repeat until signalled"""
+        self.install_signal_handlers()
+        schedule = ", ".join(f"{h:02d}:{m:02d}" for h, m in self.run_times)
+        print(f"=== AIRBNB DAEMON - runs at {schedule} (Ctrl+C to stop) ===")
+
+        try:
+            if run_now and not self.stop_event.is_set():
+                self.run_once()
+
+            while not self.stop_event.is_set():
+                next_run = next_run_after(datetime.now(), self.run_times)
+                print(f"💤 Next run at {next_run.strftime('%Y-%m-%d %H:%M')}")
+
+                # Wake up at least once a minute so clock changes/sleep are handled
+                while not self.stop_event.is_set():
+                    remaining = (next_run - datetime.now()).total_seconds()
+                    if remaining <= 0:
+                        break
+                    self.stop_event.wait(min(remaining, 60))
+
+                if not self.stop_event.is_set():
+                    self.run_once()
+        finally:
+            self.engine.close()
+            print(f"👋 Daemon stopped after {self.runs} run(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the daily engine on a schedule with a warm browser")
+    parser.add_argument('--at', default=DEFAULT_RUN_TIMES,
+                        help=f"comma-separated times of day, HH:MM (default: {DEFAULT_RUN_TIMES})")
+    parser.add_argument('--run-now', action='store_true', help="run once immediately, then follow the schedule")
+    parser.add_argument('--profile-dir', help="browser profile directory (default: airbnb_brave_profile)")
+    parser.add_argument('--profile', action='store_true', help="save CPU and memory profiles to output/profiles/")
+    parser.add_argument('--trace', action='store_true', help="write a Chrome trace of each run to output/traces/")
+    parser.add_argument('--skip-precheck', action='store_true', help="skip the cookie-store login precheck")
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help="browser backend: selenium (default) or cdp (DevTools websocket, no chromedriver)")
+    args = parser.parse_args()
+
+    if args.trace:
+        tracer.enable()
+    daemon = AirbnbDaemon(parse_run_times(args.at), profile_dir=args.profile_dir, backend=args.backend,
+                          skip_precheck=args.skip_precheck, profile=args.profile)
+    daemon.serve_forever(run_now=args.run_now)
+
+
+if __name__ == "__main__":
+    main()
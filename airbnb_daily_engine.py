@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Airbnb Daily Engine
+Scrapes the reservations page once, parses once, and renders both the
+per-region cleaner messages (Indonesian for Bali) and the English schedule,
+plus one route message per cleaning team when cleaning_teams.json exists
+"""
+import argparse
+import os
+import time
+from datetime import datetime
+from airbnb_browser import add_run_arguments, is_interactive
+from airbnb_integrated_cleaner import AirbnbIndonesianAutomation
+from artifact_archive import atomic_write_text
+from ical_export import CalendarExport, slugify
+from message_templates import render_english_schedule
+from run_metrics import metrics
+from run_profiling import profiled
+from run_trace import tracer, traced
+from session_precheck import require_login
+from turnover_scheduler import schedule_teams
+
+
+class AirbnbDailyEngine(AirbnbIndonesianAutomation):
+    @traced()
+    def create_outputs(self, reservations):
+        """Every output from the same parsed reservations"""
+        return {
+            'regions': self.create_region_messages(reservations),
+            'english': render_english_schedule(reservations, self.tomorrow),
+            'teams': schedule_teams(reservations, self.tomorrow, self.region_config) or {}
+        }
+
+    @traced()
+    def archive_outputs(self, outputs, reservations):
+        """Archive the regional messages and the English schedule"""
+        archive = self.archive_region_messages(outputs['regions'])
+        archive.append('cleaner_message_english', {
+            'message': outputs['english'],
+            'text': outputs['english'],
+            'checkouts': len(reservations['checkouts']),
+            'checkins': len(reservations['checkins'])
+        }, for_date=self.tomorrow)
+        for team, message in outputs.get('teams', {}).items():
+            archive.append(f"team_message_{slugify(team)}", {'team': team, 'message': message, 'text': message},
+                           for_date=self.tomorrow)
+        return archive
+
+    @traced()
+    def write_latest_outputs(self, outputs):
+        """Overwrite output/latest/*.txt atomically so readers never see half a message"""
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        latest_dir = os.path.join(script_dir, "output", "latest")
+        for region, rendered in outputs['regions'].items():
+            atomic_write_text(os.path.join(latest_dir, f"cleaner_message_{region}.txt"), rendered['text'])
+        atomic_write_text(os.path.join(latest_dir, "cleaner_message_english.txt"), outputs['english'])
+        for team, message in outputs.get('teams', {}).items():
+            atomic_write_text(os.path.join(latest_dir, f"team_message_{slugify(team)}.txt"), message)
+        return latest_dir
+
+    @traced()
+    def publish_calendars(self, reservations):
+        """Update the cleaning calendars (output/calendars/) for tomorrow; only changed events are rewritten"""
+        return CalendarExport(self.region_config).publish(reservations, self.tomorrow, complete=not self.read_errors)
+
+    def run_pipeline(self):
+        """One non-interactive pass: session check, scrape + parse once, render, archive"""
+        timings = {}
+        result = {'status': 'error', 'tomorrow': self.tomorrow.isoformat(), 'timings': timings}
+        started = time.perf_counter()
+
+        phase_start = time.perf_counter()
+        logged_in = self.check_existing_session()
+        timings['session_check'] = time.perf_counter() - phase_start
+        if not logged_in:
+            result['status'] = 'not_logged_in'
+            timings['total'] = time.perf_counter() - started
+            return result
+
+        # A failed scrape raises; a partial one is reported without touching the published outputs
+        phase_start = time.perf_counter()
+        reservations = self.get_tomorrows_reservations()
+        timings['scrape_parse'] = time.perf_counter() - phase_start
+        if self.read_errors:
+            timings['total'] = time.perf_counter() - started
+            result.update({'status': 'partial', 'reservations': reservations, 'read_errors': self.read_errors})
+            return result
+
+        phase_start = time.perf_counter()
+        outputs = self.create_outputs(reservations)
+        archive = self.archive_outputs(outputs, reservations)
+        latest_dir = self.write_latest_outputs(outputs)
+        timings['render_write'] = time.perf_counter() - phase_start
+
+        phase_start = time.perf_counter()
+        calendars = self.publish_calendars(reservations)
+        timings['calendars'] = time.perf_counter() - phase_start
+
+        timings['total'] = time.perf_counter() - started
+        result.update({
+            'status': 'ok',
+            'reservations': reservations,
+            'outputs': outputs,
+            'archive_root': archive.root,
+            'latest_dir': latest_dir,
+            'calendars': calendars
+        })
+        return result
+
+    def run(self, interactive=True):
+        """Main execution (interactive=False skips the closing prompt for unattended runs)"""
+        result = {'status': 'error', 'timings': {}}
+        try:
+            print("=== AIRBNB DAILY ENGINE - ONE SCRAPE, ALL OUTPUTS ===")
+            print(f"Today: {self.today}")
+            print(f"Tomorrow: {self.tomorrow}")
+            print(f"Regions: {', '.join(self.regions)}")
+
+            result = self.run_pipeline()
+            if result['status'] == 'not_logged_in':
+                print("❌ Not logged in. Please login first.")
+                return
+            print("✅ Already logged in!")
+            if result['status'] == 'partial':
+                print(f"⚠️ PARTIAL READ: {result['read_errors']} card(s)/page(s) could not be read - nothing published. "
+                      f"Run again to resume from the checkpoint.")
+                return
+
+            self.print_region_messages(result['outputs']['regions'])
+
+            print("\n" + "="*60)
+            print("WHATSAPP MESSAGE FOR CLEANER (ENGLISH):")
+            print("="*60)
+            print(result['outputs']['english'])
+            print("="*60)
+
+            for team, message in result['outputs']['teams'].items():
+                print(f"\n🧹 {team}:")
+                print(message)
+
+            timings = result['timings']
+            print(f"\n⏱️ Scrape + parse: {timings['scrape_parse']:.1f}s for "
+                  f"{len(result['outputs']['regions']) + 1} outputs (total {timings['total']:.1f}s)")
+            print(f"📁 Messages archived for {self.tomorrow} in: {result['archive_root']}")
+            print(f"📄 Latest copies: {result['latest_dir']}")
+            calendars = result['calendars']
+            if calendars:
+                print(f"📅 Calendars: {calendars['written']} events written, {calendars['unchanged']} unchanged, "
+                      f"{calendars['removed']} removed, {calendars['calendars']} calendar(s) updated")
+            print(f"   Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+        except Exception as e:
+            print(f"❌ Error during execution: {e}")
+            import traceback
+            traceback.print_exc()
+        finally:
+            if interactive:
+                input("\nPress Enter to close browser...")
+            self.close()
+            tracer.finish("daily_engine")
+            metrics.finish_run(result['status'] == 'ok', result['timings'])
+            metrics.write("daily_engine")
+
+
+def main():
+    parser = add_run_arguments(argparse.ArgumentParser(description="Scrape once; regional, English and team messages"))
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable()
+    if not require_login(skip=args.skip_precheck):
+        return
+    with profiled("daily_engine", args.profile):
+        engine = AirbnbDailyEngine(backend=args.backend)
+        engine.run(interactive=is_interactive(args.no_wait))
+
+
+if __name__ == "__main__":
+    main()
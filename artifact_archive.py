@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Artifact Archive
+Append-only, compressed, date-partitioned store for generated files
+"""
+import argparse
+import contextlib
+import gzip
+import json
+import os
+import shutil
+from datetime import datetime, date, timedelta
+
+DEFAULT_RETENTION_DAYS = 90
+
+
+def atomic_write_text(path, text):
+    """Write text to path via a temp file + rename so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def file_lock(path):
+    """Exclusive lock on <path>.lock, across processes and threads (each holder opens its own handle)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(f"{path}.lock", 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK gives up after ~10 seconds; keep waiting
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class ArtifactArchive:
+    """
+    One gzip file per day (output/archive/YYYY/MM/YYYY-MM-DD.jsonl.gz).
+    Every append adds a new gzip member, so the file is never rewritten.
+    index.json remembers where the latest record of each kind lives per date;
+    writers re-read it under a file lock, so concurrent processes (accounts,
+    daemon, message server) add to it instead of overwriting each other.
+    """
+
+    def __init__(self, root=None, retention_days=DEFAULT_RETENTION_DAYS):
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.root = root or os.path.join(script_dir, "output", "archive")
+        self.retention_days = retention_days
+        self.index_path = os.path.join(self.root, "index.json")
+        self.index_mtime = None
+        self.index = self._load_index()
+
+    def _load_index(self):
+        """Load the index, starting fresh if missing or unreadable"""
+        try:
+            self.index_mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            self.index_mtime = None
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            index.setdefault('partitions', {})
+            index.setdefault('latest', {})
+            return index
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Archive index unreadable, rebuilding: {e}")
+        return {'partitions': {}, 'latest': {}}
+
+    def _save_index(self):
+        atomic_write_text(self.index_path, json.dumps(self.index, indent=1, ensure_ascii=False))
+        self.index_mtime = os.stat(self.index_path).st_mtime_ns
+
+    def refresh(self):
+        """Pick up records other processes appended since the index was read"""
+        try:
+            mtime = os.stat(self.index_path).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self.index_mtime:
+            self.index = self._load_index()
+
+    def _day_key(self, for_date):
+        if for_date is None:
+            for_date = datetime.now().date()
+        if isinstance(for_date, datetime):
+            for_date = for_date.date()
+        if isinstance(for_date, date):
+            return for_date.isoformat()
+        return str(for_date)
+
+    def partition_path(self, day_key):
+        """Relative path of the partition holding a given date"""
+        year, month, _ = day_key.split('-')
+        return os.path.join(year, month, f"{day_key}.jsonl.gz")
+
+    def append(self, kind, payload, for_date=None):
+        """Append one record and point the index at it; returns the record"""
+        day_key = self._day_key(for_date)
+        record = {
+            'kind': kind,
+            'date': day_key,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'payload': payload
+        }
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        member = gzip.compress(line.encode('utf-8'))
+
+        rel_path = self.partition_path(day_key)
+        full_path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with file_lock(self.index_path):
+            # Merge into what is on disk now, not what this instance read at start
+            self.index = self._load_index()
+            with open(full_path, 'ab') as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write(member)
+
+            self.index['partitions'][day_key] = rel_path
+            self.index['latest'].setdefault(kind, {})[day_key] = {
+                'offset': offset,
+                'length': len(member),
+                'timestamp': record['timestamp']
+            }
+            self._prune(save=False)
+            self._save_index()
+        return record
+
+    def latest(self, kind, for_date=None):
+        """Return the latest record of a kind (for a date, or overall) without scanning"""
+        self.refresh()
+        entries = self.index['latest'].get(kind, {})
+        if not entries:
+            return None
+
+        day_key = self._day_key(for_date) if for_date is not None else max(entries)
+        entry = entries.get(day_key)
+        rel_path = self.index['partitions'].get(day_key)
+        if not entry or not rel_path:
+            return None
+
+        try:
+            with open(os.path.join(self.root, rel_path), 'rb') as f:
+                f.seek(entry['offset'])
+                member = f.read(entry['length'])
+            return json.loads(gzip.decompress(member).decode('utf-8'))
+        except Exception as e:
+            print(f"❌ Error reading archive record {kind} {day_key}: {e}")
+            return None
+
+    def dates(self, kind):
+        """Dates that have at least one record of a kind, oldest first"""
+        self.refresh()
+        return sorted(self.index['latest'].get(kind, {}))
+
+    def iter_records(self, for_date, kind=None):
+        """Yield every record of a date partition in append order"""
+        self.refresh()
+        rel_path = self.index['partitions'].get(self._day_key(for_date))
+        if not rel_path:
+            return
+        with gzip.open(os.path.join(self.root, rel_path), 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if kind is None or record.get('kind') == kind:
+                    yield record
+
+    def prune(self):
+        """Drop partitions older than the retention window, except the newest record of each kind"""
+        if not self.retention_days:
+            return []
+        with file_lock(self.index_path):
+            self.index = self._load_index()
+            return self._prune(save=True)
+
+    def _prune(self, save):
+        if not self.retention_days:
+            return []
+
+        cutoff = (datetime.now().date() - timedelta(days=self.retention_days)).isoformat()
+        # The newest record of each kind survives however old it is: the property
+        # mapping is extracted once and archived on the day it was extracted
+        newest = {kind: max(entries) for kind, entries in self.index['latest'].items() if entries}
+        kept = set(newest.values())
+        old = [day_key for day_key in self.index['partitions'] if day_key < cutoff]
+        expired = [day_key for day_key in old if day_key not in kept]
+
+        trimmed = False
+        for day_key in old:
+            if day_key in kept:
+                for kind, entries in self.index['latest'].items():
+                    if newest[kind] != day_key and entries.pop(day_key, None):
+                        trimmed = True
+
+        for day_key in expired:
+            rel_path = self.index['partitions'].pop(day_key)
+            full_path = os.path.join(self.root, rel_path)
+            try:
+                os.remove(full_path)
+            except FileNotFoundError:
+                pass
+            self._remove_empty_dirs(os.path.dirname(full_path))
+            for entries in self.index['latest'].values():
+                entries.pop(day_key, None)
+
+        if expired or trimmed:
+            self.index['latest'] = {kind: entries for kind, entries in self.index['latest'].items() if entries}
+            if expired:
+                print(f"🧹 Pruned {len(expired)} archive partition(s) older than {cutoff}")
+            if save:
+                self._save_index()
+        return expired
+
+    def _remove_empty_dirs(self, directory):
+        root = os.path.abspath(self.root)
+        directory = os.path.abspath(directory)
+        while directory.startswith(root) and directory != root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+
+    def clear(self):
+        """Remove the whole archive (used by tooling, never by the daily scripts)"""
+        shutil.rmtree(self.root, ignore_errors=True)
+        self.index = {'partitions': {}, 'latest': {}}
+
+
+def format_record(record):
+    """Human-readable rendering of an archived record"""
+    payload = record.get('payload')
+    if isinstance(payload, dict) and 'text' in payload:
+        return payload['text']
+    return json.dumps(payload, indent=2, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up archived automation artifacts")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    latest_cmd = sub.add_parser('latest', help="Print the latest record of a kind")
+    latest_cmd.add_argument('kind', help="e.g. cleaner_message_bali, property_nicknames")
+    latest_cmd.add_argument('date', nargs='?', help="YYYY-MM-DD (default: most recent date)")
+
+    list_cmd = sub.add_parser('list', help="List archived kinds and their dates")
+    list_cmd.add_argument('kind', nargs='?')
+
+    prune_cmd = sub.add_parser('prune', help="Apply the retention policy now")
+    prune_cmd.add_argument('--days', type=int, default=DEFAULT_RETENTION_DAYS)
+
+    args = parser.parse_args()
+
+    if args.command == 'latest':
+        archive = ArtifactArchive()
+        record = archive.latest(args.kind, args.date)
+        if not record:
+            print(f"No '{args.kind}' record found" + (f" for {args.date}" if args.date else ""))
+            return 1
+        print(f"# {record['kind']} for {record['date']} (archived {record['timestamp']})")
+        print(format_record(record))
+    elif args.command == 'list':
+        archive = ArtifactArchive()
+        kinds = [args.kind] if args.kind else sorted(archive.index['latest'])
+        for kind in kinds:
+            print(f"{kind}: {', '.join(archive.dates(kind)) or '-'}")
+    elif args.command == 'prune':
+        ArtifactArchive(retention_days=args.days).prune()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
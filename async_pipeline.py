@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Async Pipeline
+asyncio stages with bounded queues so parsing of the first cards overlaps
+with the browser reading the later ones:
+
+    page acquisition → text extraction → parsing (executor) → nickname resolution → rendering
+
+The browser is driven from one dedicated thread (WebDriver is not
+thread-safe); parsing runs on a separate pool, one parser per worker, while
+that thread waits on the browser. Texts come from the same readers as the
+sequential scripts (single tab or AIRBNB_SCRAPE_TABS shards), and every text
+is journaled and checkpointed the same way; an unchanged page reuses the
+last parse. Every stage reports its throughput.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from airbnb_browser import add_run_arguments, is_interactive
+from airbnb_daily_engine import AirbnbDailyEngine
+from capture_journal import open_reservation_journal
+from reservation_parser import ReservationParser
+from reservation_read import ReservationRead
+from run_metrics import metrics
+from run_profiling import profiler
+from run_trace import tracer
+from session_precheck import require_login
+
+DEFAULT_QUEUE_SIZE = 32
+DEFAULT_PARSE_WORKERS = 2
+
+_DONE = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy_seconds = 0.0
+        self.started = None
+        self.finished = None
+
+    def start(self):
+        self.started = time.perf_counter()
+
+    def record(self, seconds, items=1):
+        self.items += items
+        self.busy_seconds += seconds
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def summary(self):
+        wall = (self.finished or time.perf_counter()) - (self.started or time.perf_counter())
+        rate = self.items / wall if wall > 0 else 0.0
+        return (f"{self.name:<12} {self.items:>6} items  {wall:>7.2f}s wall  "
+                f"{self.busy_seconds:>7.2f}s busy  {rate:>9.1f} items/s")
+
+
+class AsyncReservationPipeline:
+    def __init__(self, engine, queue_size=DEFAULT_QUEUE_SIZE, parse_workers=DEFAULT_PARSE_WORKERS):
+        self.engine = engine
+        self.queue_size = queue_size
+        self.parse_workers = max(1, parse_workers)
+        self.browser_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="browser")
+        self.parse_executor = ThreadPoolExecutor(max_workers=self.parse_workers, thread_name_prefix="parse")
+        self.stats = {name: StageStats(name) for name in ('pages', 'extract', 'parse', 'nickname', 'render')}
+        # Navigation, fingerprint, readers and checkpoint are the sequential scripts' own
+        self.read = ReservationRead(engine)
+
+    async def _in_browser(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.browser_executor, func, *args)
+
+    async def acquire_pages(self):
+        """Stage 1: navigate and check the page fingerprint; returns the cached parse of an unchanged page"""
+        stats = self.stats['pages']
+        stats.start()
+        started = time.perf_counter()
+        cached = await self._in_browser(self.read.open)
+        stats.record(time.perf_counter() - started)
+        stats.finish()
+        return cached
+
+    async def extract_texts(self, text_queue):
+        """Stage 2: pull card texts from the browser thread one by one so parsing can start on the first ones"""
+        stats = self.stats['extract']
+        stats.start()
+        index = 0
+        while True:
+            started = time.perf_counter()
+            text = await self._in_browser(next, self.read.texts, _DONE)
+            if text is _DONE:
+                break
+            stats.record(time.perf_counter() - started)
+            await text_queue.put((index, text))
+            index += 1
+        for _ in range(self.parse_workers):
+            await text_queue.put(_DONE)
+        stats.finish()
+
+    async def parse_texts(self, text_queue, parsed_queue):
+        """Stage 3: parse on the executor; several workers pull from the same queue"""
+        stats = self.stats['parse']
+        stats.start()
+        loop = asyncio.get_running_loop()
+        parser = self.engine.parser
+
+        def parse(worker_parser, text):
+            reservation, reasons = worker_parser.parse_with_reasons(text, False)
+            return reservation, worker_parser.last_outcome, reasons
+
+        async def worker():
+            # A parser per worker: last_outcome and the captured reasoning belong to one parse at a time
+            worker_parser = ReservationParser(parser.tomorrow, parser.nickname_helper, parser.regions, verbose=False)
+            while True:
+                item = await text_queue.get()
+                if item is _DONE:
+                    return
+                index, text = item
+                resumed = self.read.checkpoint.parse_of(text)
+                if resumed:
+                    data, outcome, reasons = resumed
+                else:
+                    started = time.perf_counter()
+                    data, outcome, reasons = await loop.run_in_executor(self.parse_executor, parse, worker_parser, text)
+                    stats.record(time.perf_counter() - started)
+                    metrics.record_parse(worker_parser, time.perf_counter() - started, data)
+                    if outcome == 'error':
+                        print(f"⚠️ Card {index + 1} could not be parsed: {reasons[-1] if reasons else 'unknown error'}")
+                await parsed_queue.put((index, text, data, outcome, reasons, bool(resumed)))
+
+        await asyncio.gather(*(worker() for _ in range(self.parse_workers)))
+        await parsed_queue.put(_DONE)
+        stats.finish()
+
+    async def resolve_nicknames(self, parsed_queue, results, journal):
+        """Stage 4: nickname lookup, checkpoint and journal (cheap and single-threaded - the loop thread)"""
+        stats = self.stats['nickname']
+        stats.start()
+        parser = self.engine.parser
+        while True:
+            item = await parsed_queue.get()
+            if item is _DONE:
+                break
+            index, text, data, outcome, reasons, resumed = item
+            if not resumed:
+                if data:
+                    started = time.perf_counter()
+                    parser.resolve_nickname(data, text)
+                    stats.record(time.perf_counter() - started)
+                self.read.checkpoint.record_parse(text, data, outcome, reasons)
+            journal.record_reservation(index, text, outcome, reasons, data)
+            if data:
+                results.append((index, data))
+        stats.finish()
+
+    def render(self, reservations):
+        """Stage 5: render every output"""
+        stats = self.stats['render']
+        stats.start()
+        started = time.perf_counter()
+        outputs = self.engine.create_outputs(reservations)
+        stats.record(time.perf_counter() - started, items=len(outputs['regions']) + 1)
+        stats.finish()
+        return outputs
+
+    async def run_async(self):
+        engine = self.engine
+        cached = await self.acquire_pages()
+        if cached:
+            return cached['reservations'], self.render(cached['reservations'])
+
+        text_queue = asyncio.Queue(maxsize=self.queue_size)
+        parsed_queue = asyncio.Queue(maxsize=self.queue_size)
+        results = []
+        try:
+            with open_reservation_journal(engine.parser, type(engine).__name__) as journal:
+                await asyncio.gather(
+                    self.extract_texts(text_queue),
+                    self.parse_texts(text_queue, parsed_queue),
+                    self.resolve_nicknames(parsed_queue, results, journal)
+                )
+        except BaseException:
+            self.read.keep()
+            raise
+
+        # Back to page order
+        reservations = {'checkouts': [], 'checkins': []}
+        for _, data in sorted(results, key=lambda item: item[0]):
+            if data.get('type') == 'checkout':
+                reservations['checkouts'].append(data)
+            elif data.get('type') == 'checkin':
+                reservations['checkins'].append(data)
+        # The browser stages are done: guessed-at reservations are checked against their detail pages
+        reservations = await self._in_browser(self.read.finish, reservations, journal.path)
+        return reservations, self.render(reservations)
+
+    def run(self):
+        """Run all stages; returns (reservations, outputs)"""
+        profiler.checkpoint("before_pipeline")
+        try:
+            return asyncio.run(self.run_async())
+        finally:
+            profiler.checkpoint("after_pipeline")
+
+    def report(self):
+        return "\n".join(stats.summary() for stats in self.stats.values())
+
+    def shutdown(self):
+        self.browser_executor.shutdown(wait=True)
+        self.parse_executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape, parse and render with overlapping asyncio stages")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS)
+    add_run_arguments(parser)
+    args = parser.parse_args()
+    interactive = is_interactive(args.no_wait)
+    if args.trace:
+        tracer.enable()
+    if not require_login(skip=args.skip_precheck):
+        return
+    profiler.start("async_pipeline", requested=args.profile)
+    success = False
+    steps = {}
+
+    engine = AirbnbDailyEngine(backend=args.backend)
+    pipeline = AsyncReservationPipeline(engine, args.queue_size, args.parse_workers)
+    try:
+        print("=== AIRBNB ASYNC PIPELINE ===")
+        if not engine.check_existing_session():
+            print("❌ Not logged in. Please login first.")
+            return
+
+        started = time.perf_counter()
+        reservations, outputs = pipeline.run()
+        total = time.perf_counter() - started
+        steps['pipeline'] = total
+
+        engine.print_region_messages(outputs['regions'])
+        print("\n" + "="*60)
+        print("WHATSAPP MESSAGE FOR CLEANER (ENGLISH):")
+        print("="*60)
+        print(outputs['english'])
+        print("="*60)
+
+        if engine.read_errors:
+            print(f"\n⚠️ PARTIAL READ: {engine.read_errors} card(s)/page(s) could not be read - nothing published. "
+                  f"Run again to resume from the checkpoint.")
+            return
+
+        archive = engine.archive_outputs(outputs, reservations)
+        engine.write_latest_outputs(outputs)
+        engine.publish_calendars(reservations)
+        success = True
+
+        print("\n⏱️ STAGE THROUGHPUT:")
+        print(pipeline.report())
+        print(f"Total: {total:.2f}s")
+        print(f"📁 Messages archived for {engine.tomorrow} in: {archive.root}")
+
+    except Exception as e:
+        print(f"❌ Error during execution: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        pipeline.shutdown()
+        if interactive:
+            input("\nPress Enter to close browser...")
+        engine.close()
+        tracer.finish("async_pipeline")
+        metrics.finish_run(success, steps)
+        metrics.write("async_pipeline")
+        profiler.finish()
+
+
+if __name__ == "__main__":
+    main()
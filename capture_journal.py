@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Capture Journal
+Streaming, gzip-compressed JSON-lines record of every raw reservation text
+and listings row a run read, with its parse outcome and reasoning.
+
+    output/captures/YYYY-MM-DD/<kind>_HHMMSS_<pid>.jsonl.gz
+
+The first line is a header (tomorrow, regions, the nickname mapping in use),
+then one line per text, then a summary. Records are written as they are
+parsed and flushed in small batches, so memory stays flat and a crashed run
+still leaves a readable journal up to the last flush.
+
+    python capture_journal.py list
+    python capture_journal.py show output/captures/2025-08-06/reservations_070012_4242.jsonl.gz
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import zlib
+from datetime import datetime, timedelta
+
+from artifact_archive import DEFAULT_RETENTION_DAYS
+
+CAPTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "captures")
+FLUSH_EVERY = 50
+
+
+class CaptureJournal:
+    def __init__(self, kind, header=None, root=None):
+        self.kind = kind
+        self.root = root or CAPTURE_DIR
+        now = datetime.now()
+        directory = os.path.join(self.root, now.strftime('%Y-%m-%d'))
+        os.makedirs(directory, exist_ok=True)
+        # The pid keeps parallel account workers from sharing a file
+        self.path = os.path.join(directory, f"{kind}_{now.strftime('%H%M%S')}_{os.getpid()}.jsonl.gz")
+        self.file = gzip.open(self.path, 'wt', encoding='utf-8', compresslevel=6)
+        self.records = 0
+        self.outcomes = {}
+        self.write(dict({'type': 'header', 'kind': kind, 'started': now.isoformat(timespec='seconds')}, **(header or {})))
+
+    def write(self, record):
+        self.file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.records += 1
+        if self.records % FLUSH_EVERY == 0:
+            # Sync flush: everything so far can be decompressed even if the run dies
+            self.file.flush()
+
+    def record_reservation(self, index, text, outcome, reasons, parsed):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.write({
+            'type': 'reservation',
+            'index': index,
+            'outcome': outcome,
+            'reasons': reasons,
+            'parsed': {key: value for key, value in parsed.items() if key != 'raw_text'} if parsed else None,
+            'text': text
+        })
+
+    def record_listing_row(self, index, text, title, nickname, status, region):
+        outcome = 'listed' if title and nickname and status == "Listed" else ('skipped' if status != "Listed" else 'unparsed')
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+        self.write({
+            'type': 'listing_row',
+            'index': index,
+            'outcome': outcome,
+            'parsed': {'airbnb_name': title, 'internal_name': nickname, 'status': status, 'region': region},
+            'text': text
+        })
+
+    def close(self, summary=None):
+        """Write the summary line and close; returns the journal path"""
+        if self.file is None:
+            return self.path
+        self.write(dict({'type': 'summary', 'records': self.records - 1, 'outcomes': self.outcomes,
+                         'finished': datetime.now().isoformat(timespec='seconds')}, **(summary or {})))
+        self.file.close()
+        self.file = None
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close({'error': exc_type.__name__} if exc_type else None)
+        return False
+
+
+def open_reservation_journal(parser, script):
+    """Journal for one reservations scrape, with everything a replay needs in the header"""
+    prune_captures()
+    return CaptureJournal('reservations', header={
+        'script': script,
+        'tomorrow': parser.tomorrow.isoformat(),
+        'regions': parser.regions,
+        'nicknames': parser.nickname_helper.snapshot()
+    })
+
+
+def iter_capture(path):
+    """Yield the records of a journal one by one; a truncated tail (crashed run) ends the stream"""
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        try:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        return
+        except (EOFError, zlib.error, OSError):
+            return
+
+
+def list_captures(kind=None, root=None):
+    """Journal paths, oldest first"""
+    root = root or CAPTURE_DIR
+    if not os.path.isdir(root):
+        return []
+    paths = []
+    for day in sorted(os.listdir(root)):
+        day_dir = os.path.join(root, day)
+        if not os.path.isdir(day_dir):
+            continue
+        for name in sorted(os.listdir(day_dir)):
+            if name.endswith('.jsonl.gz') and (kind is None or name.startswith(f"{kind}_")):
+                paths.append(os.path.join(day_dir, name))
+    return paths
+
+
+def prune_captures(retention_days=DEFAULT_RETENTION_DAYS, root=None):
+    """Delete day directories older than the retention window"""
+    root = root or CAPTURE_DIR
+    if not retention_days or not os.path.isdir(root):
+        return []
+    cutoff = (datetime.now().date() - timedelta(days=retention_days)).isoformat()
+    expired = [day for day in os.listdir(root) if len(day) == 10 and day < cutoff]
+    for day in expired:
+        shutil.rmtree(os.path.join(root, day), ignore_errors=True)
+    if expired:
+        print(f"🧹 Pruned {len(expired)} capture day(s) older than {cutoff}")
+    return expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect raw-capture journals")
+    sub = parser.add_subparsers(dest='command', required=True)
+    list_cmd = sub.add_parser('list', help="list journals")
+    list_cmd.add_argument('kind', nargs='?', help="reservations or listings")
+    show_cmd = sub.add_parser('show', help="print a journal's records")
+    show_cmd.add_argument('path')
+    show_cmd.add_argument('--outcome', help="only records with this outcome (e.g. no_dates)")
+    args = parser.parse_args()
+
+    if args.command == 'list':
+        for path in list_captures(args.kind):
+            print(path)
+        return
+
+    for record in iter_capture(args.path):
+        if record['type'] in ('header', 'summary'):
+            print(json.dumps({k: v for k, v in record.items() if k != 'nicknames'}, ensure_ascii=False))
+            continue
+        if args.outcome and record.get('outcome') != args.outcome:
+            continue
+        print(f"\n--- #{record['index']} {record['outcome']} ---")
+        print(record['text'])
+        for reason in record.get('reasons') or []:
+            print(f"  {reason}")
+
+
+if __name__ == "__main__":
+    main()
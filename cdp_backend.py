@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+CDP Backend
+Drives Brave/Chrome directly over the DevTools Protocol websocket instead of
+Selenium + chromedriver: no driver binary to keep in step with the browser,
+and one websocket round trip per command instead of two HTTP hops.
+
+CDPDriver implements the part of the Selenium driver the scripts use
+(get, current_url, find_elements(...).text, execute_script, get_cookies,
+quit) plus wait_for_selector. Card texts come back from one in-page call
+instead of one request per element.
+
+    AIRBNB_BROWSER_BACKEND=cdp python airbnb_integrated_cleaner.py
+    python airbnb_integrated_cleaner.py --backend cdp
+    python cdp_backend.py --compare --cards 200      # Selenium vs CDP latency on the fixture pages
+
+Standard library only (a minimal RFC 6455 client).
+"""
+import argparse
+import base64
+import collections
+import json
+import os
+import socket
+import statistics
+import subprocess
+import time
+import urllib.request
+from urllib.parse import quote, urlparse
+
+LAUNCH_TIMEOUT = 20
+COMMAND_TIMEOUT = 30
+PAGE_LOAD_TIMEOUT = 30
+
+# Selenium's By.CSS_SELECTOR
+CSS_SELECTOR = "css selector"
+
+# Websocket opcodes
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class CDPError(Exception):
+    pass
+
+
+class WebSocket:
+    """Just enough of RFC 6455 for the DevTools endpoint: text frames, ping/pong, close"""
+
+    def __init__(self, url, timeout=COMMAND_TIMEOUT):
+        parsed = urlparse(url)
+        self.sock = socket.create_connection((parsed.hostname, parsed.port or 80), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        # No Origin header: Chrome only accepts origin-less DevTools clients by default
+        request = (f"GET {parsed.path or '/'} HTTP/1.1\r\n"
+                   f"Host: {parsed.hostname}:{parsed.port}\r\n"
+                   "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                   f"Sec-WebSocket-Key: {key}\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        self.sock.sendall(request.encode('ascii'))
+        status = self.reader.readline().decode('latin-1')
+        if " 101 " not in status:
+            raise CDPError(f"WebSocket handshake failed: {status.strip()}")
+        while self.reader.readline() not in (b"\r\n", b"\n", b""):
+            pass
+
+    def send(self, text, opcode=OP_TEXT):
+        payload = text.encode('utf-8') if isinstance(text, str) else text
+        length = len(payload)
+        header = bytearray([0x80 | opcode])
+        if length < 126:
+            header.append(0x80 | length)
+        elif length < 1 << 16:
+            header.append(0x80 | 126)
+            header += length.to_bytes(2, 'big')
+        else:
+            header.append(0x80 | 127)
+            header += length.to_bytes(8, 'big')
+        mask = os.urandom(4)
+        # Mask the whole payload as one big integer XOR (much faster than a byte loop)
+        repeated = (mask * (length // 4 + 1))[:length]
+        masked = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+        self.sock.sendall(bytes(header) + mask + masked)
+
+    def _read_exact(self, count):
+        data = self.reader.read(count)
+        if data is None or len(data) < count:
+            raise CDPError("DevTools connection closed")
+        return data
+
+    def recv(self):
+        """Next complete text message (continuation frames joined, pings answered)"""
+        message = bytearray()
+        while True:
+            first, second = self._read_exact(2)
+            opcode = first & 0x0F
+            length = second & 0x7F
+            if length == 126:
+                length = int.from_bytes(self._read_exact(2), 'big')
+            elif length == 127:
+                length = int.from_bytes(self._read_exact(8), 'big')
+            mask = self._read_exact(4) if second & 0x80 else None
+            payload = self._read_exact(length) if length else b""
+            if mask:
+                repeated = (mask * (length // 4 + 1))[:length]
+                payload = (int.from_bytes(payload, 'big') ^ int.from_bytes(repeated, 'big')).to_bytes(length, 'big')
+
+            if opcode == OP_PING:
+                self.send(payload, OP_PONG)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                raise CDPError("DevTools connection closed by the browser")
+            message += payload
+            if first & 0x80:
+                return message.decode('utf-8')
+
+    def close(self):
+        try:
+            self.send(b"", OP_CLOSE)
+        except Exception:
+            pass
+        try:
+            self.reader.close()
+            self.sock.close()
+        except Exception:
+            pass
+
+
+class CDPElement:
+    """Result of find_elements: the text is read in the same call"""
+    __slots__ = ('text',)
+
+    def __init__(self, text):
+        self.text = text or ""
+
+
+class CDPDriver:
+    def __init__(self, websocket_url, process=None):
+        self.ws = WebSocket(websocket_url)
+        self.endpoint = urlparse(websocket_url).netloc
+        self.process = process
+        self.next_id = 0
+        self.events = collections.deque(maxlen=1000)
+        self.send("Page.enable")
+
+    @classmethod
+    def launch(cls, binary, profile_dir, extra_args=()):
+        """Start the browser with remote debugging on a free port and attach to its first tab"""
+        if not binary:
+            raise CDPError("No Brave/Chrome binary found for the CDP backend")
+        os.makedirs(profile_dir, exist_ok=True)
+        port_file = os.path.join(profile_dir, "DevToolsActivePort")
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        process = subprocess.Popen([
+            binary,
+            "--remote-debugging-port=0",
+            f"--user-data-dir={profile_dir}",
+            "--profile-directory=Default",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--start-maximized",
+            *extra_args,
+            "about:blank"
+        ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        port = None
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CDPError("Browser exited at startup (is this profile already open in another window?)")
+            try:
+                with open(port_file, 'r', encoding='utf-8') as f:
+                    port = int(f.readline().strip())
+                break
+            except (OSError, ValueError):
+                time.sleep(0.05)
+        if port is None:
+            process.kill()
+            raise CDPError(f"Browser did not open a DevTools port within {LAUNCH_TIMEOUT}s")
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/json/list", timeout=LAUNCH_TIMEOUT) as response:
+            targets = json.loads(response.read().decode('utf-8'))
+        pages = [t for t in targets if t.get('type') == 'page' and t.get('webSocketDebuggerUrl')]
+        if not pages:
+            process.kill()
+            raise CDPError("No browser tab to attach to")
+        return cls(pages[0]['webSocketDebuggerUrl'], process)
+
+    def send(self, method, timeout=COMMAND_TIMEOUT, **params):
+        """One DevTools command; events that arrive meanwhile are buffered"""
+        self.next_id += 1
+        command_id = self.next_id
+        self.ws.sock.settimeout(timeout)
+        self.ws.send(json.dumps({'id': command_id, 'method': method, 'params': params}))
+        while True:
+            message = json.loads(self.ws.recv())
+            if message.get('id') == command_id:
+                if 'error' in message:
+                    raise CDPError(f"{method}: {message['error'].get('message')}")
+                return message.get('result', {})
+            if 'method' in message:
+                self.events.append(message)
+
+    def wait_event(self, method, timeout=PAGE_LOAD_TIMEOUT):
+        """Block until an event arrives (or was already buffered)"""
+        for event in list(self.events):
+            if event['method'] == method:
+                self.events.remove(event)
+                return event
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CDPError(f"Timed out waiting for {method}")
+            self.ws.sock.settimeout(remaining)
+            try:
+                message = json.loads(self.ws.recv())
+            except socket.timeout:
+                raise CDPError(f"Timed out waiting for {method}")
+            if message.get('method') == method:
+                return message
+            if 'method' in message:
+                self.events.append(message)
+
+    def get(self, url):
+        """Navigate and wait for the load event, like Selenium's default page load strategy"""
+        self.events = collections.deque((e for e in self.events if e['method'] != "Page.loadEventFired"), maxlen=1000)
+        result = self.send("Page.navigate", url=url)
+        if result.get('errorText'):
+            raise CDPError(f"Navigation to {url} failed: {result['errorText']}")
+        self.wait_event("Page.loadEventFired")
+
+    def execute_script(self, script, *args):
+        """Selenium semantics: script is a function body that sees arguments[...]"""
+        expression = f"(function(){{{script}\n}}).apply(null, {json.dumps(args)})"
+        result = self.send("Runtime.evaluate", expression=expression, returnByValue=True, awaitPromise=True)
+        if result.get('exceptionDetails'):
+            details = result['exceptionDetails']
+            raise CDPError(details.get('exception', {}).get('description') or details.get('text'))
+        return result.get('result', {}).get('value')
+
+    @property
+    def current_url(self):
+        return self.execute_script("return location.href;")
+
+    def find_elements(self, by, selector):
+        if by != CSS_SELECTOR:
+            raise CDPError(f"CDP backend only supports CSS selectors, not {by}")
+        texts = self.execute_script(
+            "return Array.from(document.querySelectorAll(arguments[0]), e => e.innerText);", selector)
+        return [CDPElement(text) for text in texts or []]
+
+    def wait_for_selector(self, selector, timeout=20):
+        """True once selector matches, False after timeout"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.execute_script("return document.querySelector(arguments[0]) !== null;", selector):
+                return True
+            time.sleep(0.1)
+        return False
+
+    def get_cookies(self):
+        return self.send("Network.getCookies").get('cookies', [])
+
+    def _devtools_http(self, path, method='GET'):
+        request = urllib.request.Request(f"http://{self.endpoint}{path}", method=method)
+        with urllib.request.urlopen(request, timeout=LAUNCH_TIMEOUT) as response:
+            body = response.read().decode('utf-8')
+        return json.loads(body) if body.startswith(('{', '[')) else body
+
+    def open_tab(self, url):
+        """New background tab loading url, as its own CDPDriver (tab.target_id)"""
+        # Encoded whole so the target URL's own ?, & and # stay part of it
+        target = self._devtools_http(f"/json/new?{quote(url, safe='')}", method='PUT')
+        tab = CDPDriver(target['webSocketDebuggerUrl'])
+        tab.target_id = target['id']
+        return tab
+
+    def close_tab(self, tab):
+        tab.ws.close()
+        try:
+            self._devtools_http(f"/json/close/{tab.target_id}")
+        except Exception:
+            pass
+
+    def quit(self):
+        try:
+            self.send("Browser.close", timeout=5)
+        except Exception:
+            pass
+        self.ws.close()
+        if self.process:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def median_ms(samples):
+    return statistics.median(samples) * 1000 if samples else 0.0
+
+
+def measure_backend(backend, url, profile_dir, repeat):
+    """Median latency of each command the scripts issue, on one backend"""
+    from airbnb_browser import AirbnbBrowser, RESERVATION_SELECTORS
+
+    browser = AirbnbBrowser(profile_dir=profile_dir, backend=backend)
+    timings = collections.defaultdict(list)
+    started = time.perf_counter()
+    browser.setup_driver()
+    timings['start'].append(time.perf_counter() - started)
+    try:
+        for _ in range(repeat):
+            started = time.perf_counter()
+            browser.driver.get(f"{url}/hosting/reservations")
+            timings['navigate'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            browser.driver.current_url
+            timings['current_url'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            browser.driver.execute_script("return 1;")
+            timings['execute_script'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            elements = browser.driver.find_elements(CSS_SELECTOR, RESERVATION_SELECTORS[0])
+            texts = [element.text for element in elements]
+            timings['card_texts'].append(time.perf_counter() - started)
+        cards = len(texts)
+    finally:
+        browser.close()
+    return {name: median_ms(samples) for name, samples in timings.items()}, cards
+
+
+def compare(cards, repeat, profile_dir):
+    from fixture_site import FixtureSite
+
+    site = FixtureSite(cards=cards, port=0).start()
+    results = {}
+    try:
+        for backend in ('selenium', 'cdp'):
+            try:
+                results[backend] = measure_backend(backend, site.url, profile_dir, repeat)
+            except Exception as e:
+                print(f"⚠️ {backend} backend unavailable: {e}")
+    finally:
+        site.stop()
+
+    print(f"\n=== BACKEND LATENCY on {site.url} ({cards} cards, median of {repeat}) ===")
+    print(f"{'Command':<16} {'selenium':>10} {'cdp':>10} {'speedup':>8}")
+    print("-" * 47)
+    selenium, _ = results.get('selenium', ({}, 0))
+    cdp, _ = results.get('cdp', ({}, 0))
+    for name in ('start', 'navigate', 'current_url', 'execute_script', 'card_texts'):
+        a, b = selenium.get(name), cdp.get(name)
+        speedup = f"{a / b:.1f}x" if a and b else "-"
+        print(f"{name:<16} {f'{a:.1f}ms' if a is not None else '-':>10} {f'{b:.1f}ms' if b is not None else '-':>10} {speedup:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DevTools Protocol browser backend")
+    parser.add_argument('--compare', action='store_true', help="Selenium vs CDP latency on the local fixture site")
+    parser.add_argument('--cards', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--profile-dir', default="fixture_brave_profile",
+                        help="browser profile for the comparison (kept apart from the real login)")
+    args = parser.parse_args()
+    if not args.compare:
+        parser.print_help()
+        return
+    compare(args.cards, args.repeat, args.profile_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Detail Enrichment
+Reservations the parser had to guess at (a lone date, check-in vs checkout
+from a keyword, a defaulted guest count, no property line) carry a
+confidence below LOW_CONFIDENCE. Only those are re-read from their detail
+page, where every field is labeled, and only when the card showed a
+confirmation code. The pages load together in a few extra tabs, so a run
+with a handful of doubtful cards costs roughly one page load, not one each.
+
+    AIRBNB_DETAIL_TABS=4      tabs open at once (default 4; 0 = never fetch details)
+"""
+import os
+import time
+
+from airbnb_browser import AIRBNB_BASE_URL
+from reservation_parser import LOW_CONFIDENCE
+from run_metrics import metrics
+from run_trace import traced
+
+DETAIL_TABS_ENV = "AIRBNB_DETAIL_TABS"
+DEFAULT_TABS = 4
+
+# The page is client-rendered: the header/nav shell has text long before the
+# reservation does, so wait for the detail section or a Check-in/Checkout label
+DETAIL_TEXT_JS = r"""
+if (document.readyState !== 'complete' || !document.body) return '';
+const section = document.querySelector("[data-testid*='reservation-detail']");
+if (section) return section.innerText || '';
+const text = document.body.innerText || '';
+return /^\s*(check-in|checkout|check-out)\s*:?\s*$/im.test(text) ? text : '';
+"""
+
+
+def detail_tabs():
+    try:
+        return max(0, int(os.environ.get(DETAIL_TABS_ENV, DEFAULT_TABS)))
+    except ValueError:
+        return DEFAULT_TABS
+
+
+def detail_url(confirmation_code):
+    return f"{AIRBNB_BASE_URL}/hosting/reservations/details/{confirmation_code}"
+
+
+def low_confidence(reservations):
+    """Kept reservations worth a detail page: doubtful and with a code to look up"""
+    return [
+        r for kind in ('checkouts', 'checkins') for r in reservations.get(kind, [])
+        if r.get('confidence', 1.0) < LOW_CONFIDENCE and r.get('confirmation_code')
+    ]
+
+
+@traced()
+def enrich_low_confidence(browser, parser, reservations, tabs=None):
+    """Re-read low-confidence reservations from their detail pages; returns corrected reservations"""
+    tabs = detail_tabs() if tabs is None else tabs
+    candidates = low_confidence(reservations)
+    if not candidates or tabs <= 0:
+        return reservations
+
+    print(f"🔎 {len(candidates)} low-confidence reservation(s) - reading detail pages, {tabs} tabs at a time")
+    started = time.perf_counter()
+    urls = {id(r): detail_url(r['confirmation_code']) for r in candidates}
+    try:
+        texts = browser.read_pages(list(dict.fromkeys(urls.values())), tabs, DETAIL_TEXT_JS)
+    except Exception as e:
+        # The card readings stand; a detail-page problem must not cost the run
+        print(f"⚠️ Detail pages unavailable, keeping the card readings: {e}")
+        metrics.inc('airbnb_detail_fetches_total', len(candidates), result='failed')
+        return reservations
+
+    enriched = {'checkouts': [], 'checkins': []}
+    counts = {'corrected': 0, 'confirmed': 0, 'dropped': 0, 'failed': 0}
+    for kind in ('checkouts', 'checkins'):
+        for reservation in reservations.get(kind, []):
+            if id(reservation) not in urls:
+                enriched[kind].append(reservation)
+                continue
+            text = texts.get(urls[id(reservation)])
+            detail = parser.parse_detail(text) if text else {}
+            if not detail:
+                # Keep the card's reading rather than lose the reservation
+                result = 'failed'
+                updated = reservation
+            else:
+                before = (reservation['type'], reservation['checkin_date'], reservation['checkout_date'],
+                          reservation['guest_count'], reservation['property_name'])
+                updated = parser.apply_detail(reservation, detail, text)
+                if updated is None:
+                    result = 'dropped'
+                    print(f"   ✂️ {reservation['confirmation_code']}: not tomorrow's per its detail page")
+                else:
+                    after = (updated['type'], updated['checkin_date'], updated['checkout_date'],
+                             updated['guest_count'], updated['property_name'])
+                    result = 'corrected' if after != before else 'confirmed'
+            counts[result] += 1
+            metrics.inc('airbnb_detail_fetches_total', result=result)
+            if updated is not None:
+                enriched[updated['type'] + 's'].append(updated)
+
+    print(f"   ✅ Details: {counts['corrected']} corrected, {counts['confirmed']} confirmed, "
+          f"{counts['dropped']} dropped, {counts['failed']} unreadable in {time.perf_counter() - started:.1f}s")
+    return enriched
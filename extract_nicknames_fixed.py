@@ -3,70 +3,38 @@
 Airbnb Property Nickname Extractor - FIXED PARSING VERSION
 Extracts nicknames directly from the listings table
 """
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException
+import argparse
 import time
-import os
-import json
 import re
 from datetime import datetime
+from artifact_archive import ArtifactArchive
+from capture_journal import CaptureJournal, prune_captures
+from region_map import RegionClassifier
+from airbnb_browser import AirbnbBrowser, add_run_arguments, is_interactive, settle, AIRBNB_BASE_URL, CSS_SELECTOR
+from run_profiling import profiled, profiler
+from run_checkpoint import listings_checkpoint
+from run_metrics import metrics, PAGE_WAIT_BUCKETS
+from run_trace import tracer, traced
+from session_precheck import require_login
 
-class PropertyNicknameExtractor:
-    def __init__(self):
-        self.driver = None
-        self.wait = None
+class PropertyNicknameExtractor(AirbnbBrowser):
+    def __init__(self, profile_dir=None, start_browser=True, backend=None):
+        # Uses same profile as main script
+        super().__init__(profile_dir, backend)
         self.properties = []
-        self.setup_driver()
-        
-    def setup_driver(self):
-        """Setup Brave browser driver"""
-        try:
-            chrome_options = Options()
-            chrome_options.add_argument("--start-maximized")
-            chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-            chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            chrome_options.add_experimental_option('useAutomationExtension', False)
-            
-            # Find Brave browser
-            brave_paths = [
-                r"C:\Program Files\BraveSoftware\Brave-Browser\Application\brave.exe",
-                r"C:\Program Files (x86)\BraveSoftware\Brave-Browser\Application\brave.exe",
-                r"C:\Users\{}\AppData\Local\BraveSoftware\Brave-Browser\Application\brave.exe".format(os.getenv('USERNAME'))
-            ]
-            
-            brave_path = None
-            for path in brave_paths:
-                if os.path.exists(path):
-                    brave_path = path
-                    break
-            
-            if brave_path:
-                chrome_options.binary_location = brave_path
-            
-            # Use same profile as main script
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            profile_dir = os.path.join(script_dir, "airbnb_brave_profile")
-            chrome_options.add_argument(f"--user-data-dir={profile_dir}")
-            chrome_options.add_argument("--profile-directory=Default")
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            self.wait = WebDriverWait(self.driver, 20)
-            print("✅ Browser setup successful")
-            
-        except Exception as e:
-            print(f"❌ Failed to setup browser: {e}")
-            raise
+        self.region_classifier = RegionClassifier()
+        if start_browser:
+            self.setup_driver()
     
+    @traced()
     def navigate_to_listings(self):
         """Navigate to listings page"""
         print("Navigating to listings page...")
-        self.driver.get("https://www.airbnb.com/hosting/listings")
-        time.sleep(5)
+        self.start_browser_if_needed()
+        started = time.perf_counter()
+        self.driver.get(f"{AIRBNB_BASE_URL}/hosting/listings")
+        settle(5)
+        metrics.observe('airbnb_page_wait_seconds', time.perf_counter() - started, PAGE_WAIT_BUCKETS, page='listings')
         
         # Check if we're logged in
         current_url = self.driver.current_url
@@ -77,51 +45,68 @@ class PropertyNicknameExtractor:
         print("✅ Successfully accessed listings page")
         return True
     
+    @traced()
     def extract_properties_from_table(self):
-        """Extract properties directly from the listings table"""
+        """Extract properties directly from the listings table (rows parsed by an interrupted run are not parsed again)
+
+        Rows that could not be read, or a table not read to the end, are counted in
+        read_errors; the caller must not save such a partial mapping
+        """
         print("Extracting properties from table...")
+        self.read_errors = 0
         
         # Wait for table to load
-        try:
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "tr")))
-            time.sleep(5)
-        except TimeoutException:
+        if not self.wait_for_css("tr"):
             print("❌ Timeout waiting for table to load")
             return []
+        settle(5)
         
         properties = []
+        prune_captures()
+        journal = CaptureJournal('listings', header={'script': type(self).__name__})
+        checkpoint = listings_checkpoint(self, datetime.now().date())
+        failed = 0
+        finished = False
         
         try:
             # Get all table rows
-            rows = self.driver.find_elements(By.CSS_SELECTOR, "tr")
+            rows = self.driver.find_elements(CSS_SELECTOR, "tr")
             print(f"Found {len(rows)} table rows")
             
             for i, row in enumerate(rows[1:], 1):  # Skip header row
                 try:
-                    row_text = row.text.strip()
+                    # Always read the row: an edited listing must not come from the checkpoint
+                    with tracer.span("read_row_text", row=i):
+                        row_text = row.text.strip()
                     if not row_text or len(row_text) < 20:
                         continue
                     
                     print(f"\n--- Processing row {i} ---")
                     print(f"Row text: {row_text[:150]}...")
                     
-                    # Parse the row text to extract title and nickname
-                    title, nickname, status = self.parse_row_text(row_text)
-                    
-                    print(f"  Parsed - Title: '{title}', Nickname: '{nickname}', Status: '{status}'")
-                    
-                    # Check if location contains Seoul - skip if it does
-                    is_seoul = self.is_seoul_location(row_text)
+                    done = checkpoint.row_of(row_text)
+                    if done:
+                        title, nickname, status, region = done['title'], done['nickname'], done['status'], done['region']
+                        print(f"  ♻️ From checkpoint - Title: '{title}', Nickname: '{nickname}', Status: '{status}'")
+                    else:
+                        # Parse the row text to extract title and nickname
+                        title, nickname, status = self.parse_row_text(row_text)
+                        
+                        print(f"  Parsed - Title: '{title}', Nickname: '{nickname}', Status: '{status}'")
+                        
+                        # Assign the region once per listing; it is stored with the mapping
+                        region = self.classify_region(row_text)
+                        checkpoint.record_row(row_text, title, nickname, status, region)
+                    journal.record_listing_row(i, row_text, title, nickname, status, region)
                     
-                    if is_seoul:
-                        print(f"❌ Skipped (Seoul location): {title or 'Unknown'}")
-                    elif title and nickname and status == "Listed":
+                    if title and nickname and status == "Listed":
                         properties.append({
                             'airbnb_name': title,
                             'internal_name': nickname,
-                            'status': status
+                            'status': status,
+                            'region': region
                         })
-                        print(f"✅ Added: '{title}' → '{nickname}'")
+                        print(f"✅ Added: '{title}' → '{nickname}' [{region}]")
                     elif status != "Listed":
                         print(f"❌ Skipped (Status: {status}): {title or 'Unknown'}")
                     else:
@@ -129,14 +114,27 @@ class PropertyNicknameExtractor:
                         
                 except Exception as e:
                     print(f"Error processing row {i}: {e}")
+                    failed += 1
                     continue
+            finished = True
         
         except Exception as e:
             print(f"Error extracting from table: {e}")
+        finally:
+            self.read_errors += failed + (0 if finished else 1)
+            journal.close({'listed': len(properties)})
+            if not finished:
+                checkpoint.keep("table not read to the end")
+            elif failed:
+                checkpoint.keep(f"{failed} row(s) could not be read")
+            else:
+                checkpoint.complete()
         
+        print(f"📼 Raw capture: {journal.path}")
         print(f"\n✅ Successfully extracted {len(properties)} LISTED properties")
         return properties
     
+    @traced()
     def parse_row_text(self, row_text):
         """Parse row text to extract title, nickname, and status"""
         # Fix line splitting - use proper newline character
@@ -188,16 +186,9 @@ class PropertyNicknameExtractor:
         
         return title, nickname, status
     
-    def is_seoul_location(self, row_text):
-        """Check if the property location is Seoul"""
-        row_lower = row_text.lower()
-        seoul_indicators = ['seoul', 'hongdae']
-        
-        for indicator in seoul_indicators:
-            if indicator in row_lower:
-                return True
-        
-        return False
+    def classify_region(self, row_text):
+        """Region of the listing from its row text (title + location)"""
+        return self.region_classifier.region_for(row_text)
     
     def looks_like_property_title(self, text):
         """Check if text looks like a property title"""
@@ -244,59 +235,46 @@ class PropertyNicknameExtractor:
         
         return True
     
+    @traced()
     def save_property_mapping(self):
         """Save property mappings to files"""
         if not self.properties:
             print("❌ No properties to save")
             return
         
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Save as JSON
-        json_file = os.path.join(script_dir, f"property_nicknames_{timestamp}.json")
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(self.properties, f, indent=2, ensure_ascii=False)
-        
-        # Save as TXT table
-        txt_file = os.path.join(script_dir, f"property_nicknames_{timestamp}.txt")
-        with open(txt_file, 'w', encoding='utf-8') as f:
-            f.write("AIRBNB PROPERTY NICKNAMES\n")
-            f.write("=" * 80 + "\n\n")
-            f.write(f"{'Airbnb Name':<50} | {'Internal Name':<25}\n")
-            f.write("-" * 80 + "\n")
-            
-            for prop in self.properties:
-                airbnb_name = prop['airbnb_name'][:49]  # Truncate if too long
-                internal_name = prop['internal_name'][:24]  # Truncate if too long
-                f.write(f"{airbnb_name:<50} | {internal_name:<25}\n")
+        # Human-readable table, kept alongside the data in the same record
+        table_lines = [
+            "AIRBNB PROPERTY NICKNAMES",
+            "=" * 80,
+            "",
+            f"{'Airbnb Name':<50} | {'Internal Name':<25} | Region",
+            "-" * 80
+        ]
+        for prop in self.properties:
+            airbnb_name = prop['airbnb_name'][:49]  # Truncate if too long
+            internal_name = prop['internal_name'][:24]  # Truncate if too long
+            table_lines.append(f"{airbnb_name:<50} | {internal_name:<25} | {prop['region']}")
         
-        # Save as Python dict for easy importing
-        py_file = os.path.join(script_dir, f"property_nicknames_{timestamp}.py")
-        with open(py_file, 'w', encoding='utf-8') as f:
-            f.write("# Airbnb Property Nicknames Mapping\n")
-            f.write(f"# Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write("PROPERTY_NICKNAMES = {\n")
-            for prop in self.properties:
-                f.write(f"    '{prop['airbnb_name']}': '{prop['internal_name']}',\n")
-            f.write("}\n\n")
-            f.write("def get_nickname(airbnb_name):\n")
-            f.write("    \"\"\"Get nickname for Airbnb property name\"\"\"\n")
-            f.write("    return PROPERTY_NICKNAMES.get(airbnb_name, airbnb_name[:15])\n")
+        # One archive record replaces the old JSON/TXT/PY trio
+        archive = ArtifactArchive()
+        archive.append('property_nicknames', {
+            'properties': self.properties,
+            'text': "\n".join(table_lines)
+        })
         
-        print(f"\n✅ Property mappings saved:")
-        print(f"  📄 TXT table: {txt_file}")
-        print(f"  📋 JSON data: {json_file}")
-        print(f"  🐍 Python dict: {py_file}")
+        print(f"\n✅ Property mappings archived in: {archive.root}")
+        print("   View again with: python artifact_archive.py latest property_nicknames")
         
         # Display results
         print(f"\n📊 EXTRACTED {len(self.properties)} PROPERTY NICKNAMES:")
         print("-" * 80)
         for prop in self.properties:
-            print(f"  {prop['airbnb_name'][:45]:<45} → {prop['internal_name']}")
+            print(f"  {prop['airbnb_name'][:45]:<45} → {prop['internal_name']} [{prop['region']}]")
     
-    def run(self):
-        """Main execution"""
+    def run(self, interactive=True):
+        """Main execution (interactive=False skips the closing prompt for unattended runs)"""
+        success = False
+        steps = {}
         try:
             print("=== AIRBNB PROPERTY NICKNAME EXTRACTOR - FIXED PARSING ===")
             
@@ -304,10 +282,22 @@ class PropertyNicknameExtractor:
                 return
             
             # Extract properties from table
+            profiler.checkpoint("before_scrape")
+            phase_start = time.perf_counter()
             self.properties = self.extract_properties_from_table()
+            steps['extract_listings'] = time.perf_counter() - phase_start
+            profiler.checkpoint("after_scrape")
+            metrics.inc('airbnb_listings_extracted_total', len(self.properties))
             
-            if self.properties:
+            if self.read_errors:
+                # A partial mapping would become the latest one every message uses
+                print(f"\n⚠️ PARTIAL READ: {self.read_errors} row(s) could not be read - mapping not saved. "
+                      f"Run again to resume from the checkpoint.")
+            elif self.properties:
+                phase_start = time.perf_counter()
                 self.save_property_mapping()
+                steps['archive'] = time.perf_counter() - phase_start
+                success = True
             else:
                 print("❌ No properties extracted")
                 
@@ -316,13 +306,23 @@ class PropertyNicknameExtractor:
             import traceback
             traceback.print_exc()
         finally:
-            input("\nPress Enter to close browser...")
-            if self.driver:
-                self.driver.quit()
+            if interactive:
+                input("\nPress Enter to close browser...")
+            self.close()
+            tracer.finish("extract_nicknames")
+            metrics.finish_run(success, steps)
+            metrics.write("extract_nicknames")
 
 def main():
-    extractor = PropertyNicknameExtractor()
-    extractor.run()
+    parser = add_run_arguments(argparse.ArgumentParser(description="Extract property nicknames from the listings table"))
+    args = parser.parse_args()
+    if args.trace:
+        tracer.enable()
+    if not require_login(skip=args.skip_precheck):
+        return
+    with profiled("extract_nicknames", args.profile):
+        extractor = PropertyNicknameExtractor(backend=args.backend)
+        extractor.run(interactive=is_interactive(args.no_wait))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Fixture Benchmark
+End-to-end throughput of the real scraping code (browser, session check,
+reservations page, card extraction, parsing, rendering) against the local
+fixture site. Needs Brave/Chrome and Selenium, but no network or login.
+
+    python fixture_benchmark.py --sizes 10,1000 --latency 0.1
+    python fixture_benchmark.py --sizes 1000 --page-size 50     # every page of the pager
+
+With --page-size the cards are read through the pager one page after
+another in one tab (ShardedReservationReader with one tab), so page loads
+count as extraction and there is no separate navigate step.
+"""
+import argparse
+import os
+import time
+from datetime import timedelta
+
+from fixture_site import DEFAULT_PORT, FixtureSite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline against the local fixture site")
+    parser.add_argument('--sizes', default="10,1000", help="comma-separated card counts (default: 10,1000)")
+    parser.add_argument('--page-size', type=int, default=0, help="cards per page (0 = one page); every page is read")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--settle-scale', type=float, default=0.0,
+                        help="multiplier for the scrapers' fixed page waits (default 0; 1 = production waits)")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--profile-dir', default="fixture_brave_profile",
+                        help="browser profile for the benchmark (kept apart from the real login)")
+    parser.add_argument('--backend', choices=('selenium', 'cdp'), default='selenium',
+                        help="browser backend: selenium (default) or cdp (DevTools websocket, no chromedriver)")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    site = FixtureSite(cards=sizes[0], page_size=args.page_size, latency=args.latency, port=args.port).start()
+
+    # The browser modules read these at import time
+    os.environ['AIRBNB_BASE_URL'] = site.url
+    os.environ['AIRBNB_SETTLE_SCALE'] = str(args.settle_scale)
+    from airbnb_daily_engine import AirbnbDailyEngine
+    from property_nickname_helper import PropertyNicknameHelper
+    from sharded_scrape import ShardedReservationReader
+
+    print(f"=== FIXTURE BENCHMARK against {site.url} ({args.backend}, latency {args.latency}s, settle x{args.settle_scale}) ===")
+    started = time.perf_counter()
+    engine = AirbnbDailyEngine(profile_dir=args.profile_dir, backend=args.backend)
+    browser_seconds = time.perf_counter() - started
+    engine.parser.set_verbose(False)
+
+    results = []
+    try:
+        for size in sizes:
+            site.configure(cards=size)
+            # The fixture's listings are the nickname mapping; tomorrow matches the generated stays
+            helper = PropertyNicknameHelper(properties=site.corpus.properties())
+            engine.nickname_helper = helper
+            engine.parser.nickname_helper = helper
+            engine.set_dates(site.corpus.tomorrow - timedelta(days=1))
+
+            timings = {}
+            phase_start = time.perf_counter()
+            if not engine.check_existing_session():
+                print("❌ Fixture session check failed")
+                return
+            timings['session_check'] = time.perf_counter() - phase_start
+
+            if args.page_size:
+                # Follows the pager: each page is loaded and read in turn
+                phase_start = time.perf_counter()
+                texts = list(ShardedReservationReader(engine, tabs=1).iter_texts())
+                timings['navigate'] = 0.0
+                timings['extract'] = time.perf_counter() - phase_start
+            else:
+                phase_start = time.perf_counter()
+                engine.navigate_to_reservations()
+                timings['navigate'] = time.perf_counter() - phase_start
+
+                phase_start = time.perf_counter()
+                texts = engine.extract_all_reservations_raw()
+                timings['extract'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            reservations = engine.parser.parse_reservations(texts)
+            timings['parse'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            engine.create_outputs(reservations)
+            timings['render'] = time.perf_counter() - phase_start
+
+            total = sum(timings.values())
+            results.append((size, len(texts), len(reservations['checkouts']) + len(reservations['checkins']), timings, total))
+    finally:
+        engine.close()
+        site.stop()
+
+    print(f"\nBrowser start: {browser_seconds:.2f}s")
+    print(f"{'Cards':>6} {'Read':>6} {'Kept':>5} {'session':>8} {'navigate':>9} {'extract':>8} {'parse':>7} {'render':>7} {'total':>7} {'cards/s':>8}")
+    print("-" * 84)
+    for size, read, kept, timings, total in results:
+        print(f"{size:>6} {read:>6} {kept:>5} {timings['session_check']:>8.2f} {timings['navigate']:>9.2f} "
+              f"{timings['extract']:>8.2f} {timings['parse']:>7.2f} {timings['render']:>7.2f} {total:>7.2f} "
+              f"{read / total if total else 0:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Fixture Site
+Local stand-in for the Airbnb hosting pages the scrapers read, built from
+the synthetic corpus, so the real Selenium code can run with no network:
+
+    /hosting                                   dashboard (or redirect to /login when logged out)
+    /hosting/reservations[/<status>][?page=N]  reservation cards; status is upcoming (default),
+                                               completed, canceled or all
+    /hosting/reservations/details/<code>       one reservation's labeled detail page
+    /hosting/listings                          listings table
+
+    python fixture_site.py --cards 1000 --listings 120 --page-size 50 --latency 0.2
+    AIRBNB_BASE_URL=http://127.0.0.1:8766 AIRBNB_SETTLE_SCALE=0 python airbnb_integrated_cleaner.py
+"""
+import argparse
+import html
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from synthetic_corpus import SyntheticCorpus
+
+DEFAULT_PORT = 8766
+
+# Which generated stays show under each reservations tab
+STATUS_SCENARIOS = {
+    'upcoming': {'checkin', 'checkout', 'in_stay', 'future'},
+    'completed': {'past'},
+    'canceled': set(),
+    'all': None
+}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title}</title></head>
+<body>
+<header><nav><a href="/hosting">Today</a> <a href="/hosting/reservations">Reservations</a> <a href="/hosting/listings">Listings</a></nav></header>
+<main id="hosting-content">
+{body}
+</main>
+</body>
+</html>
+"""
+
+
+def _lines_html(text):
+    return "".join(f"<div>{html.escape(line)}</div>" for line in text.split('\n'))
+
+
+class FixtureSite:
+    def __init__(self, cards=10, listings=60, page_size=0, latency=0.0, seed=42, logged_in=True,
+                 host='127.0.0.1', port=DEFAULT_PORT, tomorrow=None):
+        self.host = host
+        # None: the corpus' fixed day for the seed (benchmarks set the engine's dates from it)
+        self.tomorrow = tomorrow
+        self.port = port
+        self.latency = latency
+        self.logged_in = logged_in
+        self.server = None
+        self.thread = None
+        self.requests = 0
+        self.configure(cards=cards, listings=listings, page_size=page_size, seed=seed)
+
+    def configure(self, cards, listings=None, page_size=None, seed=None):
+        """Regenerate the corpus (e.g. to benchmark another card count on the same server)"""
+        self.seed = self.seed if seed is None else seed
+        self.page_size = self.page_size if page_size is None else page_size
+        listing_count = listings if listings is not None else len(self.corpus.listings)
+        self.corpus = SyntheticCorpus(seed=self.seed, tomorrow=self.tomorrow, listing_count=listing_count)
+        self.reservations = self.corpus.reservations(cards)
+        self.by_code = {r['confirmation_code']: r for r in self.reservations}
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def reservations_for(self, status):
+        scenarios = STATUS_SCENARIOS[status]
+        if scenarios is None:
+            return self.reservations
+        return [r for r in self.reservations if r['scenario'] in scenarios]
+
+    def render_reservations(self, status, page):
+        reservations = self.reservations_for(status)
+        total_pages = 1
+        if self.page_size:
+            total_pages = max(1, -(-len(reservations) // self.page_size))
+            reservations = reservations[(page - 1) * self.page_size:page * self.page_size]
+
+        tabs = " ".join(f'<a href="/hosting/reservations/{name}">{name.title()}</a>' for name in STATUS_SCENARIOS)
+        cards = "\n".join(
+            f'<div data-testid="reservation-card" data-code="{r["confirmation_code"]}">{_lines_html(r["text"])}</div>'
+            for r in reservations
+        )
+        pager = ""
+        if total_pages > 1:
+            links = " ".join(f'<a href="/hosting/reservations/{status}?page={n}">{n}</a>' for n in range(1, total_pages + 1))
+            if page < total_pages:
+                links += f' <a aria-label="Next" href="/hosting/reservations/{status}?page={page + 1}">Next</a>'
+            pager = f'<nav aria-label="Pagination">{links}</nav>'
+        body = f"<h1>Reservations</h1>\n<div>{tabs}</div>\n<section>\n{cards}\n</section>\n{pager}"
+        return PAGE_TEMPLATE.format(title="Reservations - Airbnb", body=body)
+
+    def render_detail(self, code):
+        reservation = self.by_code.get(code)
+        if not reservation:
+            return None
+        body = f'<section data-testid="reservation-detail">{_lines_html(self.corpus.detail_text(reservation))}</section>'
+        return PAGE_TEMPLATE.format(title="Reservation details - Airbnb", body=body)
+
+    def render_listings(self):
+        rows = ["<tr><th>Listing</th><th>Status</th><th>Instant Book</th><th>Location</th></tr>"]
+        for listing in self.corpus.listings:
+            rows.append(f"<tr><td>{_lines_html(listing['row_text'])}</td></tr>")
+        body = "<h1>Listings</h1>\n<table>\n" + "\n".join(rows) + "\n</table>"
+        return PAGE_TEMPLATE.format(title="Listings - Airbnb", body=body)
+
+    def render_dashboard(self):
+        body = f"<h1>Welcome back</h1>\n<p>{len(self.reservations)} reservations, {len(self.corpus.listings)} listings</p>"
+        return PAGE_TEMPLATE.format(title="Hosting - Airbnb", body=body)
+
+    def start(self):
+        """Serve on a background thread; port 0 picks a free port"""
+        site = self
+
+        class Handler(FixtureRequestHandler):
+            pass
+        Handler.site = site
+
+        self.server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+
+class FixtureRequestHandler(BaseHTTPRequestHandler):
+    site = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body="", location=None):
+        encoded = body.encode('utf-8')
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def do_GET(self):
+        site = self.site
+        site.requests += 1
+        if site.latency:
+            time.sleep(site.latency)
+
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split('/') if p]
+
+        if parts == ['login']:
+            return self._send(200, PAGE_TEMPLATE.format(title="Log in - Airbnb", body="<h1>Log in or sign up</h1>"))
+        if not parts or parts[0] != 'hosting':
+            return self._send(404, PAGE_TEMPLATE.format(title="Not found", body="<h1>Not found</h1>"))
+        if not site.logged_in:
+            return self._send(302, location=f"/login?redirect_url={self.path}")
+
+        if parts == ['hosting']:
+            return self._send(200, site.render_dashboard())
+        if parts == ['hosting', 'listings']:
+            return self._send(200, site.render_listings())
+        if parts[:3] == ['hosting', 'reservations', 'details'] and len(parts) == 4:
+            page = site.render_detail(parts[3])
+            if page is None:
+                return self._send(404, PAGE_TEMPLATE.format(title="Not found", body="<h1>Not found</h1>"))
+            return self._send(200, page)
+        if parts[:2] == ['hosting', 'reservations'] and len(parts) <= 3:
+            status = parts[2] if len(parts) == 3 else 'upcoming'
+            if status not in STATUS_SCENARIOS:
+                return self._send(404, PAGE_TEMPLATE.format(title="Not found", body="<h1>Not found</h1>"))
+            try:
+                page = max(1, int(parse_qs(url.query).get('page', ['1'])[0]))
+            except ValueError:
+                page = 1
+            return self._send(200, site.render_reservations(status, page))
+        return self._send(404, PAGE_TEMPLATE.format(title="Not found", body="<h1>Not found</h1>"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for the Airbnb hosting pages")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--cards', type=int, default=10, help="reservation cards to generate")
+    parser.add_argument('--listings', type=int, default=60, help="listings to generate")
+    parser.add_argument('--page-size', type=int, default=0, help="cards per page (0 = one page)")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--logged-out', action='store_true', help="redirect /hosting pages to /login")
+    args = parser.parse_args()
+
+    # The scrapers pointed at it go by the real clock
+    site = FixtureSite(cards=args.cards, listings=args.listings, page_size=args.page_size, latency=args.latency,
+                       seed=args.seed, logged_in=not args.logged_out, host=args.host, port=args.port,
+                       tomorrow=date.today() + timedelta(days=1))
+    site.start()
+    print(f"=== FIXTURE SITE on {site.url} ({args.cards} cards, {args.listings} listings, tomorrow {site.corpus.tomorrow}) ===")
+    print(f"   Point the scrapers at it: AIRBNB_BASE_URL={site.url} AIRBNB_SETTLE_SCALE=0")
+    try:
+        site.thread.join()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping fixture site...")
+    finally:
+        site.stop()
+
+
+if __name__ == "__main__":
+    main()
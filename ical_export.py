@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+iCal Export
+Publishes the cleaning schedule as subscribable calendars, one per cleaning
+team (region) and optionally one per property:
+
+    output/calendars/team/<region>.ics
+    output/calendars/property/<nickname>.ics
+
+Every "Out" and "In" is an all-day event on the cleaning day with a UID
+derived from the reservation (kind, property, stay dates), so calendar
+clients sync by diff. Each event is kept as its own fragment in
+output/calendars/events/; a run rewrites only the fragments whose content
+changed, deletes the ones that disappeared from that day, and re-streams
+only the calendars that contain a changed event.
+
+    AIRBNB_CALENDARS=team|property|both|off    (default: team)
+    python ical_export.py list
+    python ical_export.py rebuild
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timedelta, timezone
+
+from artifact_archive import DEFAULT_RETENTION_DAYS, atomic_write_text, file_lock
+from message_templates import format_short_date, get_template
+from region_map import region_settings
+
+CALENDARS_ENV = "AIRBNB_CALENDARS"
+CALENDAR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "calendars")
+UID_DOMAIN = "airbnb-automation-suite"
+PRODID = "-//airbnb-automation-suite//Cleaning Schedule//EN"
+
+
+def calendar_groupings():
+    value = (os.environ.get(CALENDARS_ENV) or 'team').lower()
+    if value == 'off':
+        return ()
+    if value == 'both':
+        return ('team', 'property')
+    return (value,) if value in ('team', 'property') else ('team',)
+
+
+def escape_text(value):
+    return (str(value).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def fold(line):
+    """RFC 5545: lines longer than 75 octets continue on the next line after a space"""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for ch in line:
+        width = len(ch.encode('utf-8'))
+        if size + width > limit:
+            parts.append(current)
+            current, size, limit = "", 0, 74
+        current += ch
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def slugify(value):
+    slug = re.sub(r"[^\w-]+", "_", str(value).strip().lower()).strip('_')
+    return slug or "unnamed"
+
+
+def event_uid(kind, reservation):
+    """Same reservation, same UID on every run"""
+    key = "|".join([kind, str(reservation.get('property_name')),
+                    str(reservation.get('checkin_date')), str(reservation.get('checkout_date'))])
+    return f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]}@{UID_DOMAIN}"
+
+
+class CalendarExport:
+    def __init__(self, region_config, root=None, groupings=None, retention_days=DEFAULT_RETENTION_DAYS):
+        self.region_config = region_config
+        self.root = root or CALENDAR_DIR
+        self.groupings = calendar_groupings() if groupings is None else groupings
+        self.retention_days = retention_days
+        self.events_dir = os.path.join(self.root, "events")
+        self.index_path = os.path.join(self.root, "index.json")
+        self.index = self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Calendar index unreadable, rebuilding: {e}")
+        return {'events': {}, 'calendars': {}}
+
+    def calendars_for(self, reservation):
+        """Calendar keys ('team/bali', 'property/v87') an event belongs to"""
+        keys = []
+        if 'team' in self.groupings:
+            keys.append(f"team/{slugify(reservation.get('region'))}")
+        if 'property' in self.groupings:
+            keys.append(f"property/{slugify(reservation.get('property_nickname') or reservation.get('property_name'))}")
+        return keys
+
+    def event_lines(self, kind, reservation, tomorrow):
+        """Body of one VEVENT (without DTSTAMP/SEQUENCE, which depend on history)"""
+        settings = region_settings(self.region_config, reservation.get('region'))
+        template = get_template(settings['language'])
+        nickname = reservation.get('property_nickname') or reservation.get('property_name')
+        style = template['date_style']
+        if kind == 'checkout':
+            summary = template['out'].format(properties=nickname)
+        else:
+            checkin = format_short_date(reservation.get('checkin_date'), style)
+            checkout = format_short_date(reservation.get('checkout_date'), style)
+            dates = f"{checkin}-{checkout}" if checkin and checkout else (checkin or "TBC")
+            summary = template['in'].format(nickname=nickname, guests=reservation.get('guest_count'), dates=dates)
+
+        description = [
+            f"Property: {reservation.get('property_name')}",
+            f"Guest: {reservation.get('guest_name')}",
+            f"People: {reservation.get('guest_count')}"
+        ]
+        if reservation.get('checkin_date') and reservation.get('checkout_date'):
+            description.append(f"Stay: {reservation['checkin_date']} to {reservation['checkout_date']}")
+
+        return [
+            f"DTSTART;VALUE=DATE:{tomorrow:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{tomorrow + timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{escape_text(summary)}",
+            f"DESCRIPTION:{escape_text(chr(10).join(description))}",
+            f"CATEGORIES:{'CHECKOUT' if kind == 'checkout' else 'CHECKIN'}",
+            "TRANSP:TRANSPARENT"
+        ]
+
+    def _fragment_path(self, uid):
+        return os.path.join(self.events_dir, f"{uid.split('@')[0]}.ics")
+
+    def _write_fragment(self, uid, lines, sequence):
+        stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+        text = "".join(fold(line) for line in
+                       ["BEGIN:VEVENT", f"UID:{uid}", f"DTSTAMP:{stamp}", f"SEQUENCE:{sequence}"] + lines + ["END:VEVENT"])
+        atomic_write_text(self._fragment_path(uid), text)
+
+    def publish(self, reservations, tomorrow, complete=True):
+        """Update the events of one cleaning day; re-stream only the calendars that changed
+
+        Events missing from `reservations` are deleted only when complete is True - an
+        incomplete scrape must not wipe the day from every subscribed calendar
+        """
+        if not self.groupings:
+            return None
+        with file_lock(self.index_path):
+            # Another process (daemon, message server refresh) may have published since we loaded
+            self.index = self._load_index()
+            return self._publish(reservations, tomorrow, complete)
+
+    def _publish(self, reservations, tomorrow, complete):
+        day = tomorrow.isoformat()
+        events = self.index['events']
+        stats = {'written': 0, 'unchanged': 0, 'removed': 0, 'calendars': 0}
+        dirty = set()
+        current = set()
+
+        for kind_key, kind in (('checkouts', 'checkout'), ('checkins', 'checkin')):
+            for reservation in reservations.get(kind_key, []):
+                uid = event_uid(kind, reservation)
+                if uid in current:
+                    continue
+                current.add(uid)
+                lines = self.event_lines(kind, reservation, tomorrow)
+                calendars = self.calendars_for(reservation)
+                digest = hashlib.sha1("\n".join(lines + calendars).encode('utf-8')).hexdigest()
+                entry = events.get(uid)
+                if entry and entry['digest'] == digest and os.path.exists(self._fragment_path(uid)):
+                    stats['unchanged'] += 1
+                    continue
+                sequence = entry['sequence'] + 1 if entry else 0
+                self._write_fragment(uid, lines, sequence)
+                dirty.update(calendars)
+                if entry:
+                    dirty.update(entry['calendars'])
+                events[uid] = {'date': day, 'digest': digest, 'sequence': sequence, 'calendars': calendars}
+                stats['written'] += 1
+
+        # Gone from this day (canceled, re-dated) or past the retention window
+        cutoff = (tomorrow - timedelta(days=self.retention_days)).isoformat() if self.retention_days else ""
+        for uid, entry in list(events.items()):
+            if (complete and entry['date'] == day and uid not in current) or entry['date'] < cutoff:
+                dirty.update(entry['calendars'])
+                del events[uid]
+                try:
+                    os.remove(self._fragment_path(uid))
+                except FileNotFoundError:
+                    pass
+                stats['removed'] += 1
+
+        for key in sorted(dirty):
+            self.assemble(key)
+            stats['calendars'] += 1
+        self._save_index()
+        return stats
+
+    def assemble(self, key):
+        """Stream one calendar from its fragments to a temp file, then swap it in"""
+        grouping, slug = key.split('/', 1)
+        path = os.path.join(self.root, grouping, f"{slug}.ics")
+        members = sorted((entry['date'], uid) for uid, entry in self.index['events'].items()
+                         if key in entry['calendars'])
+        if grouping == 'team':
+            name = region_settings(self.region_config, slug)['team']
+        else:
+            name = f"Cleaning - {slug}"
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as out:
+            out.write("".join(fold(line) for line in [
+                "BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+                "METHOD:PUBLISH", f"X-WR-CALNAME:{escape_text(name)}"
+            ]))
+            for _, uid in members:
+                try:
+                    with open(self._fragment_path(uid), 'r', encoding='utf-8', newline='') as fragment:
+                        shutil.copyfileobj(fragment, out)
+                except FileNotFoundError:
+                    continue
+            out.write("END:VCALENDAR\r\n")
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(tmp_path, path)
+        self.index['calendars'][key] = {'events': len(members), 'path': os.path.relpath(path, self.root)}
+        return path
+
+    def rebuild(self):
+        """Re-stream every calendar from the fragments on disk"""
+        with file_lock(self.index_path):
+            self.index = self._load_index()
+            return self._rebuild()
+
+    def _rebuild(self):
+        keys = sorted({key for entry in self.index['events'].values() for key in entry['calendars']})
+        for key in keys:
+            self.assemble(key)
+        self._save_index()
+        return keys
+
+    def _save_index(self):
+        atomic_write_text(self.index_path, json.dumps(self.index, indent=1, ensure_ascii=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cleaning schedule calendars (.ics)")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="calendars and their event counts")
+    sub.add_parser('rebuild', help="re-stream every calendar from its event fragments")
+    args = parser.parse_args()
+
+    from region_map import load_region_config
+
+    export = CalendarExport(load_region_config(), groupings=('team', 'property'))
+    if args.command == 'rebuild':
+        keys = export.rebuild()
+        print(f"✅ Rebuilt {len(keys)} calendar(s) in {export.root}")
+        return
+    if not export.index['calendars']:
+        print("⚠️ No calendars yet. They are published by airbnb_daily_engine.py runs.")
+        return
+    for key, info in sorted(export.index['calendars'].items()):
+        print(f"{key:<30} {info['events']:>5} events  {os.path.join(export.root, info['path'])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+iCal Source
+Builds tomorrow's checkouts/check-ins from Airbnb's per-listing calendar
+exports (.ics) instead of the reservations page - no browser, no waits, no
+text heuristics. Dates come straight from DTSTART/DTEND.
+
+Feeds are a directory of <nickname>.ics files, or ical_feeds.json:
+
+    [{"nickname": "v87", "url": "https://www.airbnb.com/calendar/ical/12345.ics?s=..."},
+     {"airbnb_name": "Serene Bamboo Villa with Pool", "url": "feeds/bamboo.ics"}]
+
+    python ical_source.py feeds/                       # messages for tomorrow
+    python ical_source.py ical_feeds.json --archive    # also archive + output/latest like the daily engine
+    python ical_source.py --benchmark 500              # load 500 synthetic feeds, report the time
+
+Airbnb's export has no guest name or guest count; the confirmation code
+stands in for the name and the count is shown as "?".
+"""
+import argparse
+import json
+import os
+import re
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+DEFAULT_FEEDS_FILE = "ical_feeds.json"
+DEFAULT_WORKERS = 32
+FETCH_TIMEOUT = 20
+
+# Calendar blocks, not stays
+BLOCKED_SUMMARIES = ('not available', 'blocked')
+
+UNKNOWN_GUEST_COUNT = '?'
+
+CONFIRMATION_CODE_RE = re.compile(r"\b(HM[A-Z0-9]{8})\b")
+
+
+def fetch_feed(location):
+    """Default fetcher: http(s) URLs with urllib, anything else as a local path"""
+    if location.startswith(('http://', 'https://')):
+        request = urllib.request.Request(location, headers={'User-Agent': 'airbnb-automation-suite'})
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            return response.read().decode('utf-8', errors='replace')
+    with open(location, 'r', encoding='utf-8', errors='replace') as f:
+        return f.read()
+
+
+def unescape(value):
+    return value.replace('\\n', '\n').replace('\\N', '\n').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\')
+
+
+def parse_ical_date(value):
+    """20250807 or 20250807T150000[Z] -> date"""
+    value = value.strip()
+    return date(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+
+
+def parse_events(text):
+    """Every VEVENT as {property: value}, with folded lines joined and parameters dropped"""
+    events = []
+    event = None
+    previous = None
+    for raw_line in text.splitlines():
+        # RFC 5545 folding: a leading space or tab continues the previous line
+        if raw_line[:1] in (' ', '\t') and event is not None and previous:
+            event[previous] += raw_line[1:]
+            continue
+        if raw_line == 'BEGIN:VEVENT':
+            event = {}
+            previous = None
+            continue
+        if raw_line == 'END:VEVENT':
+            if event is not None:
+                events.append(event)
+            event = None
+            continue
+        if event is None or ':' not in raw_line:
+            continue
+        name, value = raw_line.split(':', 1)
+        previous = name.split(';', 1)[0].upper()
+        event[previous] = value
+    return events
+
+
+def event_reservation(event):
+    """Reservation fields from one VEVENT, or None for blocks and malformed events"""
+    summary = unescape(event.get('SUMMARY', ''))
+    if any(word in summary.lower() for word in BLOCKED_SUMMARIES):
+        return None
+    try:
+        checkin = parse_ical_date(event['DTSTART'])
+        checkout = parse_ical_date(event['DTEND'])
+    except (KeyError, ValueError):
+        return None
+    description = unescape(event.get('DESCRIPTION', ''))
+    match = CONFIRMATION_CODE_RE.search(description)
+    return {
+        'uid': event.get('UID'),
+        'summary': summary,
+        'confirmation_code': match.group(1) if match else None,
+        'checkin_date': checkin,
+        'checkout_date': checkout
+    }
+
+
+def feed_name(feed):
+    return feed.get('nickname') or feed.get('airbnb_name') or feed['url']
+
+
+class IcalSource:
+    def __init__(self, nickname_helper, tomorrow, regions=None, fetcher=None, workers=DEFAULT_WORKERS):
+        self.nickname_helper = nickname_helper
+        self.tomorrow = tomorrow
+        self.regions = regions
+        self.fetcher = fetcher or fetch_feed
+        self.workers = workers
+        self.errors = []
+        # Feeds name their listing by nickname; the helper maps title -> nickname
+        self.titles_by_nickname = {}
+        for title, nickname in nickname_helper.get_all_nicknames().items():
+            self.titles_by_nickname.setdefault(nickname, title)
+
+    @staticmethod
+    def feeds_from_directory(directory):
+        """One feed per <nickname>.ics file"""
+        return [
+            {'nickname': os.path.splitext(name)[0], 'url': os.path.join(directory, name)}
+            for name in sorted(os.listdir(directory)) if name.lower().endswith('.ics')
+        ]
+
+    @staticmethod
+    def feeds_from_file(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            feeds = json.load(f)
+        base = os.path.dirname(os.path.abspath(path))
+        for feed in feeds:
+            url = feed['url']
+            if not url.startswith(('http://', 'https://')) and not os.path.isabs(url):
+                feed['url'] = os.path.join(base, url)
+        return feeds
+
+    def listing_for(self, feed):
+        """(airbnb title, nickname, region) of a feed"""
+        title = feed.get('airbnb_name')
+        nickname = feed.get('nickname')
+        if not title and nickname:
+            title = self.titles_by_nickname.get(nickname)
+        if title and not nickname:
+            nickname = self.nickname_helper.get_nickname(title)
+        nickname = nickname or title or feed['url']
+        region = self.nickname_helper.get_region(title) if title else self.nickname_helper.region_classifier.region_for(nickname)
+        return title or nickname, nickname, region
+
+    def _load_feed(self, feed):
+        try:
+            text = self.fetcher(feed['url'])
+        except Exception as e:
+            return feed, None, str(e)
+        return feed, parse_events(text), None
+
+    def load(self, feeds):
+        """Fetch and parse every feed concurrently; yields (feed, events); failures go to self.errors"""
+        self.errors = []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(feeds) or 1))) as pool:
+            for feed, events, error in pool.map(self._load_feed, feeds):
+                if error:
+                    self.errors.append((feed, error))
+                    print(f"⚠️ Feed {feed_name(feed)} failed: {error}")
+                    continue
+                yield feed, events
+
+    def get_tomorrows_reservations(self, feeds):
+        """Same shape as the scrapers' get_tomorrows_reservations, from calendar feeds"""
+        reservations = {'checkouts': [], 'checkins': []}
+        for feed, events in self.load(feeds):
+            title, nickname, region = self.listing_for(feed)
+            if self.regions is not None and region not in self.regions:
+                continue
+            for event in events:
+                stay = event_reservation(event)
+                if not stay:
+                    continue
+                if stay['checkout_date'] == self.tomorrow:
+                    kind, stay_type = 'checkouts', 'checkout'
+                elif stay['checkin_date'] == self.tomorrow:
+                    kind, stay_type = 'checkins', 'checkin'
+                else:
+                    continue
+                reservations[kind].append({
+                    'type': stay_type,
+                    'guest_name': stay['confirmation_code'] or stay['summary'] or "Reserved",
+                    'guest_count': UNKNOWN_GUEST_COUNT,
+                    'property_name': title,
+                    'property_nickname': nickname,
+                    'region': region,
+                    'checkin_date': stay['checkin_date'],
+                    'checkout_date': stay['checkout_date'],
+                    'confirmation_code': stay['confirmation_code'],
+                    'uid': stay['uid'],
+                    'source': 'ical'
+                })
+        return reservations
+
+
+def benchmark(feed_count, workers):
+    """Write feed_count synthetic Airbnb exports to a temp dir and time one full load"""
+    from property_nickname_helper import PropertyNicknameHelper
+    from synthetic_corpus import SyntheticCorpus
+
+    corpus = SyntheticCorpus(seed=7, listing_count=feed_count)
+    helper = PropertyNicknameHelper(properties=corpus.properties())
+    exports = corpus.ical_feeds(corpus.reservations(feed_count * 4))
+    with tempfile.TemporaryDirectory() as directory:
+        feeds = []
+        for i, (title, text) in enumerate(exports.items()):
+            path = os.path.join(directory, f"listing_{i}.ics")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            feeds.append({'airbnb_name': title, 'url': path})
+
+        source = IcalSource(helper, corpus.tomorrow, workers=workers)
+        started = time.perf_counter()
+        reservations = source.get_tomorrows_reservations(feeds)
+        elapsed = time.perf_counter() - started
+
+    print(f"\n=== ICAL BENCHMARK: {len(feeds)} feeds, {feed_count * 4} stays ===")
+    print(f"⏱️ {elapsed * 1000:.1f}ms ({len(feeds) / elapsed:.0f} feeds/s, {workers} workers) → "
+          f"{len(reservations['checkouts'])} checkouts, {len(reservations['checkins'])} check-ins tomorrow")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tomorrow's cleaning messages from Airbnb calendar exports")
+    parser.add_argument('feeds', nargs='?', default=DEFAULT_FEEDS_FILE,
+                        help=f"directory of <nickname>.ics files or a feeds JSON file (default: {DEFAULT_FEEDS_FILE})")
+    parser.add_argument('--tomorrow', type=date.fromisoformat, help="cleaning day (default: tomorrow)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS)
+    parser.add_argument('--archive', action='store_true', help="archive the messages and update output/latest")
+    parser.add_argument('--benchmark', type=int, metavar='FEEDS', help="time loading this many synthetic feeds")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.workers)
+        return
+
+    from airbnb_daily_engine import AirbnbDailyEngine
+
+    if os.path.isdir(args.feeds):
+        feeds = IcalSource.feeds_from_directory(args.feeds)
+    elif os.path.exists(args.feeds):
+        feeds = IcalSource.feeds_from_file(args.feeds)
+    else:
+        print(f"❌ No feeds at {args.feeds}. Export each listing's calendar from Airbnb (Availability → Sync calendars).")
+        return 1
+
+    engine = AirbnbDailyEngine(start_browser=False)
+    if args.tomorrow:
+        engine.set_dates(args.tomorrow - timedelta(days=1))
+    print(f"=== ICAL SOURCE: {len(feeds)} feeds for {engine.tomorrow} ===")
+
+    source = IcalSource(engine.nickname_helper, engine.tomorrow, engine.regions, workers=args.workers)
+    started = time.perf_counter()
+    reservations = source.get_tomorrows_reservations(feeds)
+    print(f"✅ {len(reservations['checkouts'])} checkouts, {len(reservations['checkins'])} check-ins "
+          f"from {len(feeds) - len(source.errors)} feeds in {(time.perf_counter() - started) * 1000:.0f}ms"
+          + (f" ({len(source.errors)} failed: {', '.join(feed_name(feed) for feed, _ in source.errors)})"
+             if source.errors else ""))
+
+    outputs = engine.create_outputs(reservations)
+    engine.print_region_messages(outputs['regions'])
+    print("\n" + "="*60)
+    print("WHATSAPP MESSAGE FOR CLEANER (ENGLISH):")
+    print("="*60)
+    print(outputs['english'])
+    print("="*60)
+
+    if args.archive and source.errors:
+        # Those listings' Out/In lines are missing, like a partial scrape
+        print(f"\n⚠️ PARTIAL READ: {len(source.errors)} feed(s) could not be loaded - messages not archived. "
+              f"Fix the feeds and run again.")
+        return 1
+    if args.archive:
+        archive = engine.archive_outputs(outputs, reservations)
+        latest_dir = engine.write_latest_outputs(outputs)
+        print(f"📁 Messages archived for {engine.tomorrow} in: {archive.root}")
+        print(f"📄 Latest copies: {latest_dir}")
+    print(f"   Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
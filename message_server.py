@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Message Server
+Small local HTTP endpoint serving cleaner messages from a TTL cache
+
+    GET /latest                      latest message of the default region
+    GET /latest/<region>             e.g. /latest/seoul, /latest/english
+    GET /messages/<YYYY-MM-DD>       message for a cleaning day (default region)
+    GET /messages/<YYYY-MM-DD>/<region>
+    GET /health                      cache and refresh status (JSON)
+
+Reads are served from memory; a stale entry is returned immediately while a
+background refresh runs (at most one scrape per TTL). Supports ETag /
+If-None-Match.
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from airbnb_browser import BACKENDS
+from artifact_archive import ArtifactArchive, format_record
+from region_map import load_region_config
+
+DEFAULT_TTL_SECONDS = 15 * 60
+DEFAULT_PORT = 8765
+
+
+def message_kind(region):
+    """Archive kind for a region name ('english' is the English schedule)"""
+    return "cleaner_message_english" if region == 'english' else f"cleaner_message_{region}"
+
+
+def etag_matches(if_none_match, etag):
+    """True when an If-None-Match header (a list, weak tags or '*') covers etag"""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+class CacheEntry:
+    __slots__ = ('body', 'etag', 'loaded_at', 'archived_at')
+
+    def __init__(self, body, archived_at=None):
+        self.body = body
+        self.etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        self.loaded_at = time.monotonic()
+        self.archived_at = archived_at
+
+
+class PipelineRefresher:
+    """Runs the daily engine on one background thread, at most once per TTL"""
+
+    def __init__(self, ttl_seconds, profile_dir=None, backend=None):
+        self.ttl_seconds = ttl_seconds
+        self.profile_dir = profile_dir
+        self.backend = backend
+        # The browser must only ever be driven from one thread
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline")
+        self.lock = threading.Lock()
+        self.running = False
+        self.last_started = None
+        self.last_result = None
+        self.engine = None
+
+    def maybe_refresh(self, on_done):
+        """Start a scrape unless one is running or one started within the TTL"""
+        with self.lock:
+            now = time.monotonic()
+            if self.running:
+                return False
+            if self.last_started is not None and now - self.last_started < self.ttl_seconds:
+                return False
+            self.running = True
+            self.last_started = now
+        self.executor.submit(self._refresh, on_done)
+        return True
+
+    def _refresh(self, on_done):
+        started = time.perf_counter()
+        try:
+            if self.engine is None:
+                from airbnb_daily_engine import AirbnbDailyEngine
+                self.engine = AirbnbDailyEngine(profile_dir=self.profile_dir, start_browser=False, backend=self.backend)
+            self.engine.nickname_helper.refresh()
+            self.engine.set_dates()
+            self.engine.ensure_driver()
+            result = self.engine.run_pipeline()
+            self.last_result = {'status': result['status'], 'seconds': round(time.perf_counter() - started, 2),
+                                'finished': datetime.now().isoformat(timespec='seconds')}
+        except Exception as e:
+            self.last_result = {'status': 'error', 'error': str(e),
+                                'finished': datetime.now().isoformat(timespec='seconds')}
+            if self.engine:
+                try:
+                    self.engine.close()
+                except Exception:
+                    self.engine.driver = None
+        finally:
+            with self.lock:
+                self.running = False
+            on_done()
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.engine:
+            self.engine.close()
+
+
+class MessageCache:
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, refresher=None):
+        self.ttl_seconds = ttl_seconds
+        self.refresher = refresher
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.archive_lock = threading.Lock()
+        self.reloading = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load_from_archive(self, kind, day):
+        """Read one record via the archive index (no directory scan)"""
+        with self.archive_lock:
+            record = ArtifactArchive().latest(kind, day)
+        if not record:
+            return None
+        header = f"# {record['date']} (archived {record['timestamp']})\n"
+        return CacheEntry((header + format_record(record)).encode('utf-8'), record['timestamp'])
+
+    def get(self, kind, day=None):
+        """Cached entry; stale entries are served while a refresh runs in the background"""
+        key = (kind, day)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            if time.monotonic() - entry.loaded_at > self.ttl_seconds:
+                self._refresh_in_background()
+            return entry
+
+        self.misses += 1
+        entry = self._load_from_archive(kind, day)
+        if entry is not None:
+            with self.lock:
+                self.entries[key] = entry
+        elif day is None:
+            # Nothing archived yet - a scrape is the only way to get an answer
+            self._refresh_in_background()
+        return entry
+
+    def _refresh_in_background(self):
+        """Scrape if the refresher allows it, otherwise just re-read the archive (single-flight)"""
+        if self.refresher and self.refresher.maybe_refresh(self.reload):
+            return
+        with self.lock:
+            if self.reloading:
+                return
+            self.reloading = True
+        threading.Thread(target=self._reload_once, daemon=True).start()
+
+    def _reload_once(self):
+        try:
+            self.reload()
+        finally:
+            with self.lock:
+                self.reloading = False
+
+    def reload(self):
+        """Re-read every cached key from the archive after new results land"""
+        for kind, day in list(self.entries):
+            entry = self._load_from_archive(kind, day)
+            with self.lock:
+                if entry is not None:
+                    self.entries[(kind, day)] = entry
+                else:
+                    self.entries.pop((kind, day), None)
+
+    def status(self):
+        return {
+            'ttl_seconds': self.ttl_seconds,
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'refresh': None if not self.refresher else {
+                'running': self.refresher.running,
+                'last_result': self.refresher.last_result
+            }
+        }
+
+
+class MessageRequestHandler(BaseHTTPRequestHandler):
+    cache = None
+    default_region = 'bali'
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; one line per request is noise at this volume
+        pass
+
+    def _send(self, status, body=b"", content_type="text/plain; charset=utf-8", etag=None, max_age=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if max_age is not None:
+            self.send_header("Cache-Control", f"max-age={max(0, int(max_age))}")
+        if status != 304:
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if status != 304 and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def do_GET(self):
+        parts = [p for p in urlparse(self.path).path.split('/') if p]
+
+        if parts == ['health']:
+            body = json.dumps(self.cache.status(), indent=2).encode('utf-8')
+            return self._send(200, body, "application/json")
+
+        if parts and parts[0] == 'latest' and len(parts) <= 2:
+            day = None
+            region = parts[1] if len(parts) == 2 else self.default_region
+        elif parts and parts[0] == 'messages' and len(parts) in (2, 3):
+            day = parts[1]
+            region = parts[2] if len(parts) == 3 else self.default_region
+            try:
+                datetime.strptime(day, '%Y-%m-%d')
+            except ValueError:
+                return self._send(400, b"Date must be YYYY-MM-DD\n")
+        else:
+            return self._send(404, b"Try /latest, /latest/<region>, /messages/<YYYY-MM-DD>[/<region>] or /health\n")
+
+        entry = self.cache.get(message_kind(region), day)
+        if entry is None:
+            return self._send(404, f"No message archived for {region}{' on ' + day if day else ''}\n".encode('utf-8'))
+
+        max_age = self.cache.ttl_seconds - (time.monotonic() - entry.loaded_at)
+        if etag_matches(self.headers.get("If-None-Match"), entry.etag):
+            return self._send(304, etag=entry.etag, max_age=max_age)
+        return self._send(200, entry.body, etag=entry.etag, max_age=max_age)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve cached cleaner messages over HTTP")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--ttl', type=int, default=DEFAULT_TTL_SECONDS, help="cache TTL in seconds")
+    parser.add_argument('--no-scrape', action='store_true',
+                        help="never start the browser; only re-read the archive when stale")
+    parser.add_argument('--profile-dir', help="browser profile directory (default: airbnb_brave_profile)")
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help="browser backend: selenium (default) or cdp (DevTools websocket, no chromedriver)")
+    args = parser.parse_args()
+
+    refresher = None if args.no_scrape else PipelineRefresher(args.ttl, profile_dir=args.profile_dir,
+                                                                  backend=args.backend)
+    MessageRequestHandler.cache = MessageCache(args.ttl, refresher)
+    MessageRequestHandler.default_region = load_region_config().get('default_region') or 'bali'
+
+    server = ThreadingHTTPServer((args.host, args.port), MessageRequestHandler)
+    print(f"=== MESSAGE SERVER on http://{args.host}:{args.port} (TTL {args.ttl}s"
+          f"{', archive only' if args.no_scrape else ''}) ===")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping server...")
+    finally:
+        server.server_close()
+        if refresher:
+            refresher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
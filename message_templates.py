@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Message Templates
+Cleaner message rendering per language, shared by every region
+"""
+from datetime import datetime
+
+# Each region in regions.json picks one of these with "language"
+MESSAGE_TEMPLATES = {
+    'id': {
+        'name': 'Indonesian',
+        'heading': "PESAN UNTUK CLEANER {region_upper} (INDONESIAN):",
+        'title': "Pesan Cleaner {region} - {date_long}",
+        'out': "Out: {properties}",
+        'in': "In: {nickname}, {guests} orang, {dates}",
+        'empty': "Besok tidak ada checkout atau checkin di {region} ({date})",
+        'date_style': 'day_month',
+        'route_title': "Jadwal {team} - {date}:",
+        'stop_turnover': "{n}. {nickname} - Out + In ({guests} orang, {dates}) - HARI YANG SAMA",
+        'stop_out': "{n}. {nickname} - Out",
+        'stop_in': "{n}. {nickname} - In ({guests} orang, {dates})",
+        'route_empty': "Besok tidak ada tugas untuk {team} ({date})",
+        'unassigned': "Belum ada tim: {properties}"
+    },
+    'en': {
+        'name': 'English',
+        'heading': "MESSAGE FOR {region_upper} CLEANERS (ENGLISH):",
+        'title': "Cleaner Message {region} - {date_long}",
+        'out': "Out: {properties}",
+        'in': "In: {nickname}, {guests} people, {dates}",
+        'empty': "No checkouts or check-ins in {region} tomorrow ({date})",
+        'date_style': 'month_day',
+        'route_title': "{team} route - {date}:",
+        'stop_turnover': "{n}. {nickname} - Out + In ({guests} people, {dates}) - SAME DAY",
+        'stop_out': "{n}. {nickname} - Out",
+        'stop_in': "{n}. {nickname} - In ({guests} people, {dates})",
+        'route_empty': "No jobs for {team} tomorrow ({date})",
+        'unassigned': "No team yet: {properties}"
+    },
+    'ko': {
+        'name': 'Korean',
+        'heading': "{region_upper} 청소팀 메시지 (KOREAN):",
+        'title': "청소 메시지 {region} - {date_long}",
+        'out': "체크아웃: {properties}",
+        'in': "체크인: {nickname}, {guests}명, {dates}",
+        'empty': "내일 {region} 체크아웃/체크인 없음 ({date})",
+        'date_style': 'numeric',
+        'route_title': "{team} 일정 - {date}:",
+        'stop_turnover': "{n}. {nickname} - 체크아웃 + 체크인 ({guests}명, {dates}) - 당일",
+        'stop_out': "{n}. {nickname} - 체크아웃",
+        'stop_in': "{n}. {nickname} - 체크인 ({guests}명, {dates})",
+        'route_empty': "내일 {team} 작업 없음 ({date})",
+        'unassigned': "미배정: {properties}"
+    }
+}
+
+
+def format_short_date(date_obj, style='day_month'):
+    """'7Aug' (day_month), 'Aug 7' (month_day) or '8/7' (numeric) - no leading zeros"""
+    if not date_obj:
+        return None
+
+    if style == 'month_day':
+        return f"{date_obj.strftime('%b')} {date_obj.day}"
+    if style == 'numeric':
+        return f"{date_obj.month}/{date_obj.day}"
+    return f"{date_obj.day}{date_obj.strftime('%b')}"
+
+
+def get_template(language):
+    """Template for a language code, falling back to Indonesian"""
+    return MESSAGE_TEMPLATES.get(language) or MESSAGE_TEMPLATES['id']
+
+
+def render_cleaner_message(reservations, tomorrow, language='id', region_name='Bali'):
+    """Render the short Out/In message for one region"""
+    template = get_template(language)
+    style = template['date_style']
+    messages = []
+
+    # Process checkouts - use property nicknames only
+    if reservations['checkouts']:
+        out_properties = [res['property_nickname'] for res in reservations['checkouts']]
+        if out_properties:
+            messages.append(template['out'].format(properties=", ".join(out_properties)))
+
+    # Process check-ins - use property nicknames and the template's date format
+    for res in reservations['checkins']:
+        checkin_str = format_short_date(res.get('checkin_date', tomorrow), style)
+        checkout_str = format_short_date(res.get('checkout_date'), style)
+
+        # Only show date range if we have both dates
+        if checkin_str and checkout_str:
+            date_range = f"{checkin_str}-{checkout_str}"
+        elif checkin_str:
+            date_range = checkin_str
+        else:
+            date_range = "TBC"
+
+        messages.append(template['in'].format(
+            nickname=res['property_nickname'], guests=res['guest_count'], dates=date_range
+        ))
+
+    if messages:
+        return "\n".join(messages)
+    return template['empty'].format(region=region_name, date=format_short_date(tomorrow, style))
+
+
+def render_message_file(message, tomorrow, language='id', region_name='Bali'):
+    """Full text of the saved message: title, separator, message, generated time"""
+    template = get_template(language)
+    title = template['title'].format(region=region_name, date_long=tomorrow.strftime('%d %B %Y'))
+    return (
+        f"{title}\n"
+        + "="*50 + "\n\n"
+        + message
+        + f"\n\nGenerated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    )
+
+
+def render_heading(language='id', region_name='Bali'):
+    """Console heading printed above a region's message"""
+    return get_template(language)['heading'].format(region_upper=region_name.upper())
+
+
+def split_by_region(reservations, regions=None):
+    """Bucket parsed reservations by their precomputed 'region' field"""
+    buckets = {}
+    for region in regions or []:
+        buckets[region] = {'checkouts': [], 'checkins': []}
+
+    for kind in ('checkouts', 'checkins'):
+        for res in reservations[kind]:
+            region = res.get('region')
+            if regions is not None and region not in buckets:
+                continue
+            buckets.setdefault(region, {'checkouts': [], 'checkins': []})[kind].append(res)
+
+    return buckets
+
+
+def render_english_schedule(reservations, tomorrow):
+    """Detailed English WhatsApp schedule (property, guest, people, stay) for all regions"""
+    tomorrow_str = tomorrow.strftime("%B %d, %Y")
+
+    message = f"🏠 Cleaning Schedule - {tomorrow_str}\n\n"
+
+    sections = [
+        ('checkouts', "📤 TOMORROW'S CHECKOUTS:\n", "Checkout"),
+        ('checkins', "📥 TOMORROW'S CHECK-INS:\n", "Check-in")
+    ]
+    for kind, heading, single_label in sections:
+        if not reservations[kind]:
+            continue
+        message += heading
+        for res in reservations[kind]:
+            message += f"• {res['property_name']}\n"
+            message += f"  Guest: {res['guest_name']}\n"
+            message += f"  People: {res['guest_count']}\n"
+
+            if res.get('checkin_date') and res.get('checkout_date'):
+                checkin = res['checkin_date'].strftime('%b %d')
+                checkout = res['checkout_date'].strftime('%b %d')
+                nights = (res['checkout_date'] - res['checkin_date']).days
+                message += f"  Stay: {checkin} to {checkout} ({nights} nights)\n\n"
+            else:
+                message += f"  {single_label}: {tomorrow.strftime('%b %d')}\n\n"
+
+    if not reservations['checkouts'] and not reservations['checkins']:
+        message += "No check-ins or check-outs scheduled for tomorrow.\n\n"
+
+    message += f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    return message
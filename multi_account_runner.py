@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Multi-Account Runner
+Scrapes several host accounts in parallel worker processes, one browser
+profile per account, and merges everything into one cleaner message per region
+"""
+import argparse
+import contextlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from airbnb_browser import BACKENDS
+from airbnb_integrated_cleaner import AirbnbIndonesianAutomation
+from session_precheck import precheck_session
+
+DEFAULT_CONCURRENCY = 3
+
+
+def load_accounts(accounts_file=None):
+    """Load accounts.json: [{"name": "...", "profile_dir": "..."}]"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    accounts_file = accounts_file or os.path.join(script_dir, "accounts.json")
+
+    if not os.path.exists(accounts_file):
+        print(f"⚠️ {accounts_file} not found - using the default profile only")
+        return [{'name': 'default', 'profile_dir': 'airbnb_brave_profile'}]
+
+    with open(accounts_file, 'r', encoding='utf-8') as f:
+        accounts = json.load(f)
+
+    profile_dirs = set()
+    for account in accounts:
+        if 'name' not in account:
+            raise ValueError(f"Account entry without a name: {account}")
+        account.setdefault('profile_dir', f"airbnb_brave_profile_{account['name']}")
+        # Two browsers can't share a user-data-dir
+        if account['profile_dir'] in profile_dirs:
+            raise ValueError(f"Profile directory used by more than one account: {account['profile_dir']}")
+        profile_dirs.add(account['profile_dir'])
+
+    return accounts
+
+
+def run_account(account, backend=None):
+    """Worker process: scrape one account with its own browser profile"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    log_dir = os.path.join(script_dir, "output", "accounts")
+    os.makedirs(log_dir, exist_ok=True)
+    log_file = os.path.join(log_dir, f"{account['name']}.log")
+
+    result = {
+        'account': account['name'],
+        'status': 'error',
+        'error': None,
+        'timings': {},
+        'reservations': {'checkouts': [], 'checkins': []},
+        'log_file': log_file
+    }
+    started = time.perf_counter()
+
+    # Keep the per-reservation output of each worker out of the shared console
+    with open(log_file, 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        automation = None
+        try:
+            # An expired login is found from the cookie store, before a browser starts
+            precheck = precheck_session(account['profile_dir'])
+            result['timings']['precheck'] = precheck['seconds']
+            print(f"Login precheck: {precheck['status']} - {precheck['reason']}")
+            if precheck['status'] == 'relogin_needed':
+                result['status'] = 'not_logged_in'
+                result['error'] = precheck['reason']
+                return result
+
+            phase_start = time.perf_counter()
+            automation = AirbnbIndonesianAutomation(profile_dir=account['profile_dir'], backend=backend)
+            result['timings']['browser_start'] = time.perf_counter() - phase_start
+
+            phase_start = time.perf_counter()
+            logged_in = automation.check_existing_session()
+            result['timings']['session_check'] = time.perf_counter() - phase_start
+
+            if not logged_in:
+                result['status'] = 'not_logged_in'
+                return result
+
+            phase_start = time.perf_counter()
+            reservations = automation.get_tomorrows_reservations()
+            result['timings']['reservations'] = time.perf_counter() - phase_start
+
+            for kind in ('checkouts', 'checkins'):
+                for res in reservations[kind]:
+                    res['account'] = account['name']
+            result['reservations'] = reservations
+            # Labelled in the summary and the archived account list
+            result['status'] = 'partial' if automation.read_errors else 'ok'
+
+        except Exception as e:
+            result['error'] = str(e)
+            import traceback
+            traceback.print_exc()
+        finally:
+            if automation:
+                automation.close()
+            result['timings']['total'] = time.perf_counter() - started
+
+    return result
+
+
+class MultiAccountOrchestrator:
+    def __init__(self, accounts, concurrency=DEFAULT_CONCURRENCY, backend=None):
+        self.accounts = accounts
+        self.backend = backend
+        self.concurrency = max(1, min(concurrency, len(accounts)))
+        # Only used for rendering - no browser in the parent process
+        self.renderer = AirbnbIndonesianAutomation(start_browser=False)
+
+    def run_accounts(self):
+        """Run every account with at most `concurrency` browsers at once"""
+        results = []
+        with ProcessPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(run_account, account, self.backend): account for account in self.accounts}
+            for future in as_completed(futures):
+                account = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {
+                        'account': account['name'], 'status': 'error', 'error': str(e),
+                        'timings': {}, 'reservations': {'checkouts': [], 'checkins': []}
+                    }
+                status_icon = "✅" if result['status'] == 'ok' else "❌"
+                print(f"{status_icon} {result['account']}: {result['status']} "
+                      f"({result['timings'].get('total', 0):.1f}s)")
+                results.append(result)
+
+        # Stable order for the summary regardless of completion order
+        order = {account['name']: i for i, account in enumerate(self.accounts)}
+        results.sort(key=lambda r: order.get(r['account'], len(order)))
+        return results
+
+    def merge_reservations(self, results):
+        """Merge all accounts, dropping reservations visible from more than one account"""
+        merged = {'checkouts': [], 'checkins': []}
+        seen = set()
+        for result in results:
+            for kind in ('checkouts', 'checkins'):
+                for res in result['reservations'][kind]:
+                    key = (kind, res.get('property_name'), res.get('guest_name'),
+                           res.get('checkin_date'), res.get('checkout_date'))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    merged[kind].append(res)
+        return merged
+
+    def format_summary(self, results, wall_time):
+        """Per-account timing table"""
+        lines = [f"{'Account':<20} {'Status':<14} {'Browser':>8} {'Session':>8} {'Scrape':>8} {'Total':>8} {'Out':>4} {'In':>4}"]
+        for result in results:
+            t = result['timings']
+            lines.append(
+                f"{result['account'][:20]:<20} {result['status']:<14} "
+                f"{t.get('browser_start', 0):>7.1f}s {t.get('session_check', 0):>7.1f}s "
+                f"{t.get('reservations', 0):>7.1f}s {t.get('total', 0):>7.1f}s "
+                f"{len(result['reservations']['checkouts']):>4} {len(result['reservations']['checkins']):>4}"
+            )
+        sequential = sum(r['timings'].get('total', 0) for r in results)
+        lines.append(f"Wall clock: {wall_time:.1f}s (sequential would be ~{sequential:.1f}s, "
+                     f"concurrency {self.concurrency})")
+        return "\n".join(lines)
+
+    def run(self):
+        """Main execution"""
+        print("=== AIRBNB MULTI-ACCOUNT CLEANER AUTOMATION ===")
+        print(f"Tomorrow: {self.renderer.tomorrow}")
+        print(f"Accounts: {', '.join(a['name'] for a in self.accounts)} (concurrency {self.concurrency})")
+
+        started = time.perf_counter()
+        results = self.run_accounts()
+        wall_time = time.perf_counter() - started
+
+        merged = self.merge_reservations(results)
+        region_messages = self.renderer.create_region_messages(merged)
+        summary = self.format_summary(results, wall_time)
+
+        self.renderer.print_region_messages(region_messages)
+        print("\n⏱️ PER-ACCOUNT TIMING:")
+        print(summary)
+
+        failed = [r for r in results if r['status'] != 'ok']
+        for result in failed:
+            print(f"⚠️ {result['account']}: {result['status']} {result.get('error') or ''} "
+                  f"- see {result.get('log_file', 'worker log')}")
+        if failed:
+            # The merged messages lack those accounts' cleanings
+            print(f"\n⚠️ {len(failed)} of {len(results)} account(s) did not finish - messages not archived. "
+                  f"Run again once they are fixed.")
+            return merged
+
+        archive = self.renderer.archive_region_messages(region_messages, extra={
+            'accounts': [
+                {'account': r['account'], 'status': r['status'], 'timings': r['timings']}
+                for r in results
+            ]
+        })
+        print(f"\n📁 Messages archived for {self.renderer.tomorrow} in: {archive.root}")
+
+        return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run several Airbnb host accounts in parallel")
+    parser.add_argument('--accounts', help="accounts JSON file (default: accounts.json next to the scripts)")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"max browsers running at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument('--backend', choices=BACKENDS,
+                        help="browser backend: selenium (default) or cdp (DevTools websocket, no chromedriver)")
+    args = parser.parse_args()
+
+    orchestrator = MultiAccountOrchestrator(load_accounts(args.accounts), concurrency=args.concurrency,
+                                            backend=args.backend)
+    orchestrator.run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Page Fingerprint
+One in-page script call hashes the reservations page (confirmation code plus
+status of every card) so a repeat run can tell the page has not changed
+without reading each card's text over WebDriver.
+
+When the fingerprint, tomorrow's date and the parsing context (regions,
+nickname mapping, parser version) all match the last stored run, the parsed
+reservations are taken from the archive and extraction and parsing are
+skipped. Any difference - a new booking, a status change, a new mapping or
+a parser fix - means a full scrape.
+"""
+import hashlib
+import json
+import os
+from datetime import date
+
+from artifact_archive import ArtifactArchive
+from run_metrics import metrics
+
+ARCHIVE_KIND = "reservations_page"
+
+# Set to 1 to always scrape and parse every card (a fresh capture)
+FULL_SCRAPE_ENV = "AIRBNB_FULL_SCRAPE"
+
+# Runs in the page: one key per card, hashed there (cyrb53) so only a few bytes come back
+FINGERPRINT_JS = r"""
+const selectors = arguments[0], minLength = arguments[1];
+const seen = new Set();
+let coded = 0, h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+for (const el of document.querySelectorAll(selectors.join(','))) {
+    const text = (el.innerText || '').trim();
+    if (text.length <= minLength) continue;
+    const match = text.match(/\bHM[A-Z0-9]{8}\b/);
+    const code = el.getAttribute('data-code') || (match ? match[0] : '');
+    // Cards without a visible code fall back to their full text
+    const key = code ? code + '|' + text.split('\n', 1)[0] : text;
+    if (seen.has(key)) continue;
+    seen.add(key);
+    if (code) coded++;
+    for (let i = 0; i < key.length; i++) {
+        const ch = key.charCodeAt(i);
+        h1 = Math.imul(h1 ^ ch, 2654435761);
+        h2 = Math.imul(h2 ^ ch, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ 10, 2654435761);
+}
+h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+const digest = (h2 >>> 0).toString(16).padStart(8, '0') + (h1 >>> 0).toString(16).padStart(8, '0');
+return {cards: seen.size, coded: coded, digest: digest};
+"""
+
+DATE_FIELDS = ('checkin_date', 'checkout_date')
+
+_parser_digest = None
+
+
+def parser_digest():
+    """sha1 of reservation_parser.py, so a parser change invalidates stored results"""
+    global _parser_digest
+    if _parser_digest is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reservation_parser.py")
+        with open(path, 'rb') as f:
+            _parser_digest = hashlib.sha1(f.read()).hexdigest()
+    return _parser_digest
+
+
+def parse_context(parser):
+    """Everything besides the page that decides the parse result"""
+    mapping = json.dumps(parser.nickname_helper.snapshot(), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1("\n".join([
+        parser.tomorrow.isoformat(),
+        json.dumps(parser.regions),
+        hashlib.sha1(mapping.encode('utf-8')).hexdigest(),
+        parser_digest()
+    ]).encode('utf-8')).hexdigest()
+
+
+def _restore_dates(reservations):
+    for kind in ('checkouts', 'checkins'):
+        for reservation in reservations.get(kind, []):
+            for field in DATE_FIELDS:
+                if isinstance(reservation.get(field), str):
+                    reservation[field] = date.fromisoformat(reservation[field])
+    return reservations
+
+
+class PageFingerprintCache:
+    def __init__(self, archive=None):
+        self.archive = archive or ArtifactArchive()
+
+    def lookup(self, fingerprint, parser):
+        """Stored run for an unchanged page and context, or None"""
+        if not fingerprint:
+            metrics.inc('airbnb_page_fingerprint_total', result='unavailable')
+            return None
+        if os.environ.get(FULL_SCRAPE_ENV, '') not in ('', '0'):
+            return None
+        record = self.archive.latest(ARCHIVE_KIND, for_date=parser.tomorrow)
+        payload = record['payload'] if record else None
+        if (not payload or payload.get('digest') != fingerprint['digest']
+                or payload.get('cards') != fingerprint['cards']
+                or payload.get('context') != parse_context(parser)):
+            metrics.inc('airbnb_page_fingerprint_total', result='changed')
+            return None
+        metrics.inc('airbnb_page_fingerprint_total', result='unchanged')
+        return {
+            'reservations': _restore_dates(payload['reservations']),
+            'capture': payload.get('capture'),
+            'timestamp': record['timestamp']
+        }
+
+    def store(self, fingerprint, parser, reservations, capture=None):
+        """Remember this page's fingerprint with the reservations parsed from it"""
+        if not fingerprint:
+            return None
+        stored = {kind: [{key: value for key, value in r.items() if key != 'raw_text'} for r in items]
+                  for kind, items in reservations.items()}
+        return self.archive.append(ARCHIVE_KIND, {
+            'digest': fingerprint['digest'],
+            'cards': fingerprint['cards'],
+            'coded': fingerprint.get('coded'),
+            'context': parse_context(parser),
+            'capture': capture,
+            'reservations': stored
+        }, for_date=parser.tomorrow)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Parse Only
+Runs the parsing, nickname and message code on reservation texts that were
+already scraped - no browser, no Selenium import, no login:
+
+    python parse_only.py output/captures/2025-08-06/reservations_070012_4242.jsonl.gz
+    python parse_only.py cards.txt --tomorrow 2025-08-07     # cards separated by a blank line
+    pbpaste | python parse_only.py -
+
+    python parse_only.py --importtime      # startup cost of each entry point, with and without Selenium
+
+A capture is parsed with the tomorrow date, regions and nickname mapping
+recorded in its header; text files use the archived mapping.
+"""
+import argparse
+import re
+import subprocess
+import sys
+from datetime import date, timedelta
+
+from capture_journal import iter_capture
+
+# Entry points whose startup matters without a browser
+IMPORTTIME_MODULES = ('parse_only', 'replay_harness', 'message_server', 'airbnb_daily_engine', 'async_pipeline')
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def read_texts(path):
+    """(header or None, texts) from a capture journal, a text file, or '-' for stdin"""
+    if path.endswith('.jsonl.gz'):
+        header, texts = None, []
+        for record in iter_capture(path):
+            if record.get('type') == 'header':
+                header = record
+            elif record.get('type') == 'reservation':
+                texts.append(record['text'])
+        return header, texts
+
+    if path == '-':
+        content = sys.stdin.read()
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    cards = re.split(r"\n\s*\n", content.replace('\r\n', '\n'))
+    return None, [card.strip() for card in cards if card.strip()]
+
+
+def build_engine(header=None, tomorrow=None, verbose=False):
+    """Daily engine that never starts a browser, dated and mapped like the capture"""
+    from airbnb_daily_engine import AirbnbDailyEngine
+    from property_nickname_helper import PropertyNicknameHelper
+
+    header = header or {}
+    regions = header.get('regions') or None
+    engine = AirbnbDailyEngine(start_browser=False, regions=regions)
+    if header.get('nicknames'):
+        helper = PropertyNicknameHelper(properties=header['nicknames'])
+        engine.nickname_helper = helper
+        engine.parser.nickname_helper = helper
+
+    tomorrow = tomorrow or (date.fromisoformat(header['tomorrow']) if header.get('tomorrow') else None)
+    if tomorrow:
+        engine.set_dates(tomorrow - timedelta(days=1))
+    engine.parser.set_verbose(verbose)
+    return engine
+
+
+def measure_import(module):
+    """(total µs, selenium µs) for a fresh interpreter importing module"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            capture_output=True, text=True)
+    total = selenium = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, depth, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        if depth == 1:
+            total += cumulative
+            if name.split('.')[0] == 'selenium':
+                selenium += cumulative
+    if result.returncode != 0:
+        return None, None
+    return total, selenium
+
+
+def importtime_report(modules=IMPORTTIME_MODULES):
+    """Print each entry point's import cost next to what Selenium used to add to it"""
+    selenium_total, _ = measure_import('selenium.webdriver')
+    print("=== STARTUP (python -X importtime, fresh interpreter) ===")
+    print(f"{'Module':<22} {'Import':>9} {'Selenium':>9} {'Eager (+selenium.webdriver)':>28}")
+    print("-" * 71)
+    for module in modules:
+        total, selenium = measure_import(module)
+        if total is None:
+            print(f"{module:<22} {'failed':>9}")
+            continue
+        eager = f"{(total + (selenium_total or 0)) / 1000:.1f}ms" if not selenium and selenium_total else "-"
+        print(f"{module:<22} {total / 1000:>7.1f}ms {selenium / 1000:>7.1f}ms {eager:>28}")
+    if selenium_total is None:
+        print("\n⚠️ Selenium is not installed here; the eager column needs it to show the saving")
+    else:
+        print(f"\nselenium.webdriver alone: {selenium_total / 1000:.1f}ms (now paid only when a browser starts)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse scraped reservation texts and render the messages, without a browser")
+    parser.add_argument('source', nargs='?', help="capture (.jsonl.gz), text file with blank-line separated cards, or '-'")
+    parser.add_argument('--tomorrow', type=date.fromisoformat, help="cleaning day (default: capture header or tomorrow)")
+    parser.add_argument('--verbose', action='store_true', help="print the parser's reasoning for every card")
+    parser.add_argument('--importtime', action='store_true', help="report startup cost of each entry point")
+    args = parser.parse_args()
+
+    if args.importtime:
+        importtime_report()
+        return
+    if not args.source:
+        parser.error("a source is required (or --importtime)")
+
+    header, texts = read_texts(args.source)
+    engine = build_engine(header, args.tomorrow, args.verbose)
+    print(f"=== PARSE ONLY: {len(texts)} texts for {engine.tomorrow} ===")
+
+    reservations = engine.parser.parse_reservations(texts)
+    outputs = engine.create_outputs(reservations)
+    engine.print_region_messages(outputs['regions'])
+    print("\n" + "="*60)
+    print("WHATSAPP MESSAGE FOR CLEANER (ENGLISH):")
+    print("="*60)
+    print(outputs['english'])
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
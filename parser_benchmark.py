@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Parser Benchmark
+Times the parsing hot paths on a synthetic corpus (no browser, no login):
+
+    parse_reservation     ReservationParser.parse (what parse_reservation_fixed runs)
+    extract_dates         ReservationParser._extract_dates_robust, one card line per call
+    get_nickname          PropertyNicknameHelper.get_nickname, cache cleared per run
+
+Reports ops/sec and p50/p99 latency at each size and compares with a stored baseline:
+
+    python parser_benchmark.py --save-baseline
+    python parser_benchmark.py --fail-on-regression
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+from artifact_archive import atomic_write_text
+from property_nickname_helper import PropertyNicknameHelper
+from reservation_parser import ReservationParser
+from synthetic_corpus import SyntheticCorpus
+
+DEFAULT_SIZES = "1000,10000,100000"
+DEFAULT_TOLERANCE = 0.2
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "benchmarks", "parser_baseline.json")
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def time_calls(func, items):
+    """Per-call latencies in ns; the collector is paused so it does not land on random calls"""
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for item in items:
+            started = clock()
+            func(item)
+            append(clock() - started)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return latencies
+
+
+def summarize(latencies):
+    latencies.sort()
+    total_seconds = sum(latencies) / 1e9
+    return {
+        'items': len(latencies),
+        'ops_per_sec': round(len(latencies) / total_seconds, 1) if total_seconds else 0.0,
+        'p50_us': round(percentile(latencies, 50) / 1000.0, 2),
+        'p99_us': round(percentile(latencies, 99) / 1000.0, 2)
+    }
+
+
+class ParserBenchmark:
+    def __init__(self, sizes, seed=42):
+        self.sizes = sizes
+        self.corpus = SyntheticCorpus(seed=seed)
+        self.helper = PropertyNicknameHelper(properties=self.corpus.properties())
+        self.parser = ReservationParser(self.corpus.tomorrow, self.helper, verbose=False)
+
+        largest = max(sizes)
+        print(f"Generating synthetic corpus ({largest} items per benchmark, seed {seed})...")
+        self.texts = self.corpus.reservation_texts(largest)
+        self.date_lines = self.corpus.date_lines(largest)
+        self.names = self.corpus.property_lookup_names(largest)
+
+    def _clear_caches(self):
+        self.helper._resolved = {}
+        self.helper._unmapped_regions = {}
+
+    def bench_parse_reservation(self, size):
+        self._clear_caches()
+        return time_calls(self.parser.parse, self.texts[:size])
+
+    def bench_extract_dates(self, size):
+        return time_calls(self.parser._extract_dates_robust, self.date_lines[:size])
+
+    def bench_get_nickname(self, size):
+        self._clear_caches()
+        return time_calls(self.helper.get_nickname, self.names[:size])
+
+    def run(self):
+        results = {}
+        for name in ('parse_reservation', 'extract_dates', 'get_nickname'):
+            bench = getattr(self, f"bench_{name}")
+            results[name] = {}
+            for size in self.sizes:
+                results[name][str(size)] = summarize(bench(size))
+        return results
+
+
+def compare(results, baseline, tolerance):
+    """Rows of (name, size, current, baseline ops/sec, change); regressions beyond tolerance flagged"""
+    rows = []
+    regressions = []
+    for name, by_size in results.items():
+        for size, current in by_size.items():
+            previous = baseline.get('results', {}).get(name, {}).get(size)
+            if not previous or not previous.get('ops_per_sec'):
+                continue
+            change = current['ops_per_sec'] / previous['ops_per_sec'] - 1
+            rows.append((name, size, current['ops_per_sec'], previous['ops_per_sec'], change))
+            if change < -tolerance:
+                regressions.append((name, size, change))
+    return rows, regressions
+
+
+def print_results(results):
+    print(f"\n{'Benchmark':<20} {'Items':>8} {'ops/sec':>12} {'p50 µs':>9} {'p99 µs':>9}")
+    print("-" * 62)
+    for name, by_size in results.items():
+        for size, stats in by_size.items():
+            print(f"{name:<20} {int(size):>8} {stats['ops_per_sec']:>12,.0f} {stats['p50_us']:>9.2f} {stats['p99_us']:>9.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reservation parser on a synthetic corpus")
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help=f"comma-separated item counts (default: {DEFAULT_SIZES})")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store these results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"allowed ops/sec drop before a regression is reported (default: {DEFAULT_TOLERANCE})")
+    parser.add_argument('--fail-on-regression', action='store_true', help="exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    print("=== PARSER BENCHMARK ===")
+    results = ParserBenchmark(sizes, seed=args.seed).run()
+    print_results(results)
+
+    regressions = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        rows, regressions = compare(results, baseline, args.tolerance)
+        print(f"\nCompared with baseline from {baseline.get('created', 'unknown date')} ({baseline.get('python', '?')}):")
+        for name, size, current, previous, change in rows:
+            icon = "❌" if change < -args.tolerance else "✅"
+            print(f"{icon} {name:<20} {int(size):>8} {previous:>12,.0f} → {current:>12,.0f} ops/sec ({change:+.1%})")
+    else:
+        print(f"\n⚠️ No baseline at {args.baseline} - run with --save-baseline to create one")
+
+    if args.save_baseline:
+        atomic_write_text(args.baseline, json.dumps({
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'seed': args.seed,
+            'results': results
+        }, indent=2))
+        print(f"📁 Baseline saved: {args.baseline}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,53 @@ Load and use property nicknames in main automation
 import json
 import os
 from datetime import datetime
+from artifact_archive import ArtifactArchive
+from region_map import RegionClassifier
 
 class PropertyNicknameHelper:
-    def __init__(self):
+    def __init__(self, region_classifier=None, properties=None):
         self.nicknames = {}
-        self.load_latest_nicknames()
+        self.regions = {}
+        self.region_classifier = region_classifier or RegionClassifier()
+        self._resolved = {}
+        self._unmapped_regions = {}
+        self.loaded_record = None
+        # An explicit mapping (replays, benchmarks) skips the archive lookup
+        if properties is not None:
+            self._load_properties(properties, "provided mapping")
+        else:
+            self.load_latest_nicknames()
     
     def load_latest_nicknames(self):
         """Load the most recent nickname mapping"""
+        # Archive index points straight at the latest mapping - no directory scan
+        record = ArtifactArchive().latest('property_nicknames')
+        if record:
+            self.loaded_record = (record['date'], record['timestamp'])
+            self._load_properties(record['payload']['properties'], f"archive ({record['date']})")
+            return
+        
+        self.load_legacy_nicknames()
+    
+    def refresh(self):
+        """Reload only if a newer mapping was archived since the last load"""
+        archive = ArtifactArchive()
+        entries = archive.index['latest'].get('property_nicknames', {})
+        if not entries:
+            return False
+        latest_date = max(entries)
+        if (latest_date, entries[latest_date]['timestamp']) == self.loaded_record:
+            return False
+        
+        self.nicknames = {}
+        self.regions = {}
+        self._resolved = {}
+        self._unmapped_regions = {}
+        self.load_latest_nicknames()
+        return True
+    
+    def load_legacy_nicknames(self):
+        """Load the newest property_nicknames_*.json left next to the scripts by older versions"""
         script_dir = os.path.dirname(os.path.abspath(__file__))
         
         # Find the latest JSON file
@@ -23,7 +62,7 @@ class PropertyNicknameHelper:
                 nickname_files.append(file)
         
         if not nickname_files:
-            print("⚠️ No property nickname files found. Run extract_property_nicknames.py first.")
+            print("⚠️ No property nickname files found. Run extract_nicknames_fixed.py first.")
             return
         
         # Get the latest file
@@ -34,33 +73,69 @@ class PropertyNicknameHelper:
             with open(json_path, 'r', encoding='utf-8') as f:
                 properties = json.load(f)
             
-            # Convert to simple dict
+            self._load_properties(properties, latest_file)
+            
+        except Exception as e:
+            print(f"❌ Error loading nicknames: {e}")
+    
+    def _load_properties(self, properties, source):
+        """Convert a list of extracted properties to the lookup dict"""
+        try:
             for prop in properties:
                 self.nicknames[prop['airbnb_name']] = prop['internal_name']
+                # Older mappings have no region - classify those once here
+                self.regions[prop['airbnb_name']] = (
+                    prop.get('region') or self.region_classifier.region_for(prop['airbnb_name'])
+                )
+            self._resolved = {}
+            self._unmapped_regions = {}
             
-            print(f"✅ Loaded {len(self.nicknames)} property nicknames from {latest_file}")
+            print(f"✅ Loaded {len(self.nicknames)} property nicknames from {source}")
             
         except Exception as e:
             print(f"❌ Error loading nicknames: {e}")
     
+    def _resolve_name(self, airbnb_name):
+        """Map a scraped property name to a stored mapping key (cached)"""
+        if airbnb_name in self._resolved:
+            return self._resolved[airbnb_name]
+        
+        # Try exact match first
+        if airbnb_name in self.nicknames:
+            key = airbnb_name
+        else:
+            # Try partial matches (in case of slight differences)
+            key = None
+            airbnb_lower = airbnb_name.lower()
+            for full_name in self.nicknames:
+                # Check if key parts match
+                if self._matches_property(airbnb_lower, full_name.lower()):
+                    key = full_name
+                    break
+        
+        self._resolved[airbnb_name] = key
+        return key
+    
     def get_nickname(self, airbnb_name):
         """Get nickname for Airbnb property name"""
         if not airbnb_name:
             return None
-            
-        # Try exact match first
-        if airbnb_name in self.nicknames:
-            return self.nicknames[airbnb_name]
         
-        # Try partial matches (in case of slight differences)
-        airbnb_lower = airbnb_name.lower()
-        for full_name, nickname in self.nicknames.items():
-            # Check if key parts match
-            if self._matches_property(airbnb_lower, full_name.lower()):
-                return nickname
+        key = self._resolve_name(airbnb_name)
+        return self.nicknames[key] if key else None
+    
+    def get_region(self, airbnb_name):
+        """Get the region stored with the mapping; unknown listings are classified once"""
+        if not airbnb_name:
+            return self.region_classifier.default_region
+        
+        key = self._resolve_name(airbnb_name)
+        if key:
+            return self.regions[key]
         
-        # No match found
-        return None
+        if airbnb_name not in self._unmapped_regions:
+            self._unmapped_regions[airbnb_name] = self.region_classifier.region_for(airbnb_name)
+        return self._unmapped_regions[airbnb_name]
     
     def _matches_property(self, search_name, stored_name):
         """Check if property names match based on key words"""
@@ -86,6 +161,13 @@ class PropertyNicknameHelper:
             
         return False
     
+    def snapshot(self):
+        """Current mapping as a properties list (same shape as the archived record)"""
+        return [
+            {'airbnb_name': name, 'internal_name': nickname, 'region': self.regions.get(name)}
+            for name, nickname in self.nicknames.items()
+        ]
+    
     def get_all_nicknames(self):
         """Get all nickname mappings"""
         return self.nicknames.copy()
@@ -99,7 +181,7 @@ class PropertyNicknameHelper:
         print("\n📋 CURRENT PROPERTY NICKNAMES:")
         print("-" * 60)
         for airbnb_name, nickname in self.nicknames.items():
-            print(f"  {airbnb_name[:35]:<35} → {nickname}")
+            print(f"  {airbnb_name[:35]:<35} → {nickname} [{self.regions.get(airbnb_name)}]")
 
 # Example usage functions
 def test_nickname_helper():
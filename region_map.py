@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Region Map
+Configurable market definitions and a whole-word region classifier.
+Regions are assigned once per listing when nicknames are extracted, so the
+reservation path only needs a dict lookup.
+"""
+import json
+import os
+import re
+
+# Override by creating regions.json next to the scripts (same structure)
+DEFAULT_REGION_CONFIG = {
+    'default_region': 'bali',
+    'regions': {
+        'bali': {
+            'display_name': 'Bali',
+            'language': 'id',
+            'team': 'Bali cleaning team',
+            'keywords': [
+                'bali', 'ubud', 'tegallalang', 'payangan', 'gianyar', 'canggu',
+                'seminyak', 'uluwatu', 'sanur', 'kuta', 'kecamatan', 'indonesia'
+            ]
+        },
+        'seoul': {
+            'display_name': 'Seoul',
+            'language': 'ko',
+            'team': 'Seoul cleaning team',
+            'keywords': [
+                'seoul', 'korea', 'korean', 'south korea', 'gangnam', 'hongdae',
+                'myeongdong', 'itaewon', 'dongdaemun', 'insadong', 'jung-gu',
+                'yongsan', 'seoul station', 'kr'
+            ]
+        }
+    }
+}
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    """Lowercase word tokens; 'jung-gu' -> ['jung', 'gu']"""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def load_region_config(config_file=None):
+    """Load regions.json if present, otherwise the built-in Bali/Seoul config"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_file = config_file or os.path.join(script_dir, "regions.json")
+
+    if os.path.exists(config_file):
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            config.setdefault('regions', {})
+            config.setdefault('default_region', next(iter(config['regions']), None))
+            return config
+        except Exception as e:
+            print(f"❌ Error loading {config_file}, using built-in regions: {e}")
+
+    return json.loads(json.dumps(DEFAULT_REGION_CONFIG))
+
+
+def region_settings(config, region):
+    """Display name, message language and team of a region, with defaults filled in"""
+    settings = dict(config['regions'].get(region) or {})
+    display_name = settings.get('display_name') or str(region).title()
+    settings['display_name'] = display_name
+    settings.setdefault('language', 'en')
+    settings.setdefault('team', f"{display_name} cleaning team")
+    return settings
+
+
+class RegionClassifier:
+    def __init__(self, config=None):
+        self.config = config or load_region_config()
+        self.default_region = self.config.get('default_region')
+        self.region_names = list(self.config['regions'])
+
+        # keyword tuple -> region; multi-word keywords match as consecutive tokens
+        self.phrases = {}
+        self.max_phrase_len = 1
+        for region, region_config in self.config['regions'].items():
+            for keyword in region_config.get('keywords', []):
+                phrase = tuple(tokenize(keyword))
+                if phrase:
+                    self.phrases.setdefault(phrase, region)
+                    self.max_phrase_len = max(self.max_phrase_len, len(phrase))
+
+    def classify(self, text):
+        """Return the region with the most whole-word keyword hits, or None"""
+        tokens = tokenize(text)
+        if not tokens:
+            return None
+
+        hits = {}
+        for n in range(1, self.max_phrase_len + 1):
+            for i in range(len(tokens) - n + 1):
+                region = self.phrases.get(tuple(tokens[i:i + n]))
+                if region:
+                    hits[region] = hits.get(region, 0) + 1
+
+        if not hits:
+            return None
+        # Ties go to the region listed first in the config
+        return max(self.region_names, key=lambda r: (hits.get(r, 0), -self.region_names.index(r)))
+
+    def region_for(self, text):
+        """Classify, falling back to the default region"""
+        return self.classify(text) or self.default_region
+
+
+def test_region_classifier():
+    """Test the region classifier"""
+    classifier = RegionClassifier()
+    test_texts = [
+        "Bamboo Buddha Jungle Villa, Tegallalang",
+        "Cozy Hongdae Studio near Seoul Station",
+        "Quiet room for a bookkeeper",
+        "Seoul, KR",
+        "Japanese Villa with Rice Terrace"
+    ]
+
+    print("\n🧪 TESTING REGION CLASSIFICATION:")
+    for text in test_texts:
+        print(f"  '{text}' → {classifier.classify(text)} (default: {classifier.region_for(text)})")
+
+
+if __name__ == "__main__":
+    test_region_classifier()
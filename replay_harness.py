@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Replay Harness
+Replays archived raw captures (capture_journal.py) through two versions of
+reservation_parser.py and reports, per capture, every reservation whose
+classification changed and how fast each version parsed.
+
+    python replay_harness.py                          # HEAD vs working tree, every capture
+    python replay_harness.py --baseline v1.0 --candidate HEAD --since 2025-08-01
+    python replay_harness.py --max-slowdown 0.05      # exit 1 on any change or >5% slowdown
+
+Each capture carries the tomorrow date, regions and nickname mapping of its
+run, so both versions see exactly what production saw.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import os
+import subprocess
+import sys
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+
+from capture_journal import iter_capture, list_captures
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PARSER_FILE = "reservation_parser.py"
+DEFAULT_MAX_SLOWDOWN = 0.10
+
+# Fields that make up a classification; raw_text and timings are not compared
+COMPARED_FIELDS = ('type', 'guest_name', 'guest_count', 'property_name', 'property_nickname',
+                   'checkin_date', 'checkout_date', 'region')
+
+_modules = {}
+
+
+def parser_source(revision):
+    """reservation_parser.py at a git revision, or the working tree copy for 'WORKTREE'"""
+    if revision == 'WORKTREE':
+        with open(os.path.join(SCRIPT_DIR, PARSER_FILE), 'r', encoding='utf-8') as f:
+            return f.read()
+    result = subprocess.run(['git', 'show', f"{revision}:{PARSER_FILE}"], cwd=SCRIPT_DIR,
+                            capture_output=True, text=True, encoding='utf-8')
+    if result.returncode != 0:
+        raise ValueError(f"Cannot read {PARSER_FILE} at {revision}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def load_parser_module(source):
+    """Import a parser version from source (cached per worker process)"""
+    key = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    module = _modules.get(key)
+    if module is None:
+        module = types.ModuleType(f"reservation_parser_{key[:8]}")
+        module.__file__ = f"<{PARSER_FILE}@{key[:8]}>"
+        exec(compile(source, module.__file__, 'exec'), module.__dict__)
+        _modules[key] = module
+    return module
+
+
+def build_parser(module, header):
+    from property_nickname_helper import PropertyNicknameHelper
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        helper = PropertyNicknameHelper(properties=header.get('nicknames') or [])
+    tomorrow = date.fromisoformat(header['tomorrow'])
+    parser = module.ReservationParser(tomorrow, helper, header.get('regions'))
+    if hasattr(parser, 'set_verbose'):
+        parser.set_verbose(False)
+    return parser
+
+
+def classification(result):
+    if not result:
+        return None
+    return {field: str(result.get(field)) if result.get(field) is not None else None for field in COMPARED_FIELDS}
+
+
+def time_parser(parser, texts, repeat):
+    """Best-of-repeat total seconds and the results of the last pass"""
+    best = None
+    results = None
+    for _ in range(repeat):
+        # Fresh lookup caches every pass so both versions pay the same warm-up
+        parser.nickname_helper._resolved = {}
+        parser.nickname_helper._unmapped_regions = {}
+        started = time.perf_counter()
+        results = [parser.parse(text) for text in texts]
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def replay_capture(path, baseline_source, candidate_source, repeat=3):
+    """Worker: replay one capture through both versions and diff every record"""
+    records = iter_capture(path)
+    header = next(records, None)
+    if not header or header.get('type') != 'header' or 'tomorrow' not in header:
+        return {'path': path, 'error': "not a reservations capture"}
+
+    indexes, texts = [], []
+    for record in records:
+        if record.get('type') == 'reservation':
+            indexes.append(record['index'])
+            texts.append(record['text'])
+
+    try:
+        baseline = build_parser(load_parser_module(baseline_source), header)
+        candidate = build_parser(load_parser_module(candidate_source), header)
+    except Exception as e:
+        return {'path': path, 'error': f"cannot build parser: {e}"}
+
+    # Baseline runs before and after the candidate so warm-up does not favour one side
+    baseline_seconds, baseline_results = time_parser(baseline, texts, repeat)
+    candidate_seconds, candidate_results = time_parser(candidate, texts, repeat)
+    baseline_again, _ = time_parser(baseline, texts, 1)
+    baseline_seconds = min(baseline_seconds, baseline_again)
+
+    changes = []
+    for index, text, before, after in zip(indexes, texts, baseline_results, candidate_results):
+        before, after = classification(before), classification(after)
+        if before == after:
+            continue
+        fields = sorted(field for field in COMPARED_FIELDS
+                        if (before or {}).get(field) != (after or {}).get(field))
+        changes.append({'index': index, 'before': before, 'after': after, 'fields': fields, 'text': text})
+
+    return {
+        'path': path,
+        'tomorrow': header['tomorrow'],
+        'records': len(texts),
+        'changes': changes,
+        'kept_before': sum(1 for r in baseline_results if r),
+        'kept_after': sum(1 for r in candidate_results if r),
+        'baseline_seconds': baseline_seconds,
+        'candidate_seconds': candidate_seconds
+    }
+
+
+def print_change(change):
+    before, after = change['before'], change['after']
+    print(f"    #{change['index']} changed: {', '.join(change['fields'])}")
+    for field in change['fields']:
+        print(f"      {field}: {(before or {}).get(field)!r} → {(after or {}).get(field)!r}")
+    preview = change['text'].replace('\n', ' | ')
+    print(f"      text: {preview[:160]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay raw captures through two parser versions and diff them")
+    parser.add_argument('captures', nargs='*', help="capture files (default: every reservations capture)")
+    parser.add_argument('--baseline', default='HEAD', help="git revision of the baseline parser (default: HEAD)")
+    parser.add_argument('--candidate', default='WORKTREE', help="git revision of the candidate (default: working tree)")
+    parser.add_argument('--since', help="only captures from this date on (YYYY-MM-DD)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--repeat', type=int, default=3, help="timing passes per version (best is kept)")
+    parser.add_argument('--max-slowdown', type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help=f"allowed total slowdown before failing (default: {DEFAULT_MAX_SLOWDOWN})")
+    parser.add_argument('--allow-changes', action='store_true', help="do not fail on classification changes")
+    parser.add_argument('--show', type=int, default=5, help="changed records to print per capture")
+    args = parser.parse_args()
+
+    paths = args.captures or list_captures('reservations')
+    if args.since:
+        paths = [p for p in paths if os.path.basename(os.path.dirname(p)) >= args.since]
+    if not paths:
+        print("⚠️ No captures to replay. Run a scrape first (see capture_journal.py).")
+        return
+
+    try:
+        baseline_source = parser_source(args.baseline)
+        candidate_source = parser_source(args.candidate)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(2)
+
+    print(f"=== REPLAY {len(paths)} capture(s): {args.baseline} → {args.candidate} ===")
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(replay_capture, path, baseline_source, candidate_source, args.repeat) for path in paths]
+        reports = [future.result() for future in futures]
+
+    total_records = total_changes = 0
+    baseline_total = candidate_total = 0.0
+    for report in reports:
+        name = os.path.relpath(report['path'], SCRIPT_DIR)
+        if 'error' in report:
+            print(f"⚠️ {name}: {report['error']}")
+            continue
+        total_records += report['records']
+        total_changes += len(report['changes'])
+        baseline_total += report['baseline_seconds']
+        candidate_total += report['candidate_seconds']
+        delta = report['candidate_seconds'] / report['baseline_seconds'] - 1 if report['baseline_seconds'] else 0.0
+        icon = "✅" if not report['changes'] else "❌"
+        print(f"{icon} {name}: {report['records']} records, {len(report['changes'])} changed, "
+              f"kept {report['kept_before']} → {report['kept_after']}, "
+              f"{report['baseline_seconds'] * 1000:.1f}ms → {report['candidate_seconds'] * 1000:.1f}ms ({delta:+.1%})")
+        for change in report['changes'][:args.show]:
+            print_change(change)
+        if len(report['changes']) > args.show:
+            print(f"    ... {len(report['changes']) - args.show} more")
+
+    slowdown = candidate_total / baseline_total - 1 if baseline_total else 0.0
+    print(f"\nTotal: {total_records} records, {total_changes} changed, parse time {slowdown:+.1%}")
+
+    failed = False
+    if total_changes and not args.allow_changes:
+        print("❌ Output changed")
+        failed = True
+    if slowdown > args.max_slowdown:
+        print(f"❌ Slower than baseline by more than {args.max_slowdown:.0%}")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("✅ No output change, no slowdown")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,560 @@
+#!/usr/bin/env python3
+"""
+Reservation Parser
+The one parsing engine behind every output: turns raw reservation card
+text into tomorrow's checkouts/check-ins with region and nickname
+"""
+import re
+import time
+from datetime import datetime
+from run_metrics import metrics
+from run_trace import tracer, traced
+
+
+# Confidence lost for each guess parse() had to make; below LOW_CONFIDENCE the
+# reservation is worth checking against its detail page
+CONFIDENCE_PENALTIES = {
+    'date_keyword': 0.5,          # no valid date pair; check-in vs checkout from the word "checkout"
+    'single_date': 0.4,           # one date on the card; the other end of the stay is unknown
+    'extra_dates': 0.1,           # more than two dates (booked date etc.) around the pair
+    'default_guest_count': 0.35,  # no guest count on the card; defaulted to 1
+    'partial_guest_count': 0.35,  # "2 adults, 1 child": only the adults were counted
+    'fallback_guest_name': 0.3,   # guest name taken from the first plausible line
+    'no_property': 0.4,           # no property line; named "Property"
+    'nickname_fallback': 0.2      # truncated property name used as the nickname
+}
+LOW_CONFIDENCE = 0.7
+
+CONFIRMATION_CODE_RE = re.compile(r"\b(HM[A-Z0-9]{8})\b")
+
+
+def _quiet(*args, **kwargs):
+    pass
+
+
+def score_confidence(data):
+    """Set data['confidence'] from data['doubts'] (1.0 = nothing guessed)"""
+    penalty = sum(CONFIDENCE_PENALTIES.get(doubt, 0) for doubt in data.get('doubts', []))
+    data['confidence'] = round(max(0.0, 1.0 - penalty), 2)
+    return data['confidence']
+
+
+class ReservationParser:
+    def __init__(self, tomorrow, nickname_helper, regions=None, verbose=True):
+        self.tomorrow = tomorrow
+        self.nickname_helper = nickname_helper
+        # None keeps every region; otherwise reservations elsewhere are dropped
+        self.regions = regions
+        # Why the last parse() kept or dropped its card, and where the last nickname came from
+        self.last_outcome = None
+        self.last_nickname_source = None
+        self.set_verbose(verbose)
+    
+    def set_verbose(self, verbose):
+        """Per-reservation reasoning output on (default) or off (threads, benchmarks)"""
+        self.verbose = verbose
+        self.log = print if verbose else _quiet
+    
+    @traced()
+    def parse_reservations(self, reservation_texts, journal=None, checkpoint=None):
+        """Parse every raw text once and sort the relevant ones into checkouts/check-ins
+        
+        reservation_texts may be a generator (texts parsed as they are read); with a
+        CaptureJournal every text is recorded with its outcome and reasoning; with a
+        RunCheckpoint texts parsed by an interrupted run are not parsed again
+        """
+        reservations = {'checkouts': [], 'checkins': []}
+        
+        if hasattr(reservation_texts, '__len__'):
+            print(f"\nProcessing {len(reservation_texts)} reservations...")
+        else:
+            print("\nProcessing reservations as they are read...")
+        
+        for i, text in enumerate(reservation_texts):
+            self.log(f"\n{'='*20} RESERVATION {i+1} {'='*20}")
+            self.log(f"Raw text preview: {text[:200]}...")
+            
+            resumed = checkpoint.parse_of(text) if checkpoint is not None else None
+            if resumed:
+                reservation, self.last_outcome, reasons = resumed
+            else:
+                with tracer.span("parse_reservation", index=i) as span:
+                    started = time.perf_counter()
+                    reasons = None
+                    if journal:
+                        reservation, reasons = self.parse_with_reasons(text)
+                    else:
+                        reservation = self.parse(text)
+                    metrics.record_parse(self, time.perf_counter() - started, reservation)
+                    span.set(type=reservation.get('type') if reservation else None)
+                if checkpoint is not None:
+                    checkpoint.record_parse(text, reservation, self.last_outcome, reasons)
+            
+            if journal:
+                journal.record_reservation(i, text, self.last_outcome, reasons, reservation)
+            
+            if reservation:
+                if reservation.get('type') == 'checkout':
+                    reservations['checkouts'].append(reservation)
+                    self.log(f"✅ CHECKOUT ({reservation['region']}): {reservation['property_nickname']}")
+                
+                if reservation.get('type') == 'checkin':
+                    reservations['checkins'].append(reservation)  
+                    self.log(f"✅ CHECK-IN ({reservation['region']}): {reservation['property_nickname']}")
+        
+        return reservations
+    
+    def parse_with_reasons(self, text, resolve_nickname=True):
+        """parse() plus the reasoning lines it logged (still printed when verbose)"""
+        reasons = []
+        log = self.log
+        
+        def capture(*args):
+            reasons.append(" ".join(str(arg) for arg in args).strip())
+            log(*args)
+        
+        self.log = capture
+        try:
+            return self.parse(text, resolve_nickname), reasons
+        finally:
+            self.log = log
+    
+    def parse(self, text, resolve_nickname=True):
+        """Parse reservation and check if relevant for tomorrow - FINAL FIXED VERSION"""
+        try:
+            lines = [line.strip() for line in text.split('\n') if line.strip()]
+            
+            data = {
+                'guest_name': None,
+                'property_name': None,
+                'guest_count': '1',
+                'checkin_date': None,
+                'checkout_date': None,
+                'doubts': [],
+                'raw_text': text[:500]
+            }
+            code = CONFIRMATION_CODE_RE.search(text)
+            data['confirmation_code'] = code.group(1) if code else None
+            
+            # STEP 1: Find guest name - improved detection
+            for i, line in enumerate(lines[:8]):
+                if self._is_guest_name(line, i):
+                    data['guest_name'] = line
+                    self.log(f"  → Found guest name: '{line}' at position {i}")
+                    break
+            
+            # STEP 2: Find dates - FIXED to only extract from this reservation's specific text
+            all_dates = []
+            date_context_lines = []
+            
+            # Only look at first 10-15 lines to avoid page header contamination
+            relevant_lines = lines[:15] if len(lines) > 15 else lines
+            
+            for line in relevant_lines:
+                # Skip header/navigation lines that contain many dates
+                line_lower = line.lower()
+                if any(word in line_lower for word in ['status', 'guests', 'check-in', 'checkout', 'booked', 'listing', 'confirmation', 'total', 'actions', 'review']):
+                    continue
+                    
+                dates = self._extract_dates_robust(line)
+                if dates:
+                    all_dates.extend(dates)
+                    date_context_lines.append(line[:100])  # Keep context
+            
+            # Remove duplicates while preserving order
+            unique_dates = []
+            for date in all_dates:
+                if date not in unique_dates:
+                    unique_dates.append(date)
+            unique_dates.sort()
+            
+            self.log(f"  → Guest: {data.get('guest_name', 'Unknown')}")
+            self.log(f"  → Found dates: {unique_dates}")
+            if date_context_lines:
+                self.log(f"  → Date context: {date_context_lines[0]}")
+            
+            # CRITICAL FIX: Improved date assignment logic for correct check-in/checkout identification
+            if len(unique_dates) >= 2:
+                # Priority 1: Check if tomorrow is exactly one of the dates
+                if self.tomorrow in unique_dates:
+                    idx = unique_dates.index(self.tomorrow)
+                    if len(unique_dates) > 2:
+                        data['doubts'].append('extra_dates')
+                    
+                    # Smart logic: Find the most relevant date pair that includes tomorrow
+                    # Look for consecutive dates that form a valid reservation period
+                    found_pair = False
+                    
+                    # Check if tomorrow can be paired with the next date (check-in scenario)
+                    if idx < len(unique_dates) - 1:
+                        next_date = unique_dates[idx + 1]
+                        # If next date is within reasonable range (1-30 days), it's likely checkout
+                        days_diff = (next_date - self.tomorrow).days
+                        if 1 <= days_diff <= 30:
+                            data['checkin_date'] = self.tomorrow
+                            data['checkout_date'] = next_date
+                            found_pair = True
+                            self.log(f"  → Tomorrow is check-in date: {self.tomorrow} to {next_date} ({days_diff} days)")
+                    
+                    # If not found above, check if tomorrow can be paired with previous date (checkout scenario)
+                    if not found_pair and idx > 0:
+                        prev_date = unique_dates[idx - 1]
+                        # If previous date is within reasonable range, it's likely check-in
+                        days_diff = (self.tomorrow - prev_date).days
+                        if 1 <= days_diff <= 30:
+                            data['checkin_date'] = prev_date
+                            data['checkout_date'] = self.tomorrow
+                            found_pair = True
+                            self.log(f"  → Tomorrow is checkout date: {prev_date} to {self.tomorrow} ({days_diff} days)")
+                    
+                    # Fallback: if no reasonable pair found, treat as single date
+                    if not found_pair:
+                        data['doubts'].append('date_keyword')
+                        text_lower = text.lower()
+                        if 'checkout' in text_lower or 'check-out' in text_lower:
+                            data['checkout_date'] = self.tomorrow
+                            self.log(f"  → Tomorrow is checkout (no valid pair): {self.tomorrow}")
+                        else:
+                            data['checkin_date'] = self.tomorrow
+                            self.log(f"  → Tomorrow is check-in (no valid pair): {self.tomorrow}")
+                
+                # Priority 2: Check if tomorrow falls within a reasonable date range
+                else:
+                    for i in range(len(unique_dates) - 1):
+                        start_date = unique_dates[i]
+                        end_date = unique_dates[i + 1]
+                        
+                        # Check if tomorrow falls within this date range and range is reasonable
+                        range_days = (end_date - start_date).days
+                        if (start_date <= self.tomorrow < end_date and 1 <= range_days <= 30):
+                            data['checkin_date'] = start_date
+                            data['checkout_date'] = end_date
+                            self.log(f"  → Tomorrow falls within range: {start_date} to {end_date} ({range_days} days)")
+                            break
+                    
+                    # If no valid range includes tomorrow, it's not relevant
+                    if not data['checkin_date'] and not data['checkout_date']:
+                        self.log(f"  → No valid date range includes tomorrow, skipping reservation")
+                        self.last_outcome = 'not_tomorrow'
+                        return None
+            
+            # Single date case
+            elif len(unique_dates) == 1:
+                single_date = unique_dates[0]
+                if single_date == self.tomorrow:
+                    data['doubts'].append('single_date')
+                    # Determine check-in vs checkout from context
+                    text_lower = text.lower()
+                    if 'checkout' in text_lower or 'check-out' in text_lower:
+                        data['checkout_date'] = single_date
+                        self.log(f"  → Single date checkout: {single_date}")
+                    else:
+                        data['checkin_date'] = single_date
+                        self.log(f"  → Single date check-in: {single_date}")
+                else:
+                    self.log(f"  → Single date {single_date} doesn't involve tomorrow")
+                    self.last_outcome = 'not_tomorrow'
+                    return None
+            
+            # No dates found
+            else:
+                self.log(f"  → No dates found, skipping reservation")
+                self.last_outcome = 'no_dates'
+                return None
+            
+            # STEP 3: Find guest count
+            for line in lines:
+                count = self._extract_guest_count_robust(line)
+                if count:
+                    data['guest_count'] = count
+                    if re.search(r'child|infant', line.lower()):
+                        data['doubts'].append('partial_guest_count')
+                    break
+            else:
+                data['doubts'].append('default_guest_count')
+            
+            # STEP 4: Find property name
+            for line in lines:
+                if self._is_property_name(line):
+                    data['property_name'] = self._clean_property_name(line)
+                    break
+            
+            # STEP 5: Fallbacks
+            if not data['guest_name']:
+                data['guest_name'] = self._extract_fallback_name(lines)
+                data['doubts'].append('fallback_guest_name')
+                if data['guest_name']:
+                    self.log(f"  → Using fallback guest name: '{data['guest_name']}'")
+                else:
+                    self.log(f"  → No guest name found, skipping reservation")
+                    self.last_outcome = 'no_guest'
+                    return None
+            
+            if not data['property_name']:
+                for line in lines[5:15]:
+                    if self._is_property_name(line):
+                        data['property_name'] = self._clean_property_name(line)
+                        break
+                if not data['property_name']:
+                    data['property_name'] = "Property"
+                    data['doubts'].append('no_property')
+            
+            # Classify region once (precomputed per listing) - messages are split later
+            data['region'] = self.nickname_helper.get_region(data['property_name'])
+            if self.regions is not None and data['region'] not in self.regions:
+                self.log(f"  → EXCLUDED: {data['region']} is not a configured region")
+                self.last_outcome = 'excluded_region'
+                return None
+            self.log(f"  → Region: {data['region']}")
+            
+            # FINAL CHECK: Determine relevance for tomorrow
+            is_relevant = False
+            relevance_reason = ""
+            
+            self.log(f"  → Dates: Check-in={data['checkin_date']}, Checkout={data['checkout_date']}")
+            self.log(f"  → Tomorrow: {self.tomorrow}")
+            
+            # Check if reservation has already ended (both dates in the past)
+            if (data['checkout_date'] and data['checkout_date'] < self.tomorrow and 
+                data['checkin_date'] and data['checkin_date'] < self.tomorrow):
+                self.log(f"  → EXCLUDED: Reservation already ended ({data['checkout_date']})")
+                self.last_outcome = 'ended'
+                return None
+            
+            if data['checkout_date'] == self.tomorrow:
+                is_relevant = True
+                relevance_reason = "Checkout tomorrow"
+                data['type'] = 'checkout'
+            elif data['checkin_date'] == self.tomorrow:
+                is_relevant = True
+                relevance_reason = "Check-in tomorrow"
+                data['type'] = 'checkin'
+            
+            self.log(f"  → RELEVANT: {is_relevant} - {relevance_reason}")
+            
+            if is_relevant and data['guest_name']:
+                self.last_outcome = data['type']
+                score_confidence(data)
+                if resolve_nickname:
+                    self.resolve_nickname(data, text)
+                return data
+            self.last_outcome = 'not_tomorrow'
+                
+        except Exception as e:
+            self.last_outcome = 'error'
+            self.log(f"Error parsing reservation: {e}")
+        
+        return None
+    
+    @traced()
+    def resolve_nickname(self, data, text):
+        """Attach property_nickname to a parsed reservation (exact/fuzzy mapping, then fallbacks)"""
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        
+        # Get property nickname
+        data['property_nickname'] = self.nickname_helper.get_nickname(data['property_name'])
+        self.last_nickname_source = 'mapping'
+        self.log(f"  → Property: '{data['property_name']}' → Nickname: '{data['property_nickname']}'")
+        
+        # Fallback for nickname
+        if not data['property_nickname']:
+            # Try alternative property detection
+            for line in lines:
+                if len(line) > 10 and any(word in line.lower() for word in ['bed', 'bath', 'villa', 'dream', 'bamboo', 'buddha', 'rice', 'paddy']):
+                    alt_nickname = self.nickname_helper.get_nickname(line)
+                    if alt_nickname:
+                        data['property_name'] = line
+                        data['property_nickname'] = alt_nickname
+                        self.last_nickname_source = 'alternative'
+                        self.log(f"  → Found alternative: '{line}' → '{alt_nickname}'")
+                        break
+        
+        # Final fallback
+        if not data['property_nickname']:
+            data['property_nickname'] = data['property_name'][:20] + "..." if len(data['property_name']) > 20 else data['property_name']
+            self.last_nickname_source = 'fallback'
+            data.setdefault('doubts', []).append('nickname_fallback')
+            score_confidence(data)
+            self.log(f"  → Using fallback nickname: '{data['property_nickname']}'")
+        
+        metrics.record_nickname(self.last_nickname_source)
+        return data
+    
+    def parse_detail(self, text):
+        """Labeled fields of a reservation detail page (Check-in, Checkout, Guests, Listing)"""
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        detail = {}
+        for i, line in enumerate(lines):
+            label = line.lower().rstrip(':').strip()
+            following = lines[i + 1:i + 3]
+            if label in ('check-in', 'checkin') and 'checkin_date' not in detail:
+                dates = [d for nxt in following for d in self._extract_dates_robust(nxt)]
+                if dates:
+                    detail['checkin_date'] = dates[0]
+            elif label in ('checkout', 'check-out') and 'checkout_date' not in detail:
+                dates = [d for nxt in following for d in self._extract_dates_robust(nxt)]
+                if dates:
+                    detail['checkout_date'] = dates[0]
+            elif label in ('guests', "who's coming") and 'guest_count' not in detail:
+                for nxt in following:
+                    count = self._extract_guest_count_robust(nxt)
+                    if count:
+                        detail['guest_count'] = count
+                        break
+            elif label == 'listing' and following and 'property_name' not in detail:
+                detail['property_name'] = self._clean_property_name(following[0])
+        return detail
+    
+    def apply_detail(self, data, detail, text=""):
+        """Correct a low-confidence reservation from its detail page; None if it is not tomorrow's after all"""
+        doubts = data.setdefault('doubts', [])
+        if detail.get('checkin_date') and detail.get('checkout_date'):
+            data['checkin_date'] = detail['checkin_date']
+            data['checkout_date'] = detail['checkout_date']
+            doubts[:] = [d for d in doubts if d not in ('date_keyword', 'single_date', 'extra_dates')]
+        if detail.get('guest_count'):
+            data['guest_count'] = detail['guest_count']
+            doubts[:] = [d for d in doubts if d not in ('default_guest_count', 'partial_guest_count')]
+        if detail.get('property_name') and detail['property_name'] != data.get('property_name'):
+            data['property_name'] = detail['property_name']
+            doubts[:] = [d for d in doubts if d not in ('no_property', 'nickname_fallback')]
+            data['region'] = self.nickname_helper.get_region(data['property_name'])
+            if self.regions is not None and data['region'] not in self.regions:
+                return None
+            self.resolve_nickname(data, text or data['property_name'])
+        
+        if data['checkout_date'] == self.tomorrow:
+            data['type'] = 'checkout'
+        elif data['checkin_date'] == self.tomorrow:
+            data['type'] = 'checkin'
+        else:
+            return None
+        data['enriched'] = True
+        score_confidence(data)
+        return data
+    
+    def _is_guest_name(self, line, position):
+        """Check if line is a guest name"""
+        if position > 3 or len(line) < 2 or len(line) > 50:
+            return False
+        
+        excludes = [
+            'confirmed', 'pending', 'cancelled', 'status', 'check', 'guest', 'adult', 
+            'night', 'total', 'booking', 'reservation', 'review', 'listing', 'property',
+            'apartment', 'house', 'room', 'actions', 'details', 'contact', 'message',
+            'upcoming', 'current', 'past', 'today', 'tomorrow', 'currently', 'hosting',
+            'trip', 'change', 'requested', 'booked', 'checkout', 'payout', 'confirmation',
+            'code', 'guests', 'checkin'
+        ]
+        
+        line_lower = line.lower()
+        for exclude in excludes:
+            if exclude in line_lower:
+                return False
+        
+        if re.search(r'\d{1,2}[/\-]\d{1,2}|\w+ \d{1,2}', line):
+            return False
+        
+        if re.match(r'^[\d\$\€\£\@\#\%]', line):
+            return False
+        
+        if re.match(r'^[A-Za-z\s\'\-\.À-ÿ\u4e00-\u9fff\u0100-\u017f]+$', line):
+            return True
+        
+        return False
+    
+    def _is_property_name(self, line):
+        """Check if line looks like a property name"""
+        if len(line) < 3 or len(line) > 100:
+            return False
+        
+        property_words = [
+            'apartment', 'house', 'room', 'studio', 'villa', 'condo', 'place', 'home',
+            'loft', 'suite', 'flat', 'unit', 'bedroom', 'bed', 'bath', 'penthouse',
+            'cottage', 'cabin', 'bungalow', 'townhouse', 'duplex', 'newly', 'built',
+            'private', 'rice', 'paddy', 'pool', 'view', 'dream', 'serene', 'bamboo',
+            'buddha', 'jungle', 'getaway', 'peace', 'coconuts', 'secret', 'bali',
+            'tranquil', 'japanese', 'terrace'
+        ]
+        
+        line_lower = line.lower()
+        has_property_word = any(word in line_lower for word in property_words)
+        
+        if has_property_word:
+            excludes = ['confirmed', 'pending', 'cancelled', 'guest', 'adult', 'total', 'actions', 'review', 'details']
+            if not any(exclude in line_lower for exclude in excludes):
+                return True
+        
+        return False
+    
+    def _clean_property_name(self, property_name):
+        """Clean property name by removing trailing dots and extra info"""
+        if not property_name:
+            return property_name
+            
+        # Remove trailing ... and extra content after codes
+        cleaned = property_name.rstrip('.')
+        
+        # Remove confirmation codes (pattern: space + 2+ uppercase letters/numbers)
+        cleaned = re.sub(r'\s+[A-Z0-9]{6,}\s*\$?[\d,\.]*', '', cleaned)
+        
+        # Remove price info
+        cleaned = re.sub(r'\s*\$[\d,\.]+.*$', '', cleaned)
+        
+        return cleaned.strip()
+    
+    def _extract_dates_robust(self, line):
+        """Extract dates from line"""
+        dates = []
+        
+        # Pattern: Month Day, Year
+        pattern1 = r'(\w{3,9})\s+(\d{1,2}),?\s*(\d{4})'
+        matches = re.finditer(pattern1, line)
+        for match in matches:
+            try:
+                month_str, day_str, year_str = match.groups()
+                for fmt in ['%B %d, %Y', '%b %d, %Y', '%B %d %Y', '%b %d %Y']:
+                    try:
+                        date_str = f"{month_str} {day_str}, {year_str}"
+                        date = datetime.strptime(date_str, fmt).date()
+                        if date not in dates:
+                            dates.append(date)
+                        break
+                    except:
+                        continue
+            except:
+                continue
+        
+        return dates
+    
+    def _extract_guest_count_robust(self, line):
+        """Extract guest count"""
+        patterns = [
+            r'(\d+)\s*adults?',
+            r'(\d+)\s*guests?',
+            r'(\d+)\s*people',
+            r'(\d+)\s*persons?',
+            r'(\d+)\s*pax'
+        ]
+        
+        for pattern in patterns:
+            match = re.search(pattern, line.lower())
+            if match:
+                count = int(match.group(1))
+                if 1 <= count <= 20:
+                    return str(count)
+        
+        return None
+    
+    def _extract_fallback_name(self, lines):
+        """Extract fallback guest name"""
+        for line in lines[:5]:
+            if (3 <= len(line) <= 40 and
+                re.match(r'^[A-Za-z\s\'\-\.À-ÿ\u4e00-\u9fff]+$', line) and
+                not any(word in line.lower() for word in [
+                    'status', 'confirmed', 'pending', 'cancelled', 'guest', 'adult', 
+                    'booking', 'reservation', 'check', 'night', 'total', 'actions'
+                ])):
+                return line
+        
+        return "Unknown Guest"
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Reservation Read
+One read of tomorrow's reservations, shared by every scraping script:
+
+    navigate → page fingerprint (unchanged page: reuse the last parse)
+             → card texts (single tab, or AIRBNB_SCRAPE_TABS shards) → parse + journal + checkpoint
+             → detail-page check of guessed-at cards → cache the result, drop the checkpoint
+
+The scraper is an AirbnbBrowser with a parser and last_capture. Its
+read_errors counts the cards/pages that could not be read; such a result is
+not cached, its checkpoint is kept for the next run, and callers must not
+publish it.
+"""
+from capture_journal import open_reservation_journal
+from detail_enrichment import enrich_low_confidence
+from page_fingerprint import PageFingerprintCache
+from run_checkpoint import reservations_checkpoint
+from run_profiling import profiler
+from sharded_scrape import ShardedReservationReader, scrape_tabs, shard_statuses
+
+
+class ReservationRead:
+    def __init__(self, scraper, page_cache=None):
+        self.scraper = scraper
+        self.page_cache = page_cache or PageFingerprintCache()
+        self.fingerprint = None
+        self.checkpoint = None
+        self.texts = None
+
+    def open(self):
+        """The cached parse of an unchanged page, or None after setting up self.texts and self.checkpoint"""
+        scraper = self.scraper
+        scraper.read_errors = 0
+        sharded = scrape_tabs() > 1
+        if not sharded:
+            # Shards load in their own tabs; the one-page fingerprint does not cover them
+            if not scraper.navigate_to_reservations():
+                raise RuntimeError("Could not open the reservations page")
+            self.fingerprint = scraper.page_fingerprint()
+            cached = self.page_cache.lookup(self.fingerprint, scraper.parser)
+            if cached:
+                scraper.last_capture = cached['capture']
+                print(f"♻️ Reservations page unchanged since {cached['timestamp']} ({self.fingerprint['cards']} cards) - reusing the parsed results")
+                return cached
+        # Read pages, cards and parses are checkpointed: a rerun after a crash redoes only the rest
+        self.checkpoint = reservations_checkpoint(scraper, scraper.parser, shard_statuses() if sharded else None)
+        if sharded:
+            self.texts = ShardedReservationReader(scraper, checkpoint=self.checkpoint).iter_texts()
+        else:
+            self.texts = scraper.iter_reservation_texts()
+        return None
+
+    def keep(self, reason="run interrupted"):
+        if self.checkpoint:
+            self.checkpoint.keep(reason)
+
+    def finish(self, reservations, capture):
+        """Every text is parsed: check the guessed-at cards, then cache the result (or keep the checkpoint)"""
+        scraper = self.scraper
+        scraper.last_capture = capture
+        print(f"📼 Raw capture: {capture}")
+        try:
+            reservations = enrich_low_confidence(scraper, scraper.parser, reservations)
+        except BaseException:
+            self.keep()
+            raise
+        if scraper.read_errors:
+            # Incomplete: neither reusable as the page's result nor finished
+            self.checkpoint.keep(f"{scraper.read_errors} unreadable card(s)/page(s)")
+        else:
+            self.page_cache.store(self.fingerprint, scraper.parser, reservations, capture)
+            self.checkpoint.complete()
+        return reservations
+
+    def read(self):
+        """The whole read, parsing and journaling each text as it comes in; returns the reservations"""
+        scraper = self.scraper
+        cached = self.open()
+        if cached:
+            return cached['reservations']
+        profiler.checkpoint("before_scrape")
+        try:
+            with open_reservation_journal(scraper.parser, type(scraper).__name__) as journal:
+                reservations = scraper.parser.parse_reservations(self.texts, journal, self.checkpoint)
+        except BaseException:
+            self.keep()
+            raise
+        profiler.checkpoint("after_parse")
+        return self.finish(reservations, journal.path)
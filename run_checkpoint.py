@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Run Checkpoint
+Progress of an interrupted scrape, so a rerun picks up where the last one
+died instead of starting over from a cold page:
+
+    output/checkpoints/<kind>_<key>.jsonl
+
+One JSON line per unit of finished work - a reservations page read (with
+its card texts and page links), a card text with its parse result, a
+listings row's parse result - appended as it completes. Appending a line is cheap, and a
+half-written last line (the run died mid-write) is ignored on load, so the
+file is always a consistent prefix of the run. A run that finishes removes
+its checkpoint; one that fails keeps it for the next run with the same
+cleaning day, account and site.
+
+    AIRBNB_RESUME=0                  always start over (ignore checkpoints)
+    python run_checkpoint.py list
+    python run_checkpoint.py clear
+"""
+import argparse
+import hashlib
+import json
+import os
+from datetime import date, datetime, timedelta
+
+from airbnb_browser import AIRBNB_BASE_URL
+from artifact_archive import atomic_write_text
+from page_fingerprint import parse_context
+
+CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "checkpoints")
+RESUME_ENV = "AIRBNB_RESUME"
+MAX_AGE = timedelta(hours=6)
+SYNC_EVERY = 25
+
+DATE_FIELDS = ('checkin_date', 'checkout_date')
+
+
+def resume_enabled():
+    return os.environ.get(RESUME_ENV, '1') not in ('0', 'false', 'no')
+
+
+def text_digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _restore_dates(parsed):
+    for field in DATE_FIELDS:
+        if isinstance(parsed.get(field), str):
+            parsed[field] = date.fromisoformat(parsed[field])
+    return parsed
+
+
+class RunCheckpoint:
+    def __init__(self, kind, key, context=None, root=None):
+        """Resume the checkpoint for (kind, key) if there is a usable one, else start a new one
+
+        key names the work (cleaning day, account, site); context is whatever else decides
+        the parse results (parser version, nickname mapping) - when it differs, the texts and
+        pages are kept but the parse results are redone
+        """
+        self.kind = kind
+        self.context = context
+        self.root = root or CHECKPOINT_DIR
+        name = hashlib.sha1(f"{kind}|{key}".encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(self.root, f"{kind}_{name}.jsonl")
+        self.header = {'type': 'header', 'kind': kind, 'key': key, 'context': context,
+                       'started': datetime.now().isoformat(timespec='seconds')}
+        self.file = None
+        self.pending = 0
+        self.reset_state()
+        self.resumed = resume_enabled() and self._load()
+        if self.resumed:
+            # Cut a torn last line off, or the next record would be glued onto it
+            os.truncate(self.path, self.good_bytes)
+            self.file = open(self.path, 'a', encoding='utf-8')
+            if self.file_context != self.context:
+                # Parses recorded from here on are for this context, not the header's
+                self._append({'type': 'context', 'context': self.context}, sync=True)
+        else:
+            self.restart()
+
+    def reset_state(self):
+        self.meta = {}
+        self.pages = {}     # url -> {'texts', 'links'}
+        self.texts = {}     # text digest -> text
+        self.parses = {}    # text digest -> (parsed, outcome, reasons)
+        self.rows = {}      # listings row text digest -> record
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return False
+        records = []
+        self.good_bytes = 0
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated line")
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # Torn last line: the run died while writing it
+                        break
+                    self.good_bytes += len(line)
+        except OSError:
+            return False
+        if not records or records[0].get('type') != 'header' or records[0].get('key') != self.header['key']:
+            return False
+        started = datetime.fromisoformat(records[0]['started'])
+        if datetime.now() - started > MAX_AGE:
+            print(f"⚠️ Checkpoint from {records[0]['started']} is too old to resume - starting over")
+            return False
+
+        self.header = records[0]
+        self.file_context = self.header.get('context')
+        for record in records[1:]:
+            kind = record.get('type')
+            if kind == 'context':
+                self.file_context = record['context']
+            elif kind == 'meta':
+                self.meta.update(record['values'])
+            elif kind == 'page':
+                self.pages[record['url']] = {'texts': record['texts'], 'links': record['links']}
+                for text in record['texts']:
+                    self._remember_text(text)
+            elif kind == 'text':
+                self._remember_text(record['text'])
+                if self.file_context == self.context and 'outcome' in record:
+                    parsed = _restore_dates(record['parsed']) if record['parsed'] else None
+                    self.parses[record['digest']] = (parsed, record['outcome'], record.get('reasons'))
+            elif kind == 'row' and 'digest' in record:
+                self.rows[record['digest']] = record
+        done = len(self.pages) + len(self.texts) + len(self.rows)
+        if not done:
+            return False
+        parts = [f"{len(self.pages)} pages"] if self.pages else []
+        if self.texts:
+            parts.append(f"{len(self.texts)} card texts ({len(self.parses)} parsed)")
+        if self.rows:
+            parts.append(f"{len(self.rows)} rows")
+        print(f"♻️ Resuming {self.kind} checkpoint from {self.header['started']}: {', '.join(parts)} already done")
+        return True
+
+    def _remember_text(self, text):
+        self.texts[text_digest(text)] = text
+
+    def restart(self):
+        """Drop everything and begin an empty checkpoint (e.g. the page no longer matches)"""
+        self.close()
+        self.reset_state()
+        self.resumed = False
+        self.header['started'] = datetime.now().isoformat(timespec='seconds')
+        atomic_write_text(self.path, json.dumps(self.header, ensure_ascii=False) + "\n")
+        self.file = open(self.path, 'a', encoding='utf-8')
+
+    def _append(self, record, sync=False):
+        if self.file is None:
+            return
+        self.file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self.pending += 1
+        if sync or self.pending >= SYNC_EVERY:
+            self.sync()
+
+    def sync(self):
+        if self.file is None or not self.pending:
+            return
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+
+    def record_meta(self, **values):
+        self.meta.update(values)
+        self._append({'type': 'meta', 'values': values}, sync=True)
+
+    def record_page(self, url, texts, links):
+        """One fully read reservations page"""
+        self.pages[url] = {'texts': texts, 'links': links}
+        for text in texts:
+            self._remember_text(text)
+        self._append({'type': 'page', 'url': url, 'texts': texts, 'links': links}, sync=True)
+
+    def record_parse(self, text, parsed, outcome, reasons=None):
+        """One card text with its parse result"""
+        digest = text_digest(text)
+        self._remember_text(text)
+        self.parses[digest] = (parsed, outcome, reasons)
+        stored = {key: value for key, value in parsed.items() if key != 'raw_text'} if parsed else None
+        self._append({'type': 'text', 'digest': digest, 'text': text, 'parsed': stored,
+                      'outcome': outcome, 'reasons': reasons})
+
+    def parse_of(self, text):
+        """(parsed, outcome, reasons) recorded for this text, or None"""
+        found = self.parses.get(text_digest(text))
+        if not found:
+            return None
+        parsed, outcome, reasons = found
+        if parsed is not None:
+            parsed = dict(parsed, raw_text=text[:500])
+        return parsed, outcome, reasons
+
+    def record_row(self, text, title, nickname, status, region):
+        """Parse result of one listings row, keyed by the row text"""
+        record = {'type': 'row', 'digest': text_digest(text), 'title': title,
+                  'nickname': nickname, 'status': status, 'region': region}
+        self.rows[record['digest']] = record
+        self._append(record)
+
+    def row_of(self, text):
+        """Record for this row text, or None"""
+        return self.rows.get(text_digest(text))
+
+    def close(self):
+        if self.file is not None:
+            self.sync()
+            self.file.close()
+            self.file = None
+
+    def complete(self):
+        """The work finished: nothing to resume"""
+        self.close()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def keep(self, reason):
+        """The work did not finish: leave the checkpoint for the next run"""
+        self.close()
+        print(f"💾 Checkpoint kept ({reason}) - the next run resumes from it: {self.path}")
+
+
+def reservations_checkpoint(browser, parser, shards=None):
+    """Checkpoint of one reservations scrape: same site, login profile, cleaning day and shards"""
+    key = "|".join([AIRBNB_BASE_URL, browser.profile_dir or "default", parser.tomorrow.isoformat(),
+                    ",".join(shards) if shards else "single"])
+    return RunCheckpoint('reservations', key, context=parse_context(parser))
+
+
+def listings_checkpoint(browser, day):
+    key = "|".join([AIRBNB_BASE_URL, browser.profile_dir or "default", day.isoformat()])
+    return RunCheckpoint('listings', key)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear run checkpoints")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('list', help="checkpoints left by unfinished runs")
+    sub.add_parser('clear', help="delete every checkpoint (next runs start over)")
+    args = parser.parse_args()
+
+    paths = sorted(os.path.join(CHECKPOINT_DIR, name) for name in os.listdir(CHECKPOINT_DIR)
+                   if name.endswith('.jsonl')) if os.path.isdir(CHECKPOINT_DIR) else []
+    if args.command == 'clear':
+        for path in paths:
+            os.remove(path)
+        print(f"🧹 Removed {len(paths)} checkpoint(s)")
+        return
+    if not paths:
+        print("No checkpoints - the last runs finished")
+        return
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            header = json.loads(f.readline() or '{}')
+            lines = sum(1 for _ in f)
+        print(f"{header.get('kind', '?'):<13} {header.get('started', '?'):<20} {lines:>6} records  "
+              f"{header.get('key', '')}  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Run Metrics
+Counters, gauges and latency histograms for each pipeline run, written in
+the Prometheus text format to output/metrics/<script>.prom.
+
+The file is replaced atomically, so a node_exporter textfile collector can
+scrape it at any time. In a long-running process (daemon, message server)
+counters and histograms keep adding up across runs, as Prometheus expects;
+the gauges describe the last run only. Point AIRBNB_METRICS_DIR at the collector's
+directory to publish directly.
+"""
+import os
+import threading
+import time
+
+from artifact_archive import atomic_write_text
+
+METRICS_ENV = "AIRBNB_METRICS_DIR"
+METRICS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "metrics")
+
+# Seconds; parse is sub-millisecond, page waits are several seconds
+PARSE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1)
+PAGE_WAIT_BUCKETS = (0.5, 1, 2, 3, 5, 7.5, 10, 15, 30, 60)
+
+METRIC_HELP = {
+    'airbnb_reservations_scraped_total': ('counter', "Reservation card texts read from the reservations page"),
+    'airbnb_reservations_parsed_total': ('counter', "Parsed cards by outcome (checkout, checkin or why the card was dropped)"),
+    'airbnb_reservations_region_total': ('counter', "Reservations kept for tomorrow, by region"),
+    'airbnb_nickname_resolutions_total': ('counter', "Nickname lookups by source (mapping, alternative line, truncated-name fallback)"),
+    'airbnb_listings_extracted_total': ('counter', "Listed properties read from the listings table"),
+    'airbnb_page_fingerprint_total': ('counter', "Reservations page fingerprint checks (unchanged = parse skipped)"),
+    'airbnb_detail_fetches_total': ('counter', "Low-confidence reservations re-read from their detail page, by result"),
+    'airbnb_nickname_fallback_ratio': ('gauge', "Share of kept reservations that fell back to the truncated property name"),
+    'airbnb_parse_seconds': ('histogram', "Time to parse one reservation card"),
+    'airbnb_page_wait_seconds': ('histogram', "Page load plus settle wait, by page"),
+    'airbnb_step_seconds': ('gauge', "Duration of each step of the last run"),
+    'airbnb_run_success': ('gauge', "1 if the last run finished, 0 otherwise"),
+    'airbnb_run_timestamp_seconds': ('gauge', "Unix time the last run finished"),
+}
+
+
+def _label_text(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels:
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _number(value):
+    if value == float('inf'):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class RunMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.histograms = {}
+        # Nickname counts when the previous run ended; the fallback ratio covers what came after
+        self.nicknames_at_last_run = (0, 0)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = value
+
+    def get(self, name, **labels):
+        return self.values.get((name, tuple(sorted(labels.items()))), 0)
+
+    def total(self, name):
+        """Sum over every label combination"""
+        return sum(value for (metric, _), value in self.values.items() if metric == name)
+
+    def observe(self, name, seconds, buckets, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = _Histogram(buckets)
+            histogram.observe(seconds)
+
+    def record_parse(self, parser, seconds, reservation):
+        """Count one parse() call using the outcome the parser recorded"""
+        self.observe('airbnb_parse_seconds', seconds, PARSE_BUCKETS)
+        self.inc('airbnb_reservations_parsed_total', outcome=parser.last_outcome or 'unknown')
+        if reservation:
+            self.inc('airbnb_reservations_region_total', region=reservation.get('region') or 'unknown')
+
+    def record_nickname(self, source):
+        self.inc('airbnb_nickname_resolutions_total', source=source or 'unknown')
+
+    def finish_run(self, success, steps=None):
+        """Step durations, success flag, timestamp and the fallback ratio for the run that just ended"""
+        with self.lock:
+            # Steps an earlier run had and this one did not are not this run's
+            for key in [key for key in self.values if key[0] == 'airbnb_step_seconds']:
+                del self.values[key]
+        for step, seconds in (steps or {}).items():
+            self.set('airbnb_step_seconds', round(seconds, 6), step=step)
+        resolved_total = self.total('airbnb_nickname_resolutions_total')
+        fallbacks_total = self.get('airbnb_nickname_resolutions_total', source='fallback')
+        resolved = resolved_total - self.nicknames_at_last_run[0]
+        fallbacks = fallbacks_total - self.nicknames_at_last_run[1]
+        self.nicknames_at_last_run = (resolved_total, fallbacks_total)
+        self.set('airbnb_nickname_fallback_ratio', round(fallbacks / resolved, 6) if resolved else 0)
+        self.set('airbnb_run_success', 1 if success else 0)
+        self.set('airbnb_run_timestamp_seconds', round(time.time(), 3))
+
+    def render(self, script):
+        """Prometheus text exposition; every series carries script=<script>"""
+        with self.lock:
+            values = dict(self.values)
+            histograms = {key: (list(h.counts), h.total, h.count, h.buckets) for key, h in self.histograms.items()}
+
+        names = sorted({name for name, _ in values} | {name for name, _ in histograms})
+        lines = []
+        for name in names:
+            kind, help_text = METRIC_HELP.get(name, ('untyped', name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (metric, labels), value in sorted(values.items()):
+                if metric == name:
+                    lines.append(f"{name}{_label_text((('script', script),) + labels)} {_number(value)}")
+            for (metric, labels), (counts, total, count, buckets) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                base = (('script', script),) + labels
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_label_text(base + (('le', _number(float(bound))),))} {cumulative}")
+                lines.append(f"{name}_bucket{_label_text(base + (('le', '+Inf'),))} {count}")
+                lines.append(f"{name}_sum{_label_text(base)} {_number(round(total, 6))}")
+                lines.append(f"{name}_count{_label_text(base)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, script):
+        """Atomically replace <metrics dir>/<script>.prom; returns the path"""
+        directory = os.environ.get(METRICS_ENV) or METRICS_DIR
+        path = os.path.join(directory, f"{script}.prom")
+        try:
+            atomic_write_text(path, self.render(script))
+        except OSError as e:
+            print(f"⚠️ Could not write metrics to {path}: {e}")
+            return None
+        return path
+
+
+metrics = RunMetrics()
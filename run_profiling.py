@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Run Profiling
+Opt-in CPU (cProfile) and memory (tracemalloc) profiling for any entry point.
+
+Enable with the --profile flag or AIRBNB_PROFILE:
+
+    AIRBNB_PROFILE=1        CPU and memory
+    AIRBNB_PROFILE=cpu      CPU only
+    AIRBNB_PROFILE=memory   memory only
+
+Each run writes to output/profiles/<script>_YYYYMMDD_HHMMSS/:
+
+    cpu.pstats      full profile (python -m pstats, snakeviz, ...)
+    cpu_top.txt     top functions by cumulative and own time
+    memory.txt      allocations at each checkpoint and growth between them
+"""
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+
+from artifact_archive import atomic_write_text
+
+PROFILE_ENV = "AIRBNB_PROFILE"
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "profiles")
+DEFAULT_TOP = 25
+
+
+def profile_modes(requested=False):
+    """Set of 'cpu'/'memory' requested via a script's --profile (requested) or AIRBNB_PROFILE (empty when off)"""
+    value = os.environ.get(PROFILE_ENV, '').strip().lower()
+    if requested and value in ('', '0'):
+        value = 'all'
+    if value in ('', '0'):
+        return set()
+    if value in ('cpu', 'memory'):
+        return {value}
+    return {'cpu', 'memory'}
+
+
+class RunProfiler:
+    def __init__(self, top=DEFAULT_TOP):
+        self.top = top
+        self.modes = set()
+        self.label = None
+        self.cpu = None
+        self.snapshots = []
+        self.started = None
+
+    @property
+    def active(self):
+        return bool(self.modes)
+
+    def start(self, label, modes=None, requested=False):
+        self.modes = profile_modes(requested) if modes is None else set(modes)
+        if not self.modes:
+            return
+        self.label = label
+        self.snapshots = []
+        self.started = time.perf_counter()
+        if 'memory' in self.modes:
+            tracemalloc.start(10)
+            self.checkpoint("start")
+        if 'cpu' in self.modes:
+            self.cpu = cProfile.Profile()
+            self.cpu.enable()
+
+    def checkpoint(self, name):
+        """Take a tracemalloc snapshot (e.g. before/after scrape and parse); no-op when off"""
+        if 'memory' not in self.modes or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        # Leave out the profiler's own bookkeeping
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        self.snapshots.append((name, snapshot, current, peak))
+
+    def _cpu_report(self):
+        out = io.StringIO()
+        stats = pstats.Stats(self.cpu, stream=out).strip_dirs()
+        out.write(f"=== TOP {self.top} BY CUMULATIVE TIME ===\n")
+        stats.sort_stats('cumulative').print_stats(self.top)
+        out.write(f"\n=== TOP {self.top} BY OWN TIME ===\n")
+        stats.sort_stats('tottime').print_stats(self.top)
+        return out.getvalue()
+
+    def _memory_report(self):
+        lines = []
+        for name, snapshot, current, peak in self.snapshots:
+            lines.append(f"=== {name}: {current / 1e6:.1f} MB traced, peak {peak / 1e6:.1f} MB ===")
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                lines.append(f"  {stat}")
+            lines.append("")
+        for (before_name, before, _, _), (after_name, after, _, _) in zip(self.snapshots, self.snapshots[1:]):
+            lines.append(f"=== GROWTH {before_name} → {after_name} ===")
+            for stat in after.compare_to(before, 'lineno')[:self.top]:
+                lines.append(f"  {stat}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def finish(self):
+        """Stop profiling and write the reports; returns the output directory (None when off)"""
+        if not self.modes:
+            return None
+        if self.cpu:
+            self.cpu.disable()
+        self.checkpoint("end")
+
+        out_dir = os.path.join(PROFILE_DIR, f"{self.label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(out_dir, exist_ok=True)
+        if self.cpu:
+            self.cpu.dump_stats(os.path.join(out_dir, "cpu.pstats"))
+            atomic_write_text(os.path.join(out_dir, "cpu_top.txt"), self._cpu_report())
+        if self.snapshots:
+            atomic_write_text(os.path.join(out_dir, "memory.txt"), self._memory_report())
+            tracemalloc.stop()
+
+        print(f"\n🔬 Profile ({', '.join(sorted(self.modes))}, {time.perf_counter() - self.started:.1f}s) saved in: {out_dir}")
+        if self.cpu:
+            stats = pstats.Stats(self.cpu).strip_dirs().sort_stats('tottime')
+            hottest = [f"{func[2]} ({func[0]}:{func[1]}) {stats.stats[func][2]:.2f}s"
+                       for func in stats.fcn_list[:5]]
+            print("   Hottest: " + "; ".join(hottest))
+        self.modes = set()
+        self.cpu = None
+        self.snapshots = []
+        return out_dir
+
+
+profiler = RunProfiler()
+
+
+@contextlib.contextmanager
+def profiled(label, requested=False):
+    """Profile the enclosed block when requested (--profile or AIRBNB_PROFILE); otherwise does nothing"""
+    profiler.start(label, requested=requested)
+    try:
+        yield profiler
+    finally:
+        profiler.finish()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Run Trace
+Per-phase timing spans, exported as a Chrome trace-event file
+(open in chrome://tracing or https://ui.perfetto.dev) plus a one-line summary.
+
+Off by default. Enable with AIRBNB_TRACE=1 or the --trace flag on any script
+(the script calls tracer.enable()).
+When disabled, a span is a shared no-op object, so instrumented code pays
+one attribute check per call.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+from artifact_archive import atomic_write_text
+
+TRACE_ENV = "AIRBNB_TRACE"
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "traces")
+
+
+def trace_requested():
+    """True when AIRBNB_TRACE is set to anything but 0"""
+    return os.environ.get(TRACE_ENV, '') not in ('', '0')
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'args', 'started')
+
+    def __init__(self, tracer, name, args):
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+        self.started = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ended = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record(self.name, self.started, ended, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach results known only at the end (counts, outcome) to the span"""
+        self.args.update(args)
+
+
+class Tracer:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.events = []
+        self.lock = threading.Lock()
+        self.origin_ns = time.perf_counter_ns()
+        self.pid = os.getpid()
+
+    def enable(self):
+        self.enabled = True
+
+    def span(self, name, **args):
+        """Context manager timing one phase; nested spans on the same thread show as children"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, args)
+
+    def _record(self, name, started_ns, ended_ns, args):
+        event = {
+            'name': name,
+            'ph': 'X',
+            'ts': (started_ns - self.origin_ns) / 1000.0,
+            'dur': (ended_ns - started_ns) / 1000.0,
+            'pid': self.pid,
+            'tid': threading.get_ident()
+        }
+        if args:
+            event['args'] = args
+        with self.lock:
+            self.events.append(event)
+
+    def totals(self):
+        """(name, count, seconds) per span name, in order of first appearance"""
+        totals = {}
+        for event in sorted(self.events, key=lambda e: e['ts']):
+            count, micros = totals.get(event['name'], (0, 0.0))
+            totals[event['name']] = (count + 1, micros + event['dur'])
+        return [(name, count, micros / 1e6) for name, (count, micros) in totals.items()]
+
+    def summary(self):
+        """One line: time per phase, with call counts for repeated spans"""
+        if not self.events:
+            return "no spans recorded"
+        wall = (max(e['ts'] + e['dur'] for e in self.events) - min(e['ts'] for e in self.events)) / 1e6
+        parts = [f"{name} {seconds:.2f}s" + (f" ({count}×)" if count > 1 else "")
+                 for name, count, seconds in self.totals()]
+        return " | ".join(parts + [f"wall {wall:.2f}s"])
+
+    def export(self, path):
+        """Write the Chrome trace-event JSON file"""
+        with self.lock:
+            events = list(self.events)
+        metadata = [{'name': 'process_name', 'ph': 'M', 'pid': self.pid, 'args': {'name': os.path.basename(sys.argv[0]) or 'python'}}]
+        atomic_write_text(path, json.dumps({'traceEvents': metadata + events, 'displayTimeUnit': 'ms'}))
+        return path
+
+    def finish(self, label):
+        """Export and print the summary at the end of a run; returns the trace path (None if disabled)"""
+        if not self.enabled or not self.events:
+            return None
+        path = os.path.join(TRACE_DIR, f"{label}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        self.export(path)
+        print(f"⏱️ {self.summary()}")
+        print(f"📁 Trace: {path}")
+        with self.lock:
+            self.events = []
+        return path
+
+
+tracer = Tracer(enabled=trace_requested())
+
+
+def traced(name=None):
+    """Decorator: time every call of the function as a span (no-op while tracing is off)"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def main():
+    """Print the summary of a saved trace file"""
+    if len(sys.argv) != 2:
+        print("Usage: python run_trace.py <trace.json>")
+        sys.exit(1)
+    with open(sys.argv[1], 'r', encoding='utf-8') as f:
+        events = [e for e in json.load(f)['traceEvents'] if e.get('ph') == 'X']
+    loaded = Tracer()
+    loaded.events = events
+    print(loaded.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Session Precheck
+Reads the saved browser profile's cookie database directly (no browser) and
+tells in a few milliseconds whether the Airbnb login is still there:
+
+    ok              session cookies present and not expired
+    relogin_needed  no Airbnb session cookie, or every one has expired
+    unknown         cookie store missing/unreadable, or not scraping airbnb.com;
+                    the browser check decides as before
+
+    python session_precheck.py
+    python session_precheck.py --profile-dir airbnb_brave_profile_villas
+
+The database is opened read-only and immutable, so it is safe while the
+browser is running. Cookie values are encrypted and never read.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse, quote
+
+DEFAULT_PROFILE_DIR = "airbnb_brave_profile"
+
+# Set by Airbnb on login; either one means a signed-in session
+SESSION_COOKIES = ('_aat', '_airbed_session_id')
+
+# Newer Chromium builds moved the store under Network/
+COOKIE_DB_PATHS = (
+    os.path.join("Default", "Network", "Cookies"),
+    os.path.join("Default", "Cookies"),
+)
+
+# expires_utc counts microseconds since 1601-01-01 UTC
+CHROME_EPOCH = datetime(1601, 1, 1, tzinfo=timezone.utc)
+
+# Warn ahead of time so the re-login is not discovered by a failed 07:00 run
+EXPIRY_WARNING_DAYS = 3
+
+
+def chrome_time(value):
+    """Chrome cookie timestamp -> aware UTC datetime (None for session cookies)"""
+    if not value:
+        return None
+    return CHROME_EPOCH + timedelta(microseconds=value)
+
+
+def cookie_db_path(profile_dir=None):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    profile_dir = os.path.join(script_dir, profile_dir or DEFAULT_PROFILE_DIR)
+    for relative in COOKIE_DB_PATHS:
+        path = os.path.join(profile_dir, relative)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def base_host():
+    """Host the scrapers talk to (AIRBNB_BASE_URL, as in airbnb_browser.py)"""
+    url = os.environ.get("AIRBNB_BASE_URL", "https://www.airbnb.com")
+    return urlparse(url).hostname or ""
+
+
+def read_session_cookies(path):
+    """(name, host_key, expires_utc) of every Airbnb session cookie in the store"""
+    uri = f"file:{quote(os.path.abspath(path))}?mode=ro&immutable=1"
+    placeholders = ",".join("?" for _ in SESSION_COOKIES)
+    connection = sqlite3.connect(uri, uri=True, timeout=1)
+    try:
+        return connection.execute(
+            f"SELECT name, host_key, expires_utc FROM cookies "
+            f"WHERE name IN ({placeholders}) AND host_key LIKE '%airbnb.%'",
+            SESSION_COOKIES
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def precheck_session(profile_dir=None, now=None):
+    """Cookie-store login check; returns {'status', 'reason', 'expires', 'seconds'}"""
+    started = time.perf_counter()
+    now = now or datetime.now(timezone.utc)
+    result = {'status': 'unknown', 'reason': None, 'expires': None, 'seconds': 0.0}
+
+    try:
+        if 'airbnb.' not in base_host():
+            result['reason'] = f"AIRBNB_BASE_URL points at {base_host() or 'an unknown host'}"
+            return result
+
+        path = cookie_db_path(profile_dir)
+        if path is None:
+            # A fresh profile has never been logged in
+            result['status'] = 'relogin_needed'
+            result['reason'] = f"no cookie store in {profile_dir or DEFAULT_PROFILE_DIR}"
+            return result
+
+        try:
+            cookies = read_session_cookies(path)
+        except sqlite3.Error as e:
+            result['reason'] = f"cannot read {path}: {e}"
+            return result
+
+        if not cookies:
+            result['status'] = 'relogin_needed'
+            result['reason'] = "no Airbnb session cookie in the profile"
+            return result
+
+        # Session-only cookies (no expiry) count as valid; otherwise keep the latest expiry
+        expiries = [chrome_time(expires) for _, _, expires in cookies]
+        if any(expires is None for expires in expiries):
+            result['status'] = 'ok'
+            result['reason'] = "session cookie present (no expiry)"
+            return result
+
+        latest = max(expiries)
+        result['expires'] = latest
+        if latest <= now:
+            result['status'] = 'relogin_needed'
+            result['reason'] = f"session cookies expired {latest:%Y-%m-%d %H:%M} UTC"
+        else:
+            result['status'] = 'ok'
+            result['reason'] = f"session cookies valid until {latest:%Y-%m-%d %H:%M} UTC"
+        return result
+    finally:
+        result['seconds'] = time.perf_counter() - started
+
+
+def require_login(profile_dir=None, skip=False):
+    """Print the precheck result; False only when a re-login is definitely needed (skip: --skip-precheck)"""
+    if skip:
+        return True
+    result = precheck_session(profile_dir)
+    milliseconds = result['seconds'] * 1000
+    if result['status'] == 'relogin_needed':
+        print(f"❌ Re-login needed: {result['reason']} ({milliseconds:.0f}ms, browser not started)")
+        print(f"   Log in to Airbnb in the {profile_dir or DEFAULT_PROFILE_DIR} browser profile, then run again.")
+        return False
+    if result['status'] == 'ok':
+        print(f"✅ Login precheck: {result['reason']} ({milliseconds:.0f}ms)")
+        expires = result['expires']
+        if expires and expires - datetime.now(timezone.utc) < timedelta(days=EXPIRY_WARNING_DAYS):
+            print(f"⚠️ Airbnb session expires soon ({expires:%Y-%m-%d %H:%M} UTC) - log in again to renew it")
+    else:
+        print(f"⚠️ Login precheck skipped: {result['reason']}")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the saved Airbnb login without starting a browser")
+    parser.add_argument('--profile-dir', default=DEFAULT_PROFILE_DIR)
+    args = parser.parse_args()
+
+    result = precheck_session(args.profile_dir)
+    print(f"{result['status']}: {result['reason']} ({result['seconds'] * 1000:.1f}ms)")
+    sys.exit(1 if result['status'] == 'relogin_needed' else 0)
+
+
+if __name__ == "__main__":
+    main()
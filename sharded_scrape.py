@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Sharded Scrape
+Reads the reservations page as several shards loading side by side in
+extra tabs of the same browser, instead of one page load after another in
+a single tab. A shard is one status tab (/hosting/reservations/<status>)
+and every page of its pager: the first page of each status opens at once,
+and the page links it shows are handed to the next free tab. Cards are
+merged in status/page order and de-duplicated by confirmation code (or by
+text when a card shows none).
+
+    AIRBNB_SCRAPE_TABS=4                        tabs loading at once (default 1 = single-tab scrape)
+    AIRBNB_RESERVATION_SHARDS=upcoming,all      status tabs to read (default upcoming)
+
+    python sharded_scrape.py --compare --tabs 4                      # this account: 1 tab vs 4 tabs
+    python sharded_scrape.py --compare --tabs 4 --fixture --cards 1000 --page-size 50 --latency 0.3
+
+With more than one tab the page fingerprint (one page) is not used; with a
+RunCheckpoint, pages an interrupted run already read are not loaded again.
+"""
+import argparse
+import hashlib
+import os
+import re
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlparse
+
+from airbnb_browser import (
+    AIRBNB_BASE_URL, BACKENDS, MIN_RESERVATION_TEXT_LENGTH, RESERVATION_SELECTORS, SETTLE_SCALE
+)
+from run_metrics import metrics, PAGE_WAIT_BUCKETS
+from run_trace import traced
+
+SCRAPE_TABS_ENV = "AIRBNB_SCRAPE_TABS"
+SHARDS_ENV = "AIRBNB_RESERVATION_SHARDS"
+DEFAULT_SHARDS = ('upcoming',)
+PAGE_TIMEOUT = 30
+
+# A page counts as loaded once its card count has held still this long
+# (longer when it shows no cards at all); same scaling as the settle waits
+STABLE_MS = 1000
+EMPTY_MS = 5000
+
+CONFIRMATION_CODE_RE = re.compile(r"\b(HM[A-Z0-9]{8})\b")
+
+# Runs in each shard tab: null until the page has settled, then every card text and page link at once
+READ_SHARD_JS = r"""
+const selectors = arguments[0], minLength = arguments[1], stableMs = arguments[2], emptyMs = arguments[3];
+if (window.__shardStale || document.readyState !== 'complete' || !document.body) return null;
+const cards = document.querySelectorAll(selectors.join(','));
+const now = Date.now();
+if (window.__shardCount !== cards.length) {
+    window.__shardCount = cards.length;
+    window.__shardSince = now;
+    return null;
+}
+if (now - window.__shardSince < (cards.length ? stableMs : emptyMs)) return null;
+const texts = Array.from(cards, e => (e.innerText || '').trim()).filter(t => t.length > minLength);
+const pages = Array.from(document.querySelectorAll("nav[aria-label='Pagination'] a[href]"), a => a.href);
+return {texts: texts, pages: pages};
+"""
+
+# Flag the current document so the next poll waits for the new one
+NAVIGATE_JS = "window.__shardStale = true; location.href = arguments[0];"
+
+
+def scrape_tabs():
+    try:
+        return max(1, int(os.environ.get(SCRAPE_TABS_ENV, 1)))
+    except ValueError:
+        return 1
+
+
+def shard_statuses():
+    value = os.environ.get(SHARDS_ENV, '')
+    statuses = [s.strip().lower() for s in value.split(',') if s.strip()]
+    return tuple(statuses) or DEFAULT_SHARDS
+
+
+def card_key(text):
+    """Confirmation code, or a digest of the text for cards without one"""
+    match = CONFIRMATION_CODE_RE.search(text)
+    return match.group(1) if match else hashlib.sha1(text.encode('utf-8')).digest()
+
+
+class ShardedReservationReader:
+    def __init__(self, browser, tabs=None, statuses=None, checkpoint=None):
+        self.browser = browser
+        self.tabs = scrape_tabs() if tabs is None else max(1, tabs)
+        self.statuses = statuses or shard_statuses()
+        self.checkpoint = checkpoint
+        self.stats = {}
+
+    def shard_urls(self):
+        return [f"{AIRBNB_BASE_URL}/hosting/reservations/{status}" for status in self.statuses]
+
+    def page_key(self, url):
+        """(status position, page number): identifies a page whatever its link looks like, and orders it"""
+        parsed = urlparse(url)
+        status = parsed.path.rstrip('/').rsplit('/', 1)[-1]
+        try:
+            page = int(parse_qs(parsed.query).get('page', ['1'])[0])
+        except ValueError:
+            page = 1
+        position = self.statuses.index(status) if status in self.statuses else len(self.statuses)
+        return position, page
+
+    @traced()
+    def read_pages(self):
+        """[(page key, card texts)] for every page of every shard, in order; pages load `tabs` at a time"""
+        browser = self.browser
+        started = time.perf_counter()
+        queue = deque(self.shard_urls())
+        known = {self.page_key(url) for url in queue}
+        results = {}
+        active = {}   # tab -> (url, load started)
+        idle = []
+        opened = 0
+        failed = 0
+        done = {self.page_key(url): page for url, page in self.checkpoint.pages.items()} if self.checkpoint else {}
+
+        def finish(url, page):
+            results[self.page_key(url)] = page['texts'] if page else []
+            for link in (page or {}).get('pages', []):
+                key = self.page_key(link)
+                if key not in known:
+                    known.add(key)
+                    queue.append(link)
+
+        try:
+            while queue or active:
+                while queue and len(active) < self.tabs:
+                    url = queue.popleft()
+                    if self.page_key(url) in done:
+                        # Read before the last run died
+                        page = done[self.page_key(url)]
+                        finish(url, {'texts': page['texts'], 'pages': page['links']})
+                        continue
+                    if idle:
+                        tab = idle.pop()
+                        browser.tab_script(tab, NAVIGATE_JS, url)
+                    else:
+                        tab = browser.open_tab(url, f"shard_{opened}")
+                        opened += 1
+                    active[tab] = (url, time.perf_counter())
+
+                for tab, (url, loading_since) in list(active.items()):
+                    elapsed = time.perf_counter() - loading_since
+                    try:
+                        page = browser.tab_script(tab, READ_SHARD_JS, RESERVATION_SELECTORS, MIN_RESERVATION_TEXT_LENGTH,
+                                                  STABLE_MS * SETTLE_SCALE, EMPTY_MS * SETTLE_SCALE)
+                    except Exception as e:
+                        # Mid-navigation the old document can vanish under the script
+                        page = None
+                        if elapsed > PAGE_TIMEOUT:
+                            print(f"⚠️ Shard page failed: {url}: {e}")
+                    if page is None and elapsed <= PAGE_TIMEOUT:
+                        continue
+
+                    del active[tab]
+                    idle.append(tab)
+                    if page is None:
+                        print(f"⚠️ Shard page did not settle within {PAGE_TIMEOUT}s: {url}")
+                        failed += 1
+                    elif self.checkpoint is not None:
+                        self.checkpoint.record_page(url, page['texts'], page['pages'])
+                    metrics.observe('airbnb_page_wait_seconds', elapsed, PAGE_WAIT_BUCKETS, page='reservations_shard')
+                    finish(url, page)
+                if active:
+                    time.sleep(0.05)
+        finally:
+            for tab in idle + list(active):
+                browser.close_tab(tab)
+
+        self.stats = {'pages': len(results), 'tabs': opened, 'failed': failed,
+                      'resumed': len(known & set(done)), 'seconds': time.perf_counter() - started}
+        return sorted(results.items())
+
+    def iter_texts(self):
+        """Unique card texts of every shard, in status/page order (same contract as iter_reservation_texts)"""
+        print(f"Extracting raw reservation data from {', '.join(self.statuses)} in {self.tabs} tabs...")
+        pages = self.read_pages()
+        self.browser.read_errors = self.stats['failed']
+        seen = set()
+        duplicates = 0
+        for _, texts in pages:
+            for text in texts:
+                key = card_key(text)
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+                metrics.inc('airbnb_reservations_scraped_total')
+                yield text
+        resumed = f", {self.stats['resumed']} from the checkpoint" if self.stats['resumed'] else ""
+        print(f"Found {len(seen)} unique reservation texts on {self.stats['pages']} pages "
+              f"({duplicates} duplicates merged{resumed}) in {self.stats['seconds']:.1f}s")
+
+
+def timed_read(browser, tabs, statuses):
+    reader = ShardedReservationReader(browser, tabs, statuses)
+    texts = list(reader.iter_texts())
+    return texts, reader.stats
+
+
+def compare(tabs, statuses, backend):
+    """Single tab vs `tabs` tabs on the same account and pages; returns the speedup"""
+    from airbnb_browser import AirbnbBrowser
+
+    browser = AirbnbBrowser(backend=backend)
+    try:
+        if not browser.check_existing_session():
+            print("❌ Not logged in - log in once with the normal scripts first")
+            return None
+        single, single_stats = timed_read(browser, 1, statuses)
+        sharded, sharded_stats = timed_read(browser, tabs, statuses)
+    finally:
+        browser.close()
+
+    speedup = single_stats['seconds'] / sharded_stats['seconds'] if sharded_stats['seconds'] else 0.0
+    print(f"\n=== SHARDED SCRAPE: {', '.join(statuses)}, {single_stats['pages']} pages ===")
+    print(f"{'Tabs':>5} {'Cards':>7} {'Pages':>6} {'Time':>9}")
+    print(f"{1:>5} {len(single):>7} {single_stats['pages']:>6} {single_stats['seconds']:>8.2f}s")
+    print(f"{tabs:>5} {len(sharded):>7} {sharded_stats['pages']:>6} {sharded_stats['seconds']:>8.2f}s")
+    print(f"⏱️ Speedup: {speedup:.2f}x")
+    if {card_key(t) for t in single} != {card_key(t) for t in sharded}:
+        print("⚠️ The two reads found different cards (did the page change in between?)")
+    return speedup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the reservations page in parallel tabs and compare with one tab")
+    parser.add_argument('--compare', action='store_true', help="time a single-tab read against a --tabs read")
+    parser.add_argument('--tabs', type=int, default=4)
+    parser.add_argument('--shards', default=None, help="comma-separated status tabs (default: AIRBNB_RESERVATION_SHARDS or upcoming)")
+    parser.add_argument('--backend', choices=BACKENDS, default=None)
+    parser.add_argument('--fixture', action='store_true', help="run against a local fixture site instead of Airbnb")
+    parser.add_argument('--cards', type=int, default=1000)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.3, help="fixture response delay in seconds")
+    args = parser.parse_args()
+
+    if not args.compare:
+        parser.error("nothing to do (use --compare)")
+    statuses = tuple(s.strip() for s in args.shards.split(',')) if args.shards else shard_statuses()
+
+    if args.fixture:
+        # The base URL and settle scale are read at import time, so re-run against the fixture
+        import subprocess
+        import sys
+        from fixture_site import FixtureSite
+
+        site = FixtureSite(cards=args.cards, page_size=args.page_size, latency=args.latency, port=0).start()
+        try:
+            env = dict(os.environ, AIRBNB_BASE_URL=site.url, AIRBNB_SETTLE_SCALE="0")
+            command = [sys.executable, os.path.abspath(__file__), '--compare', '--tabs', str(args.tabs),
+                       '--shards', ",".join(statuses)]
+            if args.backend:
+                command += ['--backend', args.backend]
+            subprocess.run(command, env=env, check=False)
+        finally:
+            site.stop()
+        return
+
+    compare(args.tabs, statuses, args.backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+Synthetic Corpus
+Seeded generator of realistic reservation card texts and listings rows,
+for benchmarks and offline tests without a live Airbnb session
+"""
+import argparse
+import json
+import random
+import string
+from datetime import date, timedelta
+
+GUEST_NAMES = {
+    'latin': ['John Smith', 'Emma Wilson', 'Liam Brown', 'Olivia Taylor', 'Noah Davis',
+              'Sophie Martin', 'Lucas Meyer', 'Mia Jansen', 'Jack O\'Neil', 'Anna-Lena Koch'],
+    'accented': ['José Álvarez', 'Zoë Müller', 'François Dubois', 'Łukasz Nowak', 'Søren Løkke',
+                 'Inês Conceição', 'Ömer Yılmaz', 'Chloé Lefèvre'],
+    'cjk': ['王伟', '李娜', '张敏', '佐藤 健', '鈴木 花子'],
+    'hangul': ['김민지', '이서준', '박지훈', '최유나'],
+    'cyrillic': ['Иван Петров', 'Анна Смирнова', 'Дмитрий Орлов'],
+    'arabic': ['محمد علي', 'فاطمة حسن'],
+    'devanagari': ['राहुल शर्मा', 'प्रिया पटेल'],
+    'thai': ['สมชาย ใจดี', 'มาลี สุขใจ'],
+    'greek': ['Νίκος Παπαδόπουλος', 'Ελένη Γεωργίου'],
+    'single': ['Wayan', 'Made', 'Ketut', 'Putu']
+}
+
+# Rough mix seen on a Bali/Seoul host account
+NAME_SCRIPT_WEIGHTS = {
+    'latin': 45, 'accented': 15, 'cjk': 8, 'hangul': 8, 'cyrillic': 5,
+    'arabic': 3, 'devanagari': 3, 'thai': 3, 'greek': 2, 'single': 8
+}
+
+BALI_ADJECTIVES = ['Serene', 'Secret', 'Tranquil', 'Hidden', 'Private', 'Newly Built', 'Peaceful', 'Jungle']
+BALI_NOUNS = ['Bamboo Villa', 'Buddha Pad', 'Rice Paddy Villa', 'Jungle Villa', 'Joglo',
+              'Pool Villa', 'Dream House', 'Getaway', 'Japanese Villa', 'Rice Terrace Home']
+BALI_TAILS = ['with Pool', 'in Ubud', 'near Tegallalang', '– Peace, Pool & Free Coconuts',
+              'with Rice Terrace View', 'in Quiet Rice Paddy', '']
+BALI_LOCATIONS = ['Tegallalang, Bali, Indonesia', 'Ubud, Bali, Indonesia', 'Payangan, Kecamatan Payangan',
+                  'Gianyar, Bali, Indonesia', 'Canggu, Bali, Indonesia']
+
+SEOUL_ADJECTIVES = ['Cozy', 'Modern', 'Sunny', 'Minimal', 'Stylish']
+SEOUL_NOUNS = ['Hongdae Studio', 'Gangnam Loft', 'Itaewon Apartment', 'Yongsan Flat', 'Myeongdong Room']
+SEOUL_TAILS = ['near Seoul Station', 'by Line 2', 'with City View', '']
+SEOUL_LOCATIONS = ['Mapo-gu, Seoul, South Korea', 'Gangnam-gu, Seoul, KR', 'Yongsan-gu, Seoul, South Korea']
+
+HEADER_NOISE = [
+    "Reservations", "Upcoming", "Completed", "Canceled", "All", "Status", "Guests",
+    "Check-in", "Checkout", "Booked", "Listing", "Confirmation code", "Total payout", "Actions"
+]
+STATUSES = ['Confirmed', 'Currently hosting', 'Checking out tomorrow', 'Arriving tomorrow', 'Pending']
+
+# Share of each date layout on a card
+DATE_FORMATS = {
+    'short': 50,        # Oct 20, 2026
+    'long': 15,         # October 20, 2026
+    'no_comma': 10,     # Oct 20 2026
+    'inline_range': 10, # Oct 20, 2026 - Oct 24, 2026 on one line
+    'numeric': 8,       # 10/20/2026
+    'no_year': 7        # Oct 20
+}
+
+# Where tomorrow sits relative to the stay
+SCENARIOS = {'checkin': 30, 'checkout': 30, 'in_stay': 15, 'future': 15, 'past': 10}
+
+
+def _weighted(rng, weights):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def format_date(value, style):
+    if style == 'long':
+        return value.strftime('%B ') + f"{value.day}, {value.year}"
+    if style == 'no_comma':
+        return value.strftime('%b ') + f"{value.day} {value.year}"
+    if style == 'numeric':
+        return f"{value.month}/{value.day}/{value.year}"
+    if style == 'no_year':
+        return value.strftime('%b ') + str(value.day)
+    return value.strftime('%b ') + f"{value.day}, {value.year}"
+
+
+# Cleaning day the corpus is built around unless one is given: fixed, so a seed
+# generates the same cards (and the same tomorrow/not-tomorrow mix) on every day
+ANCHOR_DATE = date(2025, 8, 7)
+
+
+def anchor_date(seed):
+    """Fixed cleaning day for a seed"""
+    return ANCHOR_DATE + timedelta(days=seed % 365)
+
+
+class SyntheticCorpus:
+    def __init__(self, seed=42, tomorrow=None, listing_count=120, seoul_share=0.2):
+        self.rng = random.Random(seed)
+        self.tomorrow = tomorrow or anchor_date(seed)
+        self.seoul_share = seoul_share
+        self.listings = [self.make_listing(i) for i in range(listing_count)]
+
+    def make_listing(self, index):
+        """One listing: title, internal nickname, region and its listings-table row text"""
+        rng = self.rng
+        if rng.random() < self.seoul_share:
+            region = 'seoul'
+            title = " ".join(filter(None, [rng.choice(SEOUL_ADJECTIVES), rng.choice(SEOUL_NOUNS), rng.choice(SEOUL_TAILS)]))
+            location = rng.choice(SEOUL_LOCATIONS)
+        else:
+            region = 'bali'
+            title = " ".join(filter(None, [rng.choice(BALI_ADJECTIVES), rng.choice(BALI_NOUNS), rng.choice(BALI_TAILS)]))
+            if rng.random() < 0.4:
+                title = f"{rng.randint(1, 4)} Bed, {rng.randint(1, 3)} Bath {title}"
+            location = rng.choice(BALI_LOCATIONS)
+        # Titles repeat across hosts; the listing number keeps them unique
+        title = f"{title} #{index + 1}"
+        nickname = rng.choice(['v', 'jt', 'home ', 'unit ']) + str(rng.randint(1, 99))
+        status = rng.choices(['Listed', 'Unlisted', 'Action required'], weights=[85, 10, 5])[0]
+
+        row_lines = [title, nickname, rng.choice(['Home', 'Villa', 'Apartment']), location, status]
+        if rng.random() < 0.5:
+            row_lines.append(f"Instant Book {rng.choice(['on', 'off'])}")
+        return {
+            'airbnb_name': title,
+            'internal_name': nickname,
+            'region': region,
+            'status': status,
+            'row_text': "\n".join(row_lines)
+        }
+
+    def properties(self):
+        """Listed listings in the shape the nickname helper loads"""
+        return [
+            {'airbnb_name': l['airbnb_name'], 'internal_name': l['internal_name'],
+             'status': l['status'], 'region': l['region']}
+            for l in self.listings if l['status'] == 'Listed'
+        ]
+
+    def guest_name(self):
+        return self.rng.choice(GUEST_NAMES[_weighted(self.rng, NAME_SCRIPT_WEIGHTS)])
+
+    def stay_dates(self, scenario):
+        rng = self.rng
+        nights = rng.randint(1, 14)
+        if scenario == 'checkin':
+            checkin = self.tomorrow
+        elif scenario == 'checkout':
+            checkin = self.tomorrow - timedelta(days=nights)
+        elif scenario == 'in_stay':
+            nights = max(nights, 3)
+            checkin = self.tomorrow - timedelta(days=rng.randint(1, nights - 1))
+        elif scenario == 'future':
+            checkin = self.tomorrow + timedelta(days=rng.randint(2, 60))
+        else:
+            checkin = self.tomorrow - timedelta(days=nights + rng.randint(2, 30))
+        return checkin, checkin + timedelta(days=nights)
+
+    def make_reservation(self):
+        """One reservation with its ground truth and the card text the page would show"""
+        rng = self.rng
+        listing = rng.choice(self.listings)
+        scenario = _weighted(rng, SCENARIOS)
+        checkin, checkout = self.stay_dates(scenario)
+        guest = self.guest_name()
+        guests = rng.choices([1, 2, 3, 4, 5, 6], weights=[15, 40, 15, 15, 8, 7])[0]
+        code = "HM" + "".join(rng.choice(string.ascii_uppercase + string.digits) for _ in range(8))
+        date_style = _weighted(rng, DATE_FORMATS)
+
+        lines = []
+        if rng.random() < 0.1:
+            # Header rows bleed into the first card's text
+            lines.extend(HEADER_NOISE[:rng.randint(3, len(HEADER_NOISE))])
+        lines.append(rng.choice(STATUSES))
+        lines.append(guest)
+
+        count_style = rng.random()
+        if count_style < 0.45:
+            lines.append(f"{guests} adult{'s' if guests > 1 else ''}")
+        elif count_style < 0.75:
+            lines.append(f"{guests} guest{'s' if guests > 1 else ''}")
+        elif count_style < 0.85 and guests > 1:
+            lines.append(f"{guests - 1} adult{'s' if guests > 2 else ''}, 1 child")
+
+        if date_style == 'inline_range':
+            lines.append(f"{format_date(checkin, 'short')} - {format_date(checkout, 'short')}")
+        else:
+            lines.append(format_date(checkin, date_style))
+            lines.append(format_date(checkout, date_style))
+        if rng.random() < 0.5:
+            booked = checkin - timedelta(days=rng.randint(1, 90))
+            lines.append(format_date(booked, 'short' if date_style == 'inline_range' else date_style))
+
+        title = listing['airbnb_name']
+        if rng.random() < 0.25:
+            title = title[:rng.randint(20, max(21, len(title)))].rstrip() + "..."
+        lines.append(title)
+        lines.append(code)
+        lines.append(f"${rng.randint(40, 2400):,}.{rng.randint(0, 99):02d}")
+        if rng.random() < 0.5:
+            lines.append(rng.choice(['Details', 'Message', 'Details\nMessage']))
+
+        return {
+            'guest_name': guest,
+            'property_name': listing['airbnb_name'],
+            'region': listing['region'],
+            'guest_count': guests,
+            'checkin_date': checkin,
+            'checkout_date': checkout,
+            'scenario': scenario,
+            'status': lines[0] if lines[0] in STATUSES else None,
+            'confirmation_code': code,
+            'date_style': date_style,
+            'text': "\n".join(lines)
+        }
+
+    def reservations(self, count):
+        return [self.make_reservation() for _ in range(count)]
+
+    def reservation_texts(self, count):
+        return [self.make_reservation()['text'] for _ in range(count)]
+
+    def listing_rows(self, count):
+        """Listings-table row texts (cycled if more rows than listings are requested)"""
+        return [self.listings[i % len(self.listings)]['row_text'] for i in range(count)]
+
+    def detail_text(self, reservation):
+        """Text of a reservation's detail page: every field under its own label"""
+        r = reservation
+        return "\n".join([
+            r['status'] or "Confirmed", r['guest_name'],
+            "Check-in", f"{r['checkin_date']:%a, %b} {r['checkin_date'].day}, {r['checkin_date'].year}",
+            "Checkout", f"{r['checkout_date']:%a, %b} {r['checkout_date'].day}, {r['checkout_date'].year}",
+            "Guests", f"{r['guest_count']} guest{'s' if r['guest_count'] > 1 else ''}",
+            "Listing", r['property_name'],
+            "Confirmation code", r['confirmation_code']
+        ])
+
+    def ical_feeds(self, reservations):
+        """Per-listing .ics exports in Airbnb's format: {airbnb_name: text}, every listing included"""
+        events = {listing['airbnb_name']: [] for listing in self.listings}
+        for r in reservations:
+            events[r['property_name']].append(
+                f"BEGIN:VEVENT\r\nDTEND;VALUE=DATE:{r['checkout_date']:%Y%m%d}\r\n"
+                f"DTSTART;VALUE=DATE:{r['checkin_date']:%Y%m%d}\r\n"
+                f"UID:{r['confirmation_code'].lower()}-{self.rng.getrandbits(48):012x}@airbnb.com\r\n"
+                f"DESCRIPTION:Reservation URL: https://www.airbnb.com/hosting/reservations/details/{r['confirmation_code']}\\n"
+                f"Phone Number (Last 4 Digits): {self.rng.randint(1000, 9999)}\r\n"
+                "SUMMARY:Reserved\r\nEND:VEVENT\r\n"
+            )
+        for name, listing_events in events.items():
+            if self.rng.random() < 0.3:
+                start = self.tomorrow + timedelta(days=self.rng.randint(-5, 30))
+                listing_events.append(
+                    f"BEGIN:VEVENT\r\nDTEND;VALUE=DATE:{start + timedelta(days=self.rng.randint(1, 5)):%Y%m%d}\r\n"
+                    f"DTSTART;VALUE=DATE:{start:%Y%m%d}\r\n"
+                    f"UID:{self.rng.getrandbits(64):016x}@airbnb.com\r\nSUMMARY:Airbnb (Not available)\r\nEND:VEVENT\r\n"
+                )
+        return {
+            name: ("BEGIN:VCALENDAR\r\nPRODID:-//Airbnb Inc//Hosting Calendar 0.8.8//EN\r\n"
+                   "CALSCALE:GREGORIAN\r\nVERSION:2.0\r\n" + "".join(listing_events) + "END:VCALENDAR\r\n")
+            for name, listing_events in events.items()
+        }
+
+    def date_lines(self, count):
+        """Single card lines as fed to _extract_dates_robust"""
+        lines = []
+        for _ in range(count):
+            lines.extend(self.make_reservation()['text'].split('\n'))
+            if len(lines) >= count:
+                break
+        while len(lines) < count:
+            lines.extend(lines[:count - len(lines)])
+        return lines[:count]
+
+    def property_lookup_names(self, count):
+        """Names as they appear on cards: exact, truncated with '...', or unknown"""
+        names = []
+        for _ in range(count):
+            title = self.rng.choice(self.listings)['airbnb_name']
+            roll = self.rng.random()
+            if roll < 0.6:
+                names.append(title)
+            elif roll < 0.9:
+                names.append(title[:self.rng.randint(15, max(16, len(title)))].rstrip('. '))
+            else:
+                names.append(f"{self.rng.choice(SEOUL_ADJECTIVES)} Unknown Place {self.rng.randint(1, 10**6)}")
+        return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic reservation corpus as JSON lines")
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', default='synthetic_reservations.jsonl')
+    parser.add_argument('--tomorrow', type=date.fromisoformat, default=None,
+                        help="cleaning day YYYY-MM-DD (default: fixed per seed)")
+    args = parser.parse_args()
+
+    corpus = SyntheticCorpus(seed=args.seed, tomorrow=args.tomorrow)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        for reservation in corpus.reservations(args.count):
+            f.write(json.dumps(reservation, ensure_ascii=False, default=str) + "\n")
+    print(f"✅ Wrote {args.count} synthetic reservations (seed {args.seed}, tomorrow {corpus.tomorrow}) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Turnover Scheduler
+Splits tomorrow's checkouts and check-ins into per-team routes instead of
+one Out/In list per region. Teams, their capacity (properties per day) and
+start point, and property locations come from cleaning_teams.json:
+
+    {"teams": [{"name": "Ubud A", "region": "bali", "capacity": 8, "base": [-8.5069, 115.2625]}],
+     "locations": {"v87": [-8.4921, 115.2480]}}
+
+Every property is one job; a checkout and a check-in at the same property
+tomorrow is a same-day turnover. Turnovers are assigned first, then
+checkouts, then check-ins, each to the team of its region that is cheapest
+(distance from the team's base plus a penalty for how full the team
+already is), so teams end up both near their jobs and evenly loaded. Each
+route visits the turnovers first, then the rest, in nearest-neighbour
+order.
+
+    python turnover_scheduler.py output/captures/2025-08-06/reservations_070012_4242.jsonl.gz
+    python turnover_scheduler.py --benchmark 500 --teams 20
+"""
+import argparse
+import json
+import math
+import os
+import random
+import time
+from datetime import date, timedelta
+
+from message_templates import format_short_date, get_template
+from region_map import region_settings
+
+TEAMS_FILE = "cleaning_teams.json"
+
+# Job kinds in the order they are assigned and visited
+PRIORITY = ('turnover', 'checkout', 'checkin')
+
+# Kilometres a completely full team is "further away" than an empty one
+DEFAULT_BALANCE_KM = 10.0
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def load_team_config(config_file=None):
+    """cleaning_teams.json, or None when there is none (regional messages only)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    config_file = config_file or os.path.join(script_dir, TEAMS_FILE)
+    if not os.path.exists(config_file):
+        return None
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except Exception as e:
+        print(f"❌ Error loading {config_file}, skipping team routes: {e}")
+        return None
+
+    names = set()
+    for team in config.get('teams', []):
+        # Same as a syntax error: a config mistake skips team routes, not the whole run
+        if 'name' not in team:
+            print(f"❌ Team entry without a name in {config_file}, skipping team routes: {team}")
+            return None
+        if team['name'] in names:
+            print(f"❌ Team name used twice in {config_file}, skipping team routes: {team['name']}")
+            return None
+        names.add(team['name'])
+        team.setdefault('capacity', 10)
+    config.setdefault('locations', {})
+    return config
+
+
+def distance_km(a, b):
+    """Great-circle distance between two [lat, lng] points; 0 when either is unknown"""
+    if not a or not b:
+        return 0.0
+    lat1, lng1, lat2, lng2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(h))
+
+
+def build_jobs(reservations, locations=None):
+    """One job per property: 'turnover' when it has both a checkout and a check-in tomorrow"""
+    locations = locations or {}
+    jobs = {}
+    for kind in ('checkouts', 'checkins'):
+        for reservation in reservations.get(kind, []):
+            nickname = reservation.get('property_nickname') or reservation.get('property_name')
+            job = jobs.get(nickname)
+            if job is None:
+                job = jobs[nickname] = {
+                    'nickname': nickname,
+                    'region': reservation.get('region'),
+                    'location': locations.get(nickname) or locations.get(reservation.get('property_name')),
+                    'checkout': None,
+                    'checkin': None
+                }
+            field = 'checkout' if kind == 'checkouts' else 'checkin'
+            job[field] = job[field] or reservation
+    for job in jobs.values():
+        job['kind'] = 'turnover' if job['checkout'] and job['checkin'] else ('checkout' if job['checkout'] else 'checkin')
+    return list(jobs.values())
+
+
+class TurnoverScheduler:
+    def __init__(self, teams, balance_km=DEFAULT_BALANCE_KM):
+        self.teams = teams
+        self.balance_km = balance_km
+
+    def assign(self, jobs):
+        """{team name: [jobs]} plus the jobs no team serves or has room for"""
+        assigned = {team['name']: [] for team in self.teams}
+        teams_by_region = {}
+        for team in self.teams:
+            teams_by_region.setdefault(team.get('region'), []).append(team)
+        # Teams without a region serve every region; a job no team serves is left unassigned
+        anywhere = teams_by_region.get(None, [])
+        candidates = {job['nickname']: (teams_by_region.get(job['region'], []) if job['region'] else []) + anywhere
+                      for job in jobs}
+
+        # Each team's fair share (by capacity) of the jobs it can take, so no team fills up while another idles
+        shares = {team['name']: 0.0 for team in self.teams}
+        for job in jobs:
+            teams = candidates[job['nickname']]
+            total_capacity = sum(team['capacity'] for team in teams) or 1
+            for team in teams:
+                shares[team['name']] += team['capacity'] / total_capacity
+        limits = {team['name']: min(team['capacity'], math.ceil(shares[team['name']] - 1e-9)) for team in self.teams}
+
+        def regret(job):
+            """How much worse the second-nearest team is: jobs with one obvious team go first"""
+            distances = sorted(distance_km(job['location'], team.get('base')) for team in candidates[job['nickname']])
+            return distances[1] - distances[0] if len(distances) > 1 else 0.0
+
+        unassigned = []
+        ordered = sorted(jobs, key=lambda job: (PRIORITY.index(job['kind']), -regret(job), job['nickname']))
+        for job in ordered:
+            best, best_cost = None, None
+            for team in candidates[job['nickname']]:
+                load = len(assigned[team['name']])
+                if load >= limits[team['name']]:
+                    continue
+                cost = distance_km(job['location'], team.get('base')) + self.balance_km * load / team['capacity']
+                if best is None or cost < best_cost:
+                    best, best_cost = team, cost
+            if best is None:
+                # Past the fair share, any team with real capacity left
+                for team in candidates[job['nickname']]:
+                    load = len(assigned[team['name']])
+                    if load < team['capacity'] and (best is None or load / team['capacity'] < best_cost):
+                        best, best_cost = team, load / team['capacity']
+            if best is None:
+                unassigned.append(job)
+            else:
+                assigned[best['name']].append(job)
+        return assigned, unassigned
+
+    @staticmethod
+    def route(team, jobs):
+        """Visiting order: turnovers first, then the rest, nearest neighbour from the team's base"""
+        stops = []
+        position = team.get('base')
+        km = 0.0
+        for kinds in (('turnover',), ('checkout', 'checkin')):
+            remaining = [job for job in jobs if job['kind'] in kinds]
+            while remaining:
+                nearest = min(remaining, key=lambda job: (distance_km(position, job['location']), job['nickname']))
+                remaining.remove(nearest)
+                km += distance_km(position, nearest['location'])
+                position = nearest['location'] or position
+                stops.append(nearest)
+        return stops, km
+
+    def schedule(self, reservations, locations=None):
+        """{'routes': {team: {'team', 'stops', 'km'}}, 'unassigned': [jobs]}"""
+        jobs = build_jobs(reservations, locations)
+        assigned, unassigned = self.assign(jobs)
+        routes = {}
+        for team in self.teams:
+            stops, km = self.route(team, assigned[team['name']])
+            routes[team['name']] = {'team': team, 'stops': stops, 'km': km}
+        return {'routes': routes, 'unassigned': unassigned}
+
+
+def render_team_message(route, tomorrow, region_config):
+    """One team's numbered stops in its region's language"""
+    team = route['team']
+    template = get_template(region_settings(region_config, team.get('region'))['language'])
+    style = template['date_style']
+    day = format_short_date(tomorrow, style)
+    if not route['stops']:
+        return template['route_empty'].format(team=team['name'], date=day)
+
+    lines = [template['route_title'].format(team=team['name'], date=day)]
+    for n, job in enumerate(route['stops'], 1):
+        checkin = job['checkin']
+        if checkin:
+            checkin_str = format_short_date(checkin.get('checkin_date', tomorrow), style)
+            checkout_str = format_short_date(checkin.get('checkout_date'), style)
+            dates = f"{checkin_str}-{checkout_str}" if checkin_str and checkout_str else (checkin_str or "TBC")
+        key = {'turnover': 'stop_turnover', 'checkout': 'stop_out', 'checkin': 'stop_in'}[job['kind']]
+        lines.append(template[key].format(
+            n=n, nickname=job['nickname'],
+            guests=checkin['guest_count'] if checkin else "", dates=dates if checkin else ""
+        ))
+    if route['km']:
+        lines.append(f"🚗 ~{route['km']:.1f} km")
+    return "\n".join(lines)
+
+
+def render_team_messages(schedule, tomorrow, region_config):
+    """{team name: message}, plus '_unassigned' when some properties have no team"""
+    messages = {name: render_team_message(route, tomorrow, region_config)
+                for name, route in schedule['routes'].items()}
+    if schedule['unassigned']:
+        template = get_template(region_settings(region_config, schedule['unassigned'][0]['region'])['language'])
+        messages['_unassigned'] = template['unassigned'].format(
+            properties=", ".join(job['nickname'] for job in schedule['unassigned']))
+    return messages
+
+
+def schedule_teams(reservations, tomorrow, region_config, config=None):
+    """Team messages for cleaning_teams.json, or None without one"""
+    config = config if config is not None else load_team_config()
+    if not config or not config.get('teams'):
+        return None
+    schedule = TurnoverScheduler(config['teams'], config.get('balance_km', DEFAULT_BALANCE_KM)).schedule(
+        reservations, config['locations'])
+    return render_team_messages(schedule, tomorrow, region_config)
+
+
+def benchmark(property_count, team_count, seed=7):
+    """Random Bali-sized day: property_count properties with a job tomorrow, team_count teams"""
+    from region_map import DEFAULT_REGION_CONFIG
+
+    rng = random.Random(seed)
+    tomorrow = date.today() + timedelta(days=1)
+    # Ubud to Uluwatu
+    def point():
+        return [round(rng.uniform(-8.85, -8.35), 5), round(rng.uniform(115.05, 115.35), 5)]
+
+    locations = {}
+    reservations = {'checkouts': [], 'checkins': []}
+    for i in range(property_count):
+        nickname = f"p{i}"
+        locations[nickname] = point()
+        kind = rng.choices(('turnover', 'checkout', 'checkin'), weights=(30, 40, 30))[0]
+        base = {'property_name': nickname, 'property_nickname': nickname, 'region': 'bali', 'guest_name': 'Guest'}
+        if kind in ('turnover', 'checkout'):
+            reservations['checkouts'].append(dict(base, checkin_date=tomorrow - timedelta(days=3),
+                                                  checkout_date=tomorrow, guest_count='2'))
+        if kind in ('turnover', 'checkin'):
+            reservations['checkins'].append(dict(base, checkin_date=tomorrow,
+                                                 checkout_date=tomorrow + timedelta(days=rng.randint(1, 10)),
+                                                 guest_count=str(rng.randint(1, 6))))
+    capacity = -(-property_count * 11 // 10 // team_count)
+    teams = [{'name': f"Team {i + 1}", 'region': 'bali', 'capacity': capacity, 'base': point()}
+             for i in range(team_count)]
+
+    started = time.perf_counter()
+    schedule = TurnoverScheduler(teams).schedule(reservations, locations)
+    messages = render_team_messages(schedule, tomorrow, DEFAULT_REGION_CONFIG)
+    elapsed = time.perf_counter() - started
+
+    loads = [len(route['stops']) for route in schedule['routes'].values()]
+    kms = [route['km'] for route in schedule['routes'].values()]
+    turnovers = sum(1 for route in schedule['routes'].values() for job in route['stops'] if job['kind'] == 'turnover')
+    print(f"\n=== TURNOVER SCHEDULER: {property_count} properties, {team_count} teams (capacity {capacity}) ===")
+    print(f"⏱️ {elapsed * 1000:.1f}ms for assignment, routes and {len(messages)} messages")
+    print(f"   Load per team: min {min(loads)}, max {max(loads)}; route length: "
+          f"min {min(kms):.1f} km, max {max(kms):.1f} km, total {sum(kms):.0f} km")
+    print(f"   Same-day turnovers: {turnovers}, unassigned: {len(schedule['unassigned'])}")
+    first = next(iter(messages))
+    print(f"\n{first}:\n{messages[first]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-team cleaning routes for tomorrow's turnovers")
+    parser.add_argument('source', nargs='?', help="capture (.jsonl.gz) or text file of cards to schedule (see parse_only.py)")
+    parser.add_argument('--tomorrow', type=date.fromisoformat, help="cleaning day (default: capture header or tomorrow)")
+    parser.add_argument('--benchmark', type=int, metavar='PROPERTIES', help="time a random day with this many properties")
+    parser.add_argument('--teams', type=int, default=20, help="teams in the benchmark")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(args.benchmark, args.teams)
+        return
+    if not args.source:
+        parser.error("a source is required (or --benchmark)")
+
+    from parse_only import build_engine, read_texts
+
+    config = load_team_config()
+    if not config:
+        print(f"⚠️ No {TEAMS_FILE}. Copy cleaning_teams.example.json and fill in your teams and property locations.")
+        return
+    header, texts = read_texts(args.source)
+    engine = build_engine(header, args.tomorrow)
+    engine.parser.set_verbose(False)
+    reservations = engine.parser.parse_reservations(texts)
+    messages = schedule_teams(reservations, engine.tomorrow, engine.region_config, config)
+    for team, message in messages.items():
+        print("\n" + "="*60)
+        print(team.upper())
+        print("="*60)
+        print(message)
+
+
+if __name__ == "__main__":
+    main()